@@ -0,0 +1,150 @@
+# packages/ffm_ocr/ffm_ocr/assemble.py
+"""組み立てステージ: 認識した格子（行×列の文字列）を OcrImportPayload にする"""
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+from ffm_ocr.recognize import Recognition
+from ffm_ocr.schemas import OcrImportPayload, ProductSeries
+
+PAYLOAD_VERSION = "1.0"
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    """
+    表の読み方
+
+    - 見出し行: 1列目以外に時刻（"9" / "9時" / "9:00"）が並ぶ行
+    - 客数行  : 1列目が customer_labels のどれかを含む
+    - 商品    : 1列目が商品名だけの行のあと、メトリクス名の行が続く
+                （"商品A 販売" のように1セルに両方あってもよい）
+    """
+    customer_labels: tuple[str, ...] = ("客数",)
+    metric_labels: dict[str, str] = field(default_factory=lambda: {
+        "仕込": "prepared",
+        "販売": "sold",
+        "廃棄": "discarded",
+        "陳列": "stock",
+        "在庫": "stock",
+    })
+    label_col: int = 0
+
+
+# OCR で数字と取り違えやすい文字
+_DIGIT_FIX = str.maketrans({"O": "0", "o": "0", "D": "0", "l": "1", "I": "1", "|": "1", "S": "5", "B": "8"})
+_HOUR_RE = re.compile(r"^(\d{1,2})(?:時|:00|h)?$")
+
+
+def normalize(text: str) -> str:
+    """全角→半角・空白除去"""
+    return unicodedata.normalize("NFKC", text or "").strip().replace(" ", "")
+
+
+def parse_int(text: str) -> int | None:
+    """セルの文字列を整数に（空・読めないときは None）"""
+    t = normalize(text).translate(_DIGIT_FIX).replace(",", "")
+    return int(t) if t.isdigit() else None
+
+
+def parse_hour(text: str) -> int | None:
+    m = _HOUR_RE.match(normalize(text))
+    if m and 0 <= int(m.group(1)) <= 23:
+        return int(m.group(1))
+    return None
+
+
+def to_rows(recognitions: list[Recognition], shape: tuple[int, int]) -> list[list[str]]:
+    """Recognition の並びを行×列の文字列にする"""
+    rows = [[""] * shape[1] for _ in range(shape[0])]
+    for r in recognitions:
+        rows[r.row][r.col] = r.text
+    return rows
+
+
+def assemble(
+    rows: list[list[str]],
+    target_date: date,
+    layout: TableLayout | None = None,
+    meta: dict[str, Any] | None = None,
+) -> OcrImportPayload:
+    """
+    行×列の文字列から OcrImportPayload を組み立てる
+
+    読めなかったセル（数値にならないもの）は meta["unreadable"] に (row, col) で残す。
+    """
+    layout = layout or TableLayout()
+    lc = layout.label_col
+    meta = dict(meta or {})
+
+    hours = _find_header(rows, lc)
+    customers: dict[int, int] = {}
+    products: dict[str, ProductSeries] = {}
+    current: ProductSeries | None = None
+    unreadable: list[tuple[int, int]] = []
+
+    for r, row in enumerate(rows):
+        if hours is None or r <= hours[0]:
+            continue
+        label = normalize(row[lc]) if lc < len(row) else ""
+        if not label:
+            continue
+
+        values: dict[int, int] = {}
+        for c, h in hours[1].items():
+            text = row[c] if c < len(row) else ""
+            if not normalize(text):
+                continue
+            v = parse_int(text)
+            if v is None:
+                unreadable.append((r, c))
+            else:
+                values[h] = v
+
+        if any(k in label for k in layout.customer_labels):
+            customers.update(values)
+            continue
+
+        metric, name = _split_label(label, layout.metric_labels)
+        if metric is None:
+            # 商品名だけの行（続くメトリクス行の持ち主）
+            current = products.setdefault(label, ProductSeries(name=label))
+            continue
+        if name:
+            current = products.setdefault(name, ProductSeries(name=name))
+        if current is None:
+            continue   # どの商品の行か分からない
+        current.by_metric.setdefault(metric, {}).update(values)
+
+    if hours is None:
+        meta["warning"] = "見出し行（時刻）が見つかりませんでした"
+    if unreadable:
+        meta["unreadable"] = unreadable
+    return OcrImportPayload(
+        version=PAYLOAD_VERSION,
+        date=target_date,
+        customers_by_hour=customers,
+        products=list(products.values()),
+        meta=meta,
+    )
+
+
+def _find_header(rows: list[list[str]], label_col: int) -> tuple[int, dict[int, int]] | None:
+    """空でないセルの半分以上が時刻の最初の行を見出しとし、(行番号, {列: 時}) を返す"""
+    for r, row in enumerate(rows):
+        cols = {c: parse_hour(t) for c, t in enumerate(row) if c != label_col and normalize(t)}
+        found = {c: h for c, h in cols.items() if h is not None}
+        if len(found) >= 2 and len(found) * 2 >= len(cols):
+            return r, found
+    return None
+
+
+def _split_label(label: str, metric_labels: dict[str, str]) -> tuple[str | None, str]:
+    """"商品A販売" → ("sold", "商品A")。メトリクス名を含まなければ (None, label)"""
+    for key, metric in metric_labels.items():
+        i = label.find(key)
+        if i >= 0:
+            return metric, label[:i].strip()
+    return None, label
@@ -0,0 +1,74 @@
+# packages/ffm_ocr/ffm_ocr/cells.py
+"""セル検出ステージ: 罫線から表の格子を求め、セルごとの矩形に分ける"""
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Cell:
+    row: int
+    col: int
+    x0: int
+    y0: int
+    x1: int
+    y1: int
+
+    def crop(self, img: np.ndarray, pad: int = 2) -> np.ndarray:
+        """罫線が入らないよう内側に pad だけ縮めて切り出す"""
+        return img[self.y0 + pad:self.y1 - pad, self.x0 + pad:self.x1 - pad]
+
+
+@dataclass(frozen=True)
+class CellGrid:
+    xs: list[int]   # 縦罫線の x（左から）
+    ys: list[int]   # 横罫線の y（上から）
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return max(len(self.ys) - 1, 0), max(len(self.xs) - 1, 0)
+
+    def cells(self) -> list[Cell]:
+        return [
+            Cell(r, c, self.xs[c], self.ys[r], self.xs[c + 1], self.ys[r + 1])
+            for r in range(len(self.ys) - 1)
+            for c in range(len(self.xs) - 1)
+        ]
+
+
+def detect_grid(gray: np.ndarray, min_line_ratio: float = 0.5, min_gap: int = 8) -> CellGrid:
+    """
+    罫線の表からセルの格子を検出する
+
+    2値化した画像を横長・縦長のカーネルで開き、罫線だけを残す。
+    行・列ごとの画素数の投影が min_line_ratio を超える位置を罫線とし、
+    min_gap 以内に並ぶ候補は1本にまとめる。
+
+    Args:
+        gray (np.ndarray): 前処理済みのグレースケール画像
+        min_line_ratio (float): 罫線とみなす長さ（画像の幅・高さに対する割合）
+        min_gap (int): これより近い罫線は同じ線として扱う（px）
+    """
+    binary = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10
+    )
+    h, w = binary.shape
+    horiz = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // 30, 10), 1)))
+    vert = cv2.morphologyEx(binary, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(h // 30, 10))))
+
+    ys = _line_positions(horiz.sum(axis=1) / 255, w * min_line_ratio, min_gap)
+    xs = _line_positions(vert.sum(axis=0) / 255, h * min_line_ratio, min_gap)
+    return CellGrid(xs=xs, ys=ys)
+
+
+def _line_positions(profile: np.ndarray, threshold: float, min_gap: int) -> list[int]:
+    """投影が threshold を超える区間ごとに中心の位置を返す"""
+    idx = np.flatnonzero(profile >= threshold)
+    if idx.size == 0:
+        return []
+    # 連続（min_gap 以内）している位置をひとかたまりにする
+    breaks = np.flatnonzero(np.diff(idx) > min_gap)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [idx.size - 1]))
+    return [int((idx[s] + idx[e]) // 2) for s, e in zip(starts, ends)]
@@ -0,0 +1,189 @@
+# packages/ffm_ocr/ffm_ocr/cli.py
+"""
+ffm-ocr: 写真をまとめて OCR し、JSON Lines か FF Manager の DB に書き出す（GUI 不要）
+
+    ffm-ocr photos/ -j 4 -o out.jsonl
+    ffm-ocr photos/ -r --db data/FF_info.db --cache data/FF_info.db
+
+画像の読み込みから認識まではプロセスプールの各プロセスで行い、
+出力（JSONL・DB・キャッシュへの書き込み）は親プロセスだけが行う。
+対象日は --date が無ければファイル名の日付か更新日から決める。
+キャッシュの読み書きに失敗しても（ロック待ちの時間切れなど）その画像は普通に OCR する。
+キャッシュは最後に --cache-mb / --cache-days の範囲まで古いものを消す。
+"""
+import argparse
+import dataclasses
+import logging
+import os
+import sys
+import time
+from concurrent.futures import Executor, as_completed
+from datetime import date
+from pathlib import Path
+
+from ffm_ocr.images import guess_date, list_images, read_image
+from ffm_ocr.ocr_repo import OCRCacheRepo
+from ffm_ocr.pipeline import OcrPipeline, _process_one, make_process_pool
+from ffm_ocr.recognize import PaddleRecognizer
+from ffm_ocr.schemas import OcrImportPayload, dumps_payload
+from ffm_ocr.sqlite_sink import SqliteSink
+
+log = logging.getLogger(__name__)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="ffm-ocr", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="+", help="画像ファイルかフォルダ")
+    ap.add_argument("-r", "--recursive", action="store_true", help="フォルダの下の階層もたどる")
+    ap.add_argument("--date", type=date.fromisoformat, help="対象日 YYYY-MM-DD（全画像に同じ日を使う）")
+    ap.add_argument("-j", "--workers", type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                    help="プロセス数（1 なら親プロセスだけで順に処理）")
+    ap.add_argument("-o", "--out", type=Path, help="JSON Lines の出力先（--db も無ければ標準出力）")
+    ap.add_argument("--db", type=Path, help="FF Manager の DB に直接書き込む（migrations 済みのもの）")
+    ap.add_argument("--cache", type=Path, help="OCR キャッシュの DB（ocr_cache 表。--db と同じでもよい）")
+    ap.add_argument("--cache-mb", type=int, default=16, help="キャッシュの上限（MB）。超えた分は使われていない順に消す")
+    ap.add_argument("--cache-days", type=int, default=90, help="この日数使われていないキャッシュは消す")
+    ap.add_argument("--no-crop", action="store_true", help="タブレット画面の切り出しをしない（スクリーンショット用）")
+    ap.add_argument("--lang", default="japan")
+    ap.add_argument("--gpu", action="store_true")
+    ap.add_argument("--min-score", type=float, default=0.0, help="これより低い認識結果は空にする")
+    ap.add_argument("-q", "--quiet", action="store_true", help="1枚ごとの進捗を出さない")
+    return ap
+
+
+def _ocr_file(
+    pipeline: OcrPipeline, path: str, target_date: date, cache_path: str | None
+) -> tuple[OcrImportPayload, tuple[str, dict] | None, bool]:
+    """
+    1枚を読み込んで OCR する（プールの各プロセスで動く）
+
+    Returns:
+        (payload, キャッシュに書くキー（書かないなら None）, キャッシュに当たったか)
+    """
+    img = read_image(path)
+    key = pipeline.cache_key(img) if cache_path else None
+    if key is not None:
+        cached = _cache_get(cache_path, key[0])
+        if cached is not None:
+            return dataclasses.replace(cached, date=target_date), None, True
+    return _process_one(pipeline, img, target_date, None), key, False
+
+
+def _cache_get(cache_path: str, key: str) -> OcrImportPayload | None:
+    # キャッシュの失敗で OCR 自体は止めない（警告だけ出して認識に進む）
+    try:
+        repo = OCRCacheRepo(cache_path)
+        try:
+            return repo.get_payload(key)
+        finally:
+            repo.close()
+    except Exception as e:
+        log.warning("ocr cache read failed: %s", e)
+        return None
+
+
+def _open_cache(path: Path) -> OCRCacheRepo | None:
+    try:
+        return OCRCacheRepo(path)
+    except Exception as e:
+        log.warning("ocr cache unavailable (%s): %s", path, e)
+        return None
+
+
+def run(args: argparse.Namespace) -> int:
+    paths = list_images(args.inputs, recursive=args.recursive)
+    if not paths:
+        print("ffm-ocr: 画像が見つかりませんでした", file=sys.stderr)
+        return 2
+
+    pipeline = OcrPipeline(
+        PaddleRecognizer(lang=args.lang, use_gpu=args.gpu, min_score=args.min_score),
+        crop=not args.no_crop,
+    )
+    cache = _open_cache(args.cache) if args.cache else None
+    sink = SqliteSink(args.db) if args.db else None
+    out = None
+    if args.out:
+        out = open(args.out, "a", encoding="utf-8")
+    elif sink is None:
+        out = sys.stdout
+
+    jobs = [(p, args.date or guess_date(p)) for p in paths]
+    pool = make_process_pool(args.workers) if args.workers > 1 else None
+    t0 = time.perf_counter()
+    ok = failed = hits = 0
+    try:
+        cache_path = args.cache if cache is not None else None
+        for n, (path, res) in enumerate(_results(pool, pipeline, jobs, cache_path), 1):
+            try:
+                if isinstance(res, Exception):
+                    raise res
+                payload, key, hit = res
+                if key is not None:
+                    try:
+                        cache.put_payload(key[0], key[1], payload)
+                    except Exception as e:
+                        log.warning("ocr cache write failed: %s", e)
+                payload = dataclasses.replace(payload, meta={**payload.meta, "source": str(path), "cache_hit": hit})
+                msg = "ok (cache)" if hit else "ok"
+                if sink is not None:
+                    written = sink.write(payload)
+                    if written.unknown_products:
+                        msg += f" 未登録の商品: {', '.join(written.unknown_products)}"
+                if out is not None:
+                    out.write(dumps_payload(payload) + "\n")
+                    out.flush()
+                ok += 1
+                hits += hit
+            except Exception as e:
+                failed += 1
+                msg = f"失敗: {e}"
+            if not args.quiet:
+                print(f"[{n}/{len(paths)}] {path}: {msg}", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if out is not None and out is not sys.stdout:
+            out.close()
+        if sink is not None:
+            sink.close()
+        if cache is not None:
+            try:
+                cache.evict(max_bytes=args.cache_mb * 1024 * 1024, max_age_s=args.cache_days * 86400)
+            except Exception as e:
+                log.warning("ocr cache eviction failed: %s", e)
+            cache.close()
+
+    print(
+        f"ffm-ocr: {len(paths)} 枚中 成功 {ok} / 失敗 {failed}（キャッシュ {hits}）"
+        f" {time.perf_counter() - t0:.1f} 秒",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def _results(pool: Executor | None, pipeline: OcrPipeline, jobs: list[tuple[Path, date]], cache: Path | None):
+    """終わった順に (path, _ocr_file の結果 か 例外) を返す（プールが無ければここで順に処理する）"""
+    cache_path = str(cache) if cache else None
+    if pool is None:
+        for path, d in jobs:
+            try:
+                yield path, _ocr_file(pipeline, str(path), d, cache_path)
+            except Exception as e:
+                yield path, e
+        return
+    futures = {pool.submit(_ocr_file, pipeline, str(p), d, cache_path): p for p, d in jobs}
+    for fut in as_completed(futures):
+        try:
+            yield futures[fut], fut.result()
+        except Exception as e:
+            yield futures[fut], e
+
+
+def main(argv: list[str] | None = None) -> int:
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
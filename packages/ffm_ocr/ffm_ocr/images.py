@@ -0,0 +1,65 @@
+# packages/ffm_ocr/ffm_ocr/images.py
+"""画像ファイルの読み込みと、まとめて取り込むときのファイル列挙・日付の推定"""
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable
+
+import cv2
+import numpy as np
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
+
+# "20250107" / "2025-01-07" / "2025_01_07" / "2025.01.07"
+_DATE_RE = re.compile(r"(20\d{2})[-_.]?(0[1-9]|1[0-2])[-_.]?(0[1-9]|[12]\d|3[01])(?!\d)")
+
+
+def read_image(path: str | Path) -> np.ndarray:
+    """
+    画像ファイルを BGR の ndarray で読む
+
+    cv2.imread は Windows で日本語を含むパスを開けないので、バイト列を読んでから imdecode する。
+    IMREAD_COLOR は JPEG の EXIF の向きも反映する。
+    """
+    buf = np.fromfile(str(path), dtype=np.uint8)
+    img = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"画像を読めませんでした: {path}")
+    return img
+
+
+def list_images(paths: Iterable[str | Path], recursive: bool = False) -> list[Path]:
+    """
+    ファイル・フォルダの並びから画像ファイルを集める（フォルダ内は名前順、重複は除く）
+
+    Args:
+        paths: 画像ファイルかフォルダ
+        recursive: フォルダの下の階層もたどるか
+    """
+    found: dict[Path, None] = {}
+    for p in map(Path, paths):
+        if p.is_dir():
+            it = p.rglob("*") if recursive else p.iterdir()
+            for f in sorted(it):
+                if f.is_file() and f.suffix.lower() in IMAGE_EXTS:
+                    found.setdefault(f, None)
+        elif p.suffix.lower() in IMAGE_EXTS:
+            found.setdefault(p, None)
+    return list(found)
+
+
+def guess_date(path: str | Path) -> date:
+    """
+    写真の対象日を推定する
+
+    ファイル名に日付（20250107 / 2025-01-07 など）があればそれを使い、
+    無ければファイルの更新日時の日付にする。
+    """
+    p = Path(path)
+    m = _DATE_RE.search(p.stem)
+    if m:
+        try:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(p.stat().st_mtime).date()
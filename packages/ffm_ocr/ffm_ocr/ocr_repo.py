@@ -1,83 +1,165 @@
-# pakages/ffm_ocr/ffm_ocr/ocr_repo.py
-import hashlib,time,json
+# packages/ffm_ocr/ffm_ocr/ocr_repo.py
+"""
+OCR 結果のキャッシュ（画像の中身とパイプライン設定で引く）
+
+キーは build_key(画像のバイト列, params)。同じ写真を同じ設定で読み直すときは
+パイプラインを回さずに保存済みの OcrImportPayload を返す。
+
+ffm_ocr は PySide6 に依存しないので、ここでは sqlite3 を使う。
+アプリ側（QSqlDatabase）は ff_manager.db.repositories.ocr_repo が同じ表・SQL を使う。
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
 from typing import Optional
-from PySide6.QtSql import QSqlQuery
 
+from ffm_ocr.schemas import OcrImportPayload, dumps_payload, loads_payload
+
+# created_at / last_used はミリ秒（UNIX 時刻）
 DDL = """
 CREATE TABLE IF NOT EXISTS ocr_cache (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    image_path TEXT UNIQUE,
-    result TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    cache_key   TEXT PRIMARY KEY,
+    params      TEXT NOT NULL,
+    result_json TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  INTEGER NOT NULL,
+    last_used   INTEGER NOT NULL
 )
 """
+INDEX_DDL = "CREATE INDEX IF NOT EXISTS idx_ocr_cache_last_used ON ocr_cache(last_used)"
 
-class OCRCacheRepo:
-    def __init__(self, db):
-        """OCRキャッシュ用のリポジトリ"""
-        self.db = db
-        self._ensure_table()
+SELECT_SQL = "SELECT result_json FROM ocr_cache WHERE cache_key = :k"
+TOUCH_SQL = "UPDATE ocr_cache SET last_used = :t WHERE cache_key = :k"
+UPSERT_SQL = """
+INSERT INTO ocr_cache (cache_key, params, result_json, size, created_at, last_used)
+VALUES (:k, :p, :r, :s, :t, :u)
+ON CONFLICT(cache_key) DO UPDATE SET
+    params = excluded.params,
+    result_json = excluded.result_json,
+    size = excluded.size,
+    last_used = excluded.last_used
+"""
+# 最後に使ってから max_age を過ぎたもの
+EVICT_AGE_SQL = "DELETE FROM ocr_cache WHERE last_used < :cutoff"
+# 新しく使った順に size を積み上げ、上限を超えた分（古い側）を消す
+EVICT_SIZE_SQL = """
+DELETE FROM ocr_cache WHERE cache_key IN (
+    SELECT cache_key FROM (
+        SELECT cache_key,
+               SUM(size) OVER (ORDER BY last_used DESC, cache_key) AS running
+        FROM ocr_cache
+    ) WHERE running > :max_bytes
+)
+"""
+STATS_SQL = "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache"
 
-    def _ensure_table(self):
-        """キャッシュ用テーブルがなければ作成"""
-        q = QSqlQuery(self.db)
-        if not q.exec(DDL):
-            print("Failed to create table:", q.lastError().text())
 
-    def save_result(self, image_path: str, result: str) -> bool:
-        """
-        OCR結果をキャッシュに保存（既存なら更新）
-        """
-        q = QSqlQuery(self.db)
-        q.prepare("""
-            INSERT OR REPLACE INTO ocr_cache (image_path, result)
-            VALUES (:path, :res)
-        """)
-        q.bindValue(":path", image_path)
-        q.bindValue(":res", result)
-        ok = q.exec()
-        if not ok:
-            print("DB save error:", q.lastError().text())
-        return ok
-
-    def load_result(self, image_path: str) -> str | None:
+def build_key(image_bytes, params: dict) -> str:
+    """
+    画像の中身と設定からキャッシュキーを作る
+
+    Args:
+        image_bytes: 画像のバイト列（bytes / memoryview など buffer なら何でもよい）
+        params (dict): 結果に効く設定（JSON にできる値だけ）
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(image_bytes)
+    h.update(params_json(params).encode("utf-8"))
+    return h.hexdigest()
+
+
+def params_json(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def legacy_table(columns: set[str]) -> bool:
+    """旧版（image_path / result）の ocr_cache か"""
+    return bool(columns) and "cache_key" not in columns
+
+
+class OCRCacheRepo:
+    def __init__(self, conn: sqlite3.Connection | str | Path):
         """
-        キャッシュからOCR結果を取得
+        OCRキャッシュ用のリポジトリ（sqlite3）
+
+        Args:
+            conn: sqlite3 の接続、または DB ファイルのパス
         """
-        q = QSqlQuery(self.db)
-        q.prepare("SELECT result FROM ocr_cache WHERE image_path=:path")
-        q.bindValue(":path", image_path)
-        if not q.exec():
-            print("DB load error:", q.lastError().text())
-            return None
+        self._owns = not isinstance(conn, sqlite3.Connection)
+        self.conn = sqlite3.connect(conn) if self._owns else conn
+        self._ensure_table()
 
-        if q.next():
-            return str(q.value(0))
-        return None
+    build_key = staticmethod(build_key)
 
-    @staticmethod
-    def build_key(image_bytes: bytes, params: dict) -> str:
-        h = hashlib.sha1()
-        h.update(image_bytes)
-        h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
-        return h.hexdigest()
+    def close(self) -> None:
+        """パスから開いた接続だけ閉じる"""
+        if self._owns:
+            self.conn.close()
+
+    def _ensure_table(self):
+        """キャッシュ用テーブルがなければ作成（旧版の表は中身ごと作り直す）"""
+        cols = {row[1] for row in self.conn.execute("PRAGMA table_info(ocr_cache)")}
+        with self.conn:
+            if legacy_table(cols):
+                self.conn.execute("DROP TABLE ocr_cache")
+            self.conn.execute(DDL)
+            self.conn.execute(INDEX_DDL)
 
     def get(self, key: str) -> Optional[str]:
-        q = QSqlQuery(self.db)
-        q.prepare("SELECT result_json FROM ocr_cache WHERE cache_key = :k")
-        q.bindValue(":k", key)
-        if q.exec() and q.next():
-            return str(q.value(0))
-        return None
-    
+        """保存済みの result_json（無ければ None）。当たったら last_used を更新する"""
+        row = self.conn.execute(SELECT_SQL, {"k": key}).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(TOUCH_SQL, {"k": key, "t": now_ms()})
+        return str(row[0])
+
     def put(self, key: str, params: dict, result_json: str) -> None:
-        q = QSqlQuery(self.db)
-        q.prepare("""
-            INSERT OR REPLACE INTO ocr_cache (cache_key, created_at, params, result_json)
-            VALUES (:k, :t, :p, :r)
-        """)
-        q.bindValue(":k", key)
-        q.bindValue(":t", int(time.time()))
-        q.bindValue(":p", json.dumps(params, ensure_ascii=False))
-        q.bindValue(":r", result_json)
-        q.exec()
+        t = now_ms()
+        with self.conn:
+            self.conn.execute(UPSERT_SQL, {
+                "k": key,
+                "p": params_json(params),
+                "r": result_json,
+                "s": len(result_json.encode("utf-8")),
+                "t": t,
+                "u": t,
+            })
+
+    def get_payload(self, key: str) -> Optional[OcrImportPayload]:
+        text = self.get(key)
+        return loads_payload(text) if text is not None else None
+
+    def put_payload(self, key: str, params: dict, payload: OcrImportPayload) -> None:
+        self.put(key, params, dumps_payload(payload))
+
+    def evict(self, max_bytes: Optional[int] = None, max_age_s: Optional[float] = None) -> int:
+        """
+        古いエントリを消す
+
+        Args:
+            max_bytes: result_json の合計の上限（超えた分を使われていない順に消す）
+            max_age_s: 最後に使ってからこの秒数を過ぎたものを消す
+
+        Returns:
+            int: 消した件数
+        """
+        removed = 0
+        with self.conn:
+            if max_age_s is not None:
+                cutoff = now_ms() - int(max_age_s * 1000)
+                removed += self.conn.execute(EVICT_AGE_SQL, {"cutoff": cutoff}).rowcount
+            if max_bytes is not None:
+                removed += self.conn.execute(EVICT_SIZE_SQL, {"max_bytes": int(max_bytes)}).rowcount
+        return removed
+
+    def stats(self) -> tuple[int, int]:
+        """(件数, result_json の合計バイト数)"""
+        n, size = self.conn.execute(STATS_SQL).fetchone()
+        return int(n), int(size)
@@ -1,5 +1,197 @@
+# packages/ffm_ocr/ffm_ocr/pipeline.py
+"""
+OCR パイプライン本体
+
+    crop → preprocess → detect_cells → recognize → assemble
+
+run() が認識までを行い（OcrResult）、to_payload() が OcrImportPayload に組み立てる。
+認識ステージはセルを chunk_size ずつに分け、executor（プロセスプール）があれば並列に回す。
+複数画像は run_batch() で画像単位にプロセスへ振り分けられる。
+同じ画像・同じ設定の結果は cache_key() をキーに ocr_repo.OCRCacheRepo へ保存して使い回せる。
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+from ffm_ocr.assemble import PAYLOAD_VERSION, TableLayout, assemble, to_rows
+from ffm_ocr.cells import CellGrid, detect_grid
+from ffm_ocr.ocr_repo import build_key
+from ffm_ocr.preprocess import crop_tablet_screen, deskew, to_gray
+from ffm_ocr.recognize import CellImage, PaddleRecognizer, Recognition, Recognizer
+from ffm_ocr.schemas import OcrImportPayload
+
+log = logging.getLogger(__name__)
+
+# ステージの処理を変えて結果が変わるときに上げる（古いキャッシュを使わせない）
+CACHE_VERSION = 1
+
+
+@dataclass
+class OcrResult:
+    """run() の結果（to_payload に渡す）"""
+    rows: list[list[str]]            # 行×列の認識結果
+    grid: CellGrid
+    recognitions: list[Recognition]
+    meta: dict[str, Any] = field(default_factory=dict)   # 補正角・各ステージの所要時間など
 
 
 class OcrPipeline:
-    def __init__(self):
-        pass
\ No newline at end of file
+    def __init__(
+        self,
+        recognizer: Recognizer | None = None,
+        layout: TableLayout | None = None,
+        crop: bool = True,
+        executor: Executor | None = None,
+        chunk_size: int = 32,
+    ):
+        """
+        Args:
+            recognizer: セルの認識器（既定は PaddleRecognizer。テストでは StubRecognizer）
+            layout: 表の読み方（assemble に渡す）
+            crop: タブレット画面の切り出しを行うか（スクリーンショットなら不要）
+            executor: 認識ステージを並列に回すプール（make_process_pool で作る）
+            chunk_size: 1タスクで認識するセル数
+        """
+        self.recognizer = recognizer or PaddleRecognizer()
+        self.layout = layout or TableLayout()
+        self.crop = crop
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    def __getstate__(self):
+        # run_batch でワーカーへ送るとき、プールそのものは送らない
+        state = self.__dict__.copy()
+        state["executor"] = None
+        return state
+
+    # ---------------- stages ----------------
+    def stage_crop(self, img: np.ndarray, meta: dict) -> np.ndarray:
+        if not self.crop:
+            return img
+        out, found = crop_tablet_screen(img)
+        meta["cropped"] = found
+        return out
+
+    def stage_preprocess(self, img: np.ndarray, meta: dict) -> np.ndarray:
+        gray, angle = deskew(to_gray(img))
+        meta["deskew_deg"] = angle
+        return gray
+
+    def stage_detect_cells(self, gray: np.ndarray, meta: dict) -> CellGrid:
+        grid = detect_grid(gray)
+        meta["grid_shape"] = grid.shape
+        return grid
+
+    def stage_recognize(self, gray: np.ndarray, grid: CellGrid, meta: dict) -> list[Recognition]:
+        cells = [CellImage(c.row, c.col, c.crop(gray)) for c in grid.cells()]
+        chunks = [cells[i:i + self.chunk_size] for i in range(0, len(cells), self.chunk_size)]
+        if self.executor is None or len(chunks) <= 1:
+            results = [_recognize_chunk(self.recognizer, ch) for ch in chunks]
+        else:
+            results = list(self.executor.map(_recognize_chunk, [self.recognizer] * len(chunks), chunks))
+        return [r for chunk in results for r in chunk]
+
+    # ---------------- public ----------------
+    def run(self, img: np.ndarray) -> OcrResult:
+        """画像（BGR / BGRA / グレースケール）から認識結果まで"""
+        meta: dict[str, Any] = {}
+        timings: dict[str, float] = {}
+
+        def timed(name, fn, *args):
+            t0 = time.perf_counter()
+            out = fn(*args, meta)
+            timings[name] = (time.perf_counter() - t0) * 1e3
+            return out
+
+        img = timed("crop", self.stage_crop, img)
+        gray = timed("preprocess", self.stage_preprocess, img)
+        grid = timed("detect_cells", self.stage_detect_cells, gray)
+        recs = timed("recognize", self.stage_recognize, gray, grid)
+        meta["timings_ms"] = timings
+        log.debug("ocr stages: %s", timings)
+        return OcrResult(rows=to_rows(recs, grid.shape), grid=grid, recognitions=recs, meta=meta)
+
+    def cache_params(self) -> dict | None:
+        """
+        結果に効く設定（キャッシュキー用）
+
+        認識器が cache_key を持たない（StubRecognizer など）ときは None（キャッシュしない）。
+        """
+        rec_key = getattr(self.recognizer, "cache_key", None)
+        if rec_key is None:
+            return None
+        return {
+            "cache": CACHE_VERSION,
+            "payload": PAYLOAD_VERSION,
+            "recognizer": list(rec_key),
+            "layout": asdict(self.layout),
+            "crop": self.crop,
+        }
+
+    def cache_key(self, img: np.ndarray) -> tuple[str, dict] | None:
+        """画像の画素と cache_params() から (キー, params) を作る（キャッシュしないときは None）"""
+        params = self.cache_params()
+        if params is None:
+            return None
+        img = np.ascontiguousarray(img)
+        params = {**params, "shape": list(img.shape), "dtype": str(img.dtype)}
+        return build_key(img.reshape(-1).view(np.uint8), params), params
+
+    def to_payload(self, result: OcrResult, target_date: date, meta: dict | None = None) -> OcrImportPayload:
+        """認識結果を OcrImportPayload に組み立てる（meta は呼び出し側の情報を上書きで足す）"""
+        return assemble(result.rows, target_date, self.layout, meta={**result.meta, **(meta or {})})
+
+    def process(self, img: np.ndarray, target_date: date, meta: dict | None = None) -> OcrImportPayload:
+        """run → to_payload をまとめて行う"""
+        return self.to_payload(self.run(img), target_date, meta)
+
+    def run_batch(
+        self,
+        jobs: list[tuple[np.ndarray, date, dict | None]],
+        executor: Executor | None = None,
+    ) -> list[OcrImportPayload]:
+        """
+        複数画像を画像単位で並列に処理する（結果は jobs と同じ順）
+
+        Args:
+            jobs: (画像, 対象日, meta) の並び
+            executor: 画像を振り分けるプール（None なら順に処理）
+        """
+        if executor is None:
+            return [self.process(img, d, m) for img, d, m in jobs]
+        futures = [executor.submit(_process_one, self, img, d, m) for img, d, m in jobs]
+        return [f.result() for f in futures]
+
+
+def make_process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    パイプライン用のプロセスプール
+
+    Qt などのスレッドが動いているプロセスから fork すると固まることがあるので spawn で起動する。
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+# ---------------- process pool workers ----------------
+# プロセスごとに認識器を使い回す（モデルの読み込みは1プロセス1回）
+_LOCAL_RECOGNIZERS: dict[Any, Recognizer] = {}
+
+
+def _recognize_chunk(recognizer: Recognizer, cells: list[CellImage]) -> list[Recognition]:
+    key = getattr(recognizer, "cache_key", None)
+    if key is not None:
+        recognizer = _LOCAL_RECOGNIZERS.setdefault(key, recognizer)
+    return recognizer.recognize(cells)
+
+
+def _process_one(pipeline: OcrPipeline, img: np.ndarray, target_date: date, meta: dict | None) -> OcrImportPayload:
+    key = getattr(pipeline.recognizer, "cache_key", None)
+    if key is not None:
+        pipeline.recognizer = _LOCAL_RECOGNIZERS.setdefault(key, pipeline.recognizer)
+    return pipeline.process(img, target_date, meta)
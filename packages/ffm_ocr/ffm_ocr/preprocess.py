@@ -0,0 +1,102 @@
+# packages/ffm_ocr/ffm_ocr/preprocess.py
+"""前処理ステージ: グレースケール化・傾き補正・タブレット画面の切り出し"""
+import logging
+
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# これより小さい傾きは補正しない（補間でかえって文字がにじむ）
+MIN_SKEW_DEG = 0.3
+# これより大きい傾きは検出ミスとみなす
+MAX_SKEW_DEG = 15.0
+
+
+def to_gray(img: np.ndarray) -> np.ndarray:
+    """BGR / BGRA / グレースケールのどれでも 1ch にして返す"""
+    if img.ndim == 2:
+        return img
+    if img.shape[2] == 4:
+        return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def estimate_skew(gray: np.ndarray) -> float:
+    """
+    表の罫線・文字の並びから傾き（度）を推定する
+
+    罫線・文字を白にした2値画像で、長い線分の角度の中央値を取る。
+    """
+    binary = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10
+    )
+    min_len = max(gray.shape[1] // 8, 20)
+    lines = cv2.HoughLinesP(binary, 1, np.pi / 360, threshold=100, minLineLength=min_len, maxLineGap=5)
+    if lines is None:
+        return 0.0
+    x1, y1, x2, y2 = lines[:, 0, 0], lines[:, 0, 1], lines[:, 0, 2], lines[:, 0, 3]
+    angles = np.degrees(np.arctan2(y2 - y1, x2 - x1))
+    # 横線に近いものだけ（縦線は ±90° 付近）
+    angles = angles[np.abs(angles) < MAX_SKEW_DEG]
+    return float(np.median(angles)) if angles.size else 0.0
+
+
+def deskew(gray: np.ndarray) -> tuple[np.ndarray, float]:
+    """傾きを補正した画像と、補正した角度（度）を返す"""
+    angle = estimate_skew(gray)
+    if abs(angle) < MIN_SKEW_DEG:
+        return gray, 0.0
+    h, w = gray.shape[:2]
+    m = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    rotated = cv2.warpAffine(
+        gray, m, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE
+    )
+    return rotated, angle
+
+
+def crop_tablet_screen(img: np.ndarray) -> tuple[np.ndarray, bool]:
+    """
+    写真からタブレット画面（いちばん大きい四角形）を切り出し、台形補正する
+
+    Returns:
+        (切り出した画像, 四角形が見つかったか)。見つからなければ元の画像を返す
+    """
+    gray = to_gray(img)
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(gray, 50, 150)
+
+    # 輪郭を抽出
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    contours = sorted(contours, key=cv2.contourArea, reverse=True)
+
+    min_area = 0.2 * img.shape[0] * img.shape[1]
+    pts = None
+    for c in contours:
+        if cv2.contourArea(c) < min_area:
+            break  # 以降はもっと小さい
+        peri = cv2.arcLength(c, True)
+        approx = cv2.approxPolyDP(c, 0.02 * peri, True)
+        if len(approx) == 4:  # 4点ならタブレットの枠とみなす
+            pts = _order_corners(approx.reshape(4, 2).astype("float32"))
+            break
+    if pts is None:
+        # 大きい輪郭が無い・どれも四角形でない（スクリーンショットや枠の写っていない写真）
+        log.info("四角形が検出できませんでした（切り出しなし）")
+        return img, False
+
+    # 台形補正（透視変換）
+    (tl, tr, br, bl) = pts
+    width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+    height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+    dst = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype="float32")
+    m = cv2.getPerspectiveTransform(pts, dst)
+    warped = cv2.warpPerspective(img, m, (int(width), int(height)))
+    return warped, True
+
+
+def _order_corners(pts: np.ndarray) -> np.ndarray:
+    """4点を 左上・右上・右下・左下 の順に並べる（approxPolyDP の順序は不定）"""
+    s = pts.sum(axis=1)
+    d = np.diff(pts, axis=1).ravel()
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]], dtype="float32")
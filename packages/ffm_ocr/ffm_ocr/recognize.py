@@ -0,0 +1,107 @@
+# packages/ffm_ocr/ffm_ocr/recognize.py
+"""認識ステージ: セル画像ごとの文字認識（Paddle / オフライン用のスタブ）"""
+import threading
+from dataclasses import dataclass
+from typing import Callable, Protocol
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CellImage:
+    row: int
+    col: int
+    image: np.ndarray
+
+
+@dataclass(frozen=True)
+class Recognition:
+    row: int
+    col: int
+    text: str
+    score: float = 1.0
+
+
+class Recognizer(Protocol):
+    """セル画像の並びを受け取り、同じ順で Recognition を返す"""
+    def recognize(self, cells: list[CellImage]) -> list[Recognition]: ...
+
+
+class StubRecognizer:
+    """
+    画像を見ずに、(row, col) から決まった文字列を返す認識器（オフラインのテスト用）
+
+    プロセスプールに渡せるよう、dict か module レベルの関数で作ること（lambda は pickle できない）。
+
+        StubRecognizer({(0, 1): "9", (1, 0): "客数", (1, 1): "18"})
+        StubRecognizer.from_rows([["", "9", "10"], ["客数", "18", "22"]])
+    """
+    def __init__(self, texts: dict[tuple[int, int], str] | Callable[[int, int], str] | None = None):
+        self.texts = texts or {}
+
+    @classmethod
+    def from_rows(cls, rows: list[list[str]]) -> "StubRecognizer":
+        return cls({(r, c): t for r, row in enumerate(rows) for c, t in enumerate(row)})
+
+    def recognize(self, cells: list[CellImage]) -> list[Recognition]:
+        if callable(self.texts):
+            return [Recognition(c.row, c.col, self.texts(c.row, c.col)) for c in cells]
+        return [Recognition(c.row, c.col, self.texts.get((c.row, c.col), "")) for c in cells]
+
+
+class PaddleRecognizer:
+    """
+    PaddleOCR の認識モデルだけを使う（検出はセル分割で済んでいるので det=False）
+
+    paddleocr の import とモデルの読み込みは最初の recognize() まで遅らせる。
+    モデルはスレッドセーフではないので、同じプロセスの複数スレッド（一括取り込み）からは
+    1つずつ通す（前処理・セル検出は並行に進む）。
+    """
+    def __init__(self, lang: str = "japan", use_gpu: bool = False, min_score: float = 0.0):
+        self.lang = lang
+        self.use_gpu = use_gpu
+        self.min_score = min_score
+        self._ocr = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_key(self):
+        # 同じ設定ならプロセス内で1つの認識器（モデル）を使い回す
+        return ("paddle", self.lang, self.use_gpu, self.min_score)
+
+    def __getstate__(self):
+        # プロセスプールへはモデルを送らない（各プロセスで読み直す）
+        state = self.__dict__.copy()
+        state["_ocr"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _engine(self):
+        if self._ocr is None:
+            from paddleocr import PaddleOCR
+            self._ocr = PaddleOCR(lang=self.lang, use_gpu=self.use_gpu, use_angle_cls=False, show_log=False)
+        return self._ocr
+
+    def recognize(self, cells: list[CellImage]) -> list[Recognition]:
+        if not cells:
+            return []
+        with self._lock:
+            return self._recognize(cells)
+
+    def _recognize(self, cells: list[CellImage]) -> list[Recognition]:
+        ocr = self._engine()
+        out = []
+        for c in cells:
+            if c.image.size == 0:
+                out.append(Recognition(c.row, c.col, "", 0.0))
+                continue
+            res = ocr.ocr(c.image, det=False, cls=False)
+            text, score = res[0][0] if res and res[0] else ("", 0.0)
+            if score < self.min_score:
+                text = ""
+            out.append(Recognition(c.row, c.col, str(text).strip(), float(score)))
+        return out
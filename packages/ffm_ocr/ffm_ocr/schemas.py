@@ -1,10 +1,11 @@
 from __future__ import annotations
+import json
 from dataclasses import dataclass, field
 from datetime import date
 from typing import Dict, List, Literal, Optional, Any
 
 Hour = int                        # 0..23
-Metric = Literal["prep","sales","waste","display"]  # 仕込み/販売/廃棄/陳列
+Metric = Literal["prepared","sold","discarded","stock"]  # 仕込み/販売/廃棄/陳列（ff_manager の ITEM_METRICS と同じ）
 ByHour = Dict[Hour, int]          # {9: 12, 10: 7, ...}
 
 @dataclass
@@ -21,3 +22,63 @@ class OcrImportPayload:
     customers_by_hour: ByHour     # 客数（時間別）
     products: List[ProductSeries] # 複数商品に対応
     meta: Dict[str, Any] = field(default_factory=dict)  # 画像ID/信頼度など
+
+
+# ---------------- JSON ----------------
+# OCR キャッシュや CLI の出力で使う。JSON のキーは文字列になるので、読み戻すときに時刻を int に戻す。
+
+def payload_to_dict(p: OcrImportPayload) -> Dict[str, Any]:
+    return {
+        "version": p.version,
+        "date": p.date.isoformat(),
+        "customers_by_hour": {str(h): int(v) for h, v in p.customers_by_hour.items()},
+        "products": [
+            {
+                "name": s.name,
+                "by_metric": {m: {str(h): int(v) for h, v in hv.items()} for m, hv in s.by_metric.items()},
+                "sku": s.sku,
+                "notes": s.notes,
+            }
+            for s in p.products
+        ],
+        "meta": p.meta,
+    }
+
+
+def payload_from_dict(d: Dict[str, Any]) -> OcrImportPayload:
+    return OcrImportPayload(
+        version=str(d["version"]),
+        date=date.fromisoformat(d["date"]),
+        customers_by_hour=_by_hour(d.get("customers_by_hour")),
+        products=[
+            ProductSeries(
+                name=s["name"],
+                by_metric={m: _by_hour(hv) for m, hv in (s.get("by_metric") or {}).items()},
+                sku=s.get("sku"),
+                notes=s.get("notes"),
+            )
+            for s in d.get("products") or []
+        ],
+        meta=dict(d.get("meta") or {}),
+    )
+
+
+def dumps_payload(p: OcrImportPayload) -> str:
+    return json.dumps(payload_to_dict(p), ensure_ascii=False, default=_json_default)
+
+
+def loads_payload(text: str) -> OcrImportPayload:
+    return payload_from_dict(json.loads(text))
+
+
+def _by_hour(d: Optional[Dict[Any, Any]]) -> ByHour:
+    return {int(h): int(v) for h, v in (d or {}).items()}
+
+
+def _json_default(o: Any) -> Any:
+    # meta に混ざる numpy のスカラー・配列など
+    if hasattr(o, "tolist"):
+        return o.tolist()
+    if isinstance(o, (set, frozenset)):
+        return sorted(o)
+    raise TypeError(f"JSON にできない値です: {type(o).__name__}")
@@ -0,0 +1,130 @@
+# packages/ffm_ocr/ffm_ocr/sqlite_sink.py
+"""
+OcrImportPayload を FF Manager の DB（fact_* 表）へ直接書き込む（sqlite3 版）
+
+GUI を使わない取り込み（ffm-ocr --db）用。1枚分を1トランザクションで
+時間別（商品・客数）を UPSERT し、その日の日次サマリを作り直す。
+同じ payload を何度書いても結果は変わらない。
+
+表の定義は ff_manager.db.migrations、日次の集計は ff_manager.db.aggregate と同じ。
+"""
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ffm_ocr.schemas import OcrImportPayload
+
+METRICS = ("prepared", "sold", "discarded", "stock")
+
+# 商品名 → item_id（IN の中身は呼び出し側で ? を並べる）
+ITEM_IDS_SQL = "SELECT item_name, item_id FROM items WHERE item_name IN ({marks})"
+
+HOURLY_UPSERT_SQL = """
+INSERT INTO fact_hourly_long(date,hour,item_id,metric,value)
+VALUES(?,?,?,?,?)
+ON CONFLICT(date,hour,item_id,metric) DO UPDATE SET value=excluded.value
+"""
+CUSTOMER_UPSERT_SQL = """
+INSERT INTO fact_hourly_customer(date,hour,customer_count)
+VALUES(?,?,?)
+ON CONFLICT(date,hour) DO UPDATE SET customer_count=excluded.customer_count
+"""
+
+# ff_manager.db.aggregate.DAILY_PRODUCTS_SELECT / UPSERT と同じ集計（stock_end は最後の時間帯の stock）
+DAILY_ROLLUP_SQL = """
+INSERT INTO fact_daily(date,item_id,prepared,sold,discarded,stock_end)
+SELECT
+  h.date, h.item_id,
+  SUM(CASE WHEN h.metric='prepared'  THEN h.value ELSE 0 END),
+  SUM(CASE WHEN h.metric='sold'      THEN h.value ELSE 0 END),
+  SUM(CASE WHEN h.metric='discarded' THEN h.value ELSE 0 END),
+  COALESCE((
+    SELECT h2.value FROM fact_hourly_long h2
+    WHERE h2.date = h.date AND h2.item_id = h.item_id AND h2.metric='stock'
+    ORDER BY h2.hour DESC LIMIT 1
+  ), 0)
+FROM fact_hourly_long h
+WHERE h.date = ? AND h.item_id IN ({marks})
+GROUP BY h.date, h.item_id
+ON CONFLICT(date, item_id) DO UPDATE SET
+  prepared  = excluded.prepared,
+  sold      = excluded.sold,
+  discarded = excluded.discarded,
+  stock_end = excluded.stock_end
+"""
+DAILY_CUSTOMER_ROLLUP_SQL = """
+INSERT INTO fact_daily_customer(date, customer_count)
+SELECT ?, COALESCE(SUM(customer_count), 0) FROM fact_hourly_customer WHERE date = ?
+ON CONFLICT(date) DO UPDATE SET customer_count = excluded.customer_count
+"""
+
+
+def marks(n: int) -> str:
+    return ",".join("?" * n)
+
+
+@dataclass
+class SinkResult:
+    date: str
+    item_ids: list[int] = field(default_factory=list)
+    rows: int = 0                                          # 時間別に書いた行数（商品＋客数）
+    unknown_products: list[str] = field(default_factory=list)   # items に無くて書けなかった商品名
+
+
+def hourly_rows(payload: OcrImportPayload, ids: dict[str, int]) -> list[tuple[str, int, int, str, int]]:
+    """fact_hourly_long に書く (date, hour, item_id, metric, value)（items に無い商品・未知のメトリクスは除く）"""
+    d = payload.date.isoformat()
+    return [
+        (d, int(h), ids[p.name], m, int(v))
+        for p in payload.products if p.name in ids
+        for m, by_hour in p.by_metric.items() if m in METRICS
+        for h, v in by_hour.items()
+    ]
+
+
+class SqliteSink:
+    def __init__(self, conn: sqlite3.Connection | str | Path):
+        """
+        Args:
+            conn: sqlite3 の接続、または DB ファイルのパス（migrations 済みであること）
+        """
+        self._owns = not isinstance(conn, sqlite3.Connection)
+        self.conn = sqlite3.connect(conn, timeout=5.0) if self._owns else conn
+        self.conn.execute("PRAGMA foreign_keys=ON")
+
+    def close(self) -> None:
+        if self._owns:
+            self.conn.close()
+
+    def resolve_items(self, names) -> dict[str, int]:
+        """商品名 → item_id を1回の SELECT で引く"""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        cur = self.conn.execute(ITEM_IDS_SQL.format(marks=marks(len(names))), names)
+        return {str(name): int(item_id) for name, item_id in cur}
+
+    def write(self, payload: OcrImportPayload) -> SinkResult:
+        """1枚分を1トランザクションで書き込み、日次サマリまで更新する"""
+        d = payload.date.isoformat()
+        ids = self.resolve_items(p.name for p in payload.products)
+        result = SinkResult(
+            date=d,
+            item_ids=sorted({ids[p.name] for p in payload.products if p.name in ids}),
+            unknown_products=[p.name for p in payload.products if p.name not in ids],
+        )
+        hourly = hourly_rows(payload, ids)
+        customers = [(d, int(h), int(c)) for h, c in payload.customers_by_hour.items()]
+
+        with self.conn:
+            if hourly:
+                self.conn.executemany(HOURLY_UPSERT_SQL, hourly)
+            if customers:
+                self.conn.executemany(CUSTOMER_UPSERT_SQL, customers)
+            if result.item_ids:
+                self.conn.execute(
+                    DAILY_ROLLUP_SQL.format(marks=marks(len(result.item_ids))), [d, *result.item_ids])
+            if customers:
+                self.conn.execute(DAILY_CUSTOMER_ROLLUP_SQL, (d, d))
+        result.rows = len(hourly) + len(customers)
+        return result
@@ -1,20 +1,20 @@
 # config.py
 import os
-from matplotlib import rcParams, font_manager
+from pathlib import Path
 
 TEST_MODE = os.getenv("TEST_MODE", "0") == "1"
 OCR_TEST = os.getenv("OCR_TEST", "0") == "1"
 
-# --- 環境ごとのフォント設定 ---
-if os.name == "nt":  # Windows
-    FONT_PATH = "C:/Windows/Fonts/meiryo.ttc"
-elif os.name == "posix":  # macOS/Linux
-    FONT_PATH = "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc"  # Macの例
-else:
-    FONT_PATH = None
+# --- フォント・キャッシュ ---
+# 日本語フォントのファイルを固定したいときだけ指定（未指定なら ui/utils/fonts.py が探す）
+FONT_PATH = os.getenv("FFM_FONT_PATH") or None
 
-if FONT_PATH and os.path.exists(FONT_PATH):
-    rcParams["font.family"] = font_manager.FontProperties(fname=FONT_PATH).get_name()
+# フォント解決結果などを置くディレクトリ
+if os.name == "nt":
+    _default_cache = Path(os.getenv("LOCALAPPDATA") or Path.home() / "AppData" / "Local") / "ff_manager"
+else:
+    _default_cache = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "ff_manager"
+CACHE_DIR = Path(os.getenv("FFM_CACHE_DIR") or _default_cache)
 
 
 
@@ -26,6 +26,18 @@ WINDOW_SIZE = [900,550]
 
 TABLE = "items"
 
+# 編集画面の読み込みキャッシュ（LRU）の上限（MB）
+METRICS_CACHE_MB = int(os.getenv("FFM_METRICS_CACHE_MB", "32"))
+
+# OCR 結果のキャッシュ（DB の ocr_cache 表）の上限（MB）と、使われずに残す日数
+OCR_CACHE_MB = int(os.getenv("FFM_OCR_CACHE_MB", "16"))
+OCR_CACHE_DAYS = int(os.getenv("FFM_OCR_CACHE_DAYS", "90"))
+# 一括取り込みで同時に処理する画像の枚数
+OCR_BATCH_WORKERS = int(os.getenv("FFM_OCR_BATCH_WORKERS", "2"))
+# 取り込み画面のプレビューの幅（px）と、覚えておくプレビューの枚数
+IMAGE_PREVIEW_WIDTH = int(os.getenv("FFM_IMAGE_PREVIEW_WIDTH", "600"))
+IMAGE_PREVIEW_CACHE = int(os.getenv("FFM_IMAGE_PREVIEW_CACHE", "16"))
+
 
 HEADER_JP = {
     "log_id":"log ID",
@@ -14,6 +14,9 @@ TAB_INDEX = {
 # 時間帯(0-23)
 HOURS=list(range(24))
 
+# 合計列のインデックス（日次粒度の時系列でも、この位置に1日分の値を入れる）
+TOTAL_COL=len(HOURS)
+
 # 商品系メトリクス
 ITEM_METRICS=["prepared","sold","discarded","stock"]
 ITEM_LABELS_JA = {
@@ -1,4 +1,5 @@
 # db/aggregate.py
+import threading
 from PySide6.QtSql import QSqlQuery
 
 # --- 日付ユーティリティ（YYYY-MM-DD に正規化：2025/1/2 → 2025-01-02） ---
@@ -12,6 +13,40 @@ def normalize_date(s: str) -> str:
     except Exception:
         return ""
 
+# --- 商品ごと日次の集計 ---
+# stock_end は「最後の時間帯の stock」。相関サブクエリは v6 の
+# idx_fhl_rollup(date, item_id, metric, hour, value) を (date, item_id, 'stock') で
+# 後ろから1件引くだけになり、集計側も同じインデックスだけで読める（表本体は参照しない）。
+# (hour << 32) | value の MAX を取る1パス版やウィンドウ関数版はインデックスありだとこれより遅い
+# （tests_scripts/bench/daily_rollup.py）。
+DAILY_PRODUCTS_SELECT = """
+    SELECT
+      h.date, h.item_id,
+      SUM(CASE WHEN h.metric='prepared'  THEN h.value ELSE 0 END) AS prepared,
+      SUM(CASE WHEN h.metric='sold'      THEN h.value ELSE 0 END) AS sold,
+      SUM(CASE WHEN h.metric='discarded' THEN h.value ELSE 0 END) AS discarded,
+      COALESCE((
+        SELECT h2.value
+        FROM fact_hourly_long h2
+        WHERE h2.date = h.date AND h2.item_id = h.item_id AND h2.metric='stock'
+        ORDER BY h2.hour DESC
+        LIMIT 1
+      ), 0) AS stock_end
+    FROM fact_hourly_long h
+    WHERE {where}
+    GROUP BY h.date, h.item_id
+"""
+
+DAILY_PRODUCTS_UPSERT = """
+    INSERT INTO fact_daily(date,item_id,prepared,sold,discarded,stock_end)
+    {select}
+    ON CONFLICT(date, item_id) DO UPDATE SET
+      prepared  = excluded.prepared,
+      sold      = excluded.sold,
+      discarded = excluded.discarded,
+      stock_end = excluded.stock_end
+"""
+
 # --- 指定日の「商品ごと日次」を再計算（UPSERT） ---
 def rebuild_daily_products_for_date(db, date_iso: str) -> bool:
     """
@@ -21,29 +56,8 @@ def rebuild_daily_products_for_date(db, date_iso: str) -> bool:
     if not date_iso:
         return False
     q = QSqlQuery(db)
-    q.prepare("""
-        INSERT INTO fact_daily(date,item_id,prepared,sold,discarded,stock_end)
-        SELECT
-          h.date, h.item_id,
-          SUM(CASE WHEN h.metric='prepared'  THEN h.value ELSE 0 END) AS prepared,
-          SUM(CASE WHEN h.metric='sold'      THEN h.value ELSE 0 END) AS sold,
-          SUM(CASE WHEN h.metric='discarded' THEN h.value ELSE 0 END) AS discarded,
-          COALESCE((
-            SELECT h2.value
-            FROM fact_hourly_long h2
-            WHERE h2.date = h.date AND h2.item_id = h.item_id AND h2.metric='stock'
-            ORDER BY h2.hour DESC
-            LIMIT 1
-          ), 0) AS stock_end
-        FROM fact_hourly_long h
-        WHERE h.date = :d
-        GROUP BY h.date, h.item_id
-        ON CONFLICT(date, item_id) DO UPDATE SET
-          prepared  = excluded.prepared,
-          sold      = excluded.sold,
-          discarded = excluded.discarded,
-          stock_end = excluded.stock_end
-    """)
+    q.prepare(DAILY_PRODUCTS_UPSERT.format(
+        select=DAILY_PRODUCTS_SELECT.format(where="h.date = :d")))
     q.bindValue(":d", date_iso)
     return q.exec()
 
@@ -67,6 +81,101 @@ def rebuild_daily_customer_for_date(db, date_iso: str) -> bool:
     q.bindValue(":d", date_iso)
     return q.exec()
 
+# --- 書き込みで変わった範囲（dirty set） ---
+class DailyDirtySet:
+    """
+    fact_hourly_long / fact_hourly_customer への書き込みで古くなった
+    (date, item_id) と date を覚えておく。rebuild_daily_dirty で消化する。
+    ワーカースレッドからも書き込まれるのでロックで保護する。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: dict[str, set[int]] = {}
+        self._customer_dates: set[str] = set()
+
+    def mark_items(self, date_iso: str, item_ids) -> None:
+        with self._lock:
+            self._items.setdefault(date_iso, set()).update(int(i) for i in item_ids)
+
+    def mark_customer(self, date_iso: str) -> None:
+        with self._lock:
+            self._customer_dates.add(date_iso)
+
+    def take(self) -> tuple[dict[str, set[int]], set[str]]:
+        """溜まっている分を取り出して空にする"""
+        with self._lock:
+            items, dates = self._items, self._customer_dates
+            self._items, self._customer_dates = {}, set()
+        return items, dates
+
+    def restore(self, items: dict[str, set[int]], dates: set[str]) -> None:
+        """take した分を戻す（再計算に失敗したとき用）"""
+        with self._lock:
+            for d, ids in items.items():
+                self._items.setdefault(d, set()).update(ids)
+            self._customer_dates.update(dates)
+
+    def __bool__(self) -> bool:
+        with self._lock:
+            return bool(self._items or self._customer_dates)
+
+# プロセス内で共有する dirty set（リポジトリの書き込みがここに記録する）
+DAILY_DIRTY = DailyDirtySet()
+
+# --- 指定日の指定商品だけ「商品ごと日次」を再計算（UPSERT） ---
+def rebuild_daily_products_for_items(db, date_iso: str, item_ids) -> bool:
+    """
+    fact_hourly_long → fact_daily を (date_iso, item_ids) の組だけ再計算してUPSERT。
+    時間別の行が無くなった組は fact_daily からも消す。
+    戻り値: 成否（True/False）
+    """
+    if not date_iso:
+        return False
+    ids = ",".join(str(int(i)) for i in item_ids)
+    if not ids:
+        return True
+    q = QSqlQuery(db)
+    q.prepare(DAILY_PRODUCTS_UPSERT.format(
+        select=DAILY_PRODUCTS_SELECT.format(where=f"h.date = :d AND h.item_id IN ({ids})")))
+    q.bindValue(":d", date_iso)
+    if not q.exec():
+        return False
+    q = QSqlQuery(db)
+    q.prepare(f"""
+        DELETE FROM fact_daily
+        WHERE date = :d AND item_id IN ({ids})
+          AND NOT EXISTS (
+            SELECT 1 FROM fact_hourly_long h
+            WHERE h.date = fact_daily.date AND h.item_id = fact_daily.item_id
+          )
+    """)
+    q.bindValue(":d", date_iso)
+    return q.exec()
+
+# --- 書き込みで古くなった分だけ再計算 ---
+def rebuild_daily_dirty(db, dirty: DailyDirtySet = DAILY_DIRTY) -> bool:
+    """
+    dirty set に溜まった (date, item_id) / date だけ fact_daily / fact_daily_customer を更新。
+    トランザクションでまとめ、失敗したら dirty set に戻す。
+    """
+    items, dates = dirty.take()
+    if not items and not dates:
+        return True
+    db.transaction()
+    try:
+        for d, ids in items.items():
+            if not rebuild_daily_products_for_items(db, d, ids):
+                raise RuntimeError("daily rebuild failed")
+        for d in dates:
+            if not rebuild_daily_customer_for_date(db, d):
+                raise RuntimeError("daily rebuild failed")
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        dirty.restore(items, dates)
+        return False
+
 # --- まとめて（指定日） ---
 def rebuild_daily_for_date(db, date_iso: str) -> bool:
     """
@@ -89,27 +198,16 @@ def rebuild_daily_for_date(db, date_iso: str) -> bool:
 
 # --- 全期間を作り直す（必要な時だけ手動で呼ぶ） ---
 def rebuild_daily_all(db) -> bool:
+    # 全期間作り直すので溜まっている dirty は不要
+    DAILY_DIRTY.take()
     q = QSqlQuery(db)
     ok = q.exec("DELETE FROM fact_daily") and q.exec("DELETE FROM fact_daily_customer")
     if not ok:
         return False
     # 商品サマリ全期間
-    ok = q.exec("""
-        INSERT INTO fact_daily(date,item_id,prepared,sold,discarded,stock_end)
-        SELECT
-          h.date, h.item_id,
-          SUM(CASE WHEN h.metric='prepared'  THEN h.value ELSE 0 END),
-          SUM(CASE WHEN h.metric='sold'      THEN h.value ELSE 0 END),
-          SUM(CASE WHEN h.metric='discarded' THEN h.value ELSE 0 END),
-          COALESCE((
-            SELECT h2.value
-            FROM fact_hourly_long h2
-            WHERE h2.date=h.date AND h2.item_id=h.item_id AND h2.metric='stock'
-            ORDER BY h2.hour DESC LIMIT 1
-          ),0)
-        FROM fact_hourly_long h
-        GROUP BY h.date, h.item_id
-    """)
+    ok = q.exec(
+        "INSERT INTO fact_daily(date,item_id,prepared,sold,discarded,stock_end)"
+        + DAILY_PRODUCTS_SELECT.format(where="1"))
     if not ok:
         return False
     # 客数サマリ全期間
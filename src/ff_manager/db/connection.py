@@ -1,32 +1,171 @@
 # db/connection.py
 import sqlite3
+import threading
+from dataclasses import dataclass
+from PySide6.QtCore import Qt, QThread
 from PySide6.QtSql import QSqlDatabase,QSqlQuery
 from ff_manager.config import DB_PATH
 from pathlib import Path
 
 
-def get_db(db_path: str) -> QSqlDatabase:
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """
+    SQLite 接続時に流す PRAGMA のセット（QSqlDatabase / sqlite3 共通）
+
+    既定値は WAL + synchronous=NORMAL。OCR のワーカーが書き込んでいる間も
+    UI 側の読み込みが "database is locked" で止まらないようにする。
+    """
+    journal_mode: str = "WAL"          # DELETE / TRUNCATE / PERSIST / MEMORY / WAL / OFF
+    synchronous: str = "NORMAL"        # OFF / NORMAL / FULL / EXTRA
+    mmap_size: int = 256 * 1024 * 1024 # バイト（0 で無効）
+    cache_size_kib: int = 64 * 1024    # ページキャッシュ（KiB）
+    temp_store: str = "MEMORY"         # DEFAULT / FILE / MEMORY
+    busy_timeout_ms: int = 5000        # ロック待ちの上限
+    foreign_keys: bool = True
+
+    def pragmas(self) -> list[str]:
+        """適用順に並べた PRAGMA 文を返す"""
+        _check("journal_mode", self.journal_mode, {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"})
+        _check("synchronous", self.synchronous, {"OFF", "NORMAL", "FULL", "EXTRA"})
+        _check("temp_store", self.temp_store, {"DEFAULT", "FILE", "MEMORY"})
+        return [
+            # busy_timeout を最初に：journal_mode の切り替え自体がロック待ちになることがある
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            f"PRAGMA cache_size={-int(self.cache_size_kib)}",  # 負数は KiB 指定
+            f"PRAGMA temp_store={self.temp_store}",
+            f"PRAGMA foreign_keys={'ON' if self.foreign_keys else 'OFF'}",
+        ]
+
+
+def _check(name: str, value: str, allowed: set[str]) -> None:
+    # PRAGMA はバインドできないので値をここで検証する
+    if value.upper() not in allowed:
+        raise ValueError(f"invalid {name}: {value!r}")
+
+
+# 既定のプロファイル（アプリ全体で使う）
+DEFAULT_PROFILE = ConnectionProfile()
+
+
+def apply_profile(conn, profile: ConnectionProfile = DEFAULT_PROFILE) -> None:
+    """
+    開いている接続に PRAGMA を適用する
+
+    Args:
+        conn (QSqlDatabase | sqlite3.Connection): 対象の接続
+        profile (ConnectionProfile): 適用する設定
+    """
+    if isinstance(conn, sqlite3.Connection):
+        for sql in profile.pragmas():
+            conn.execute(sql)
+        return
+    for sql in profile.pragmas():
+        q = QSqlQuery(conn)
+        if not q.exec(sql):
+            raise RuntimeError(f"{sql}: {q.lastError().text()}")
+
+
+def get_db(db_path: str, profile: ConnectionProfile = DEFAULT_PROFILE) -> QSqlDatabase:
     db = QSqlDatabase.addDatabase("QSQLITE")
     db.setDatabaseName(db_path)
+    # ドライバ側のロック待ち（PRAGMA busy_timeout と同じ値）
+    db.setConnectOptions(f"QSQLITE_BUSY_TIMEOUT={int(profile.busy_timeout_ms)}")
     if not db.open():
         raise RuntimeError("データベースを開けませんでした。")
 
-    # SQLiteの外部キー制約を有効化（必ず最初に一回）
-    QSqlQuery(db).exec("PRAGMA foreign_keys=ON")
+    # 外部キー制約・WAL などの設定（必ず最初に一回）
+    apply_profile(db, profile)
     return db
 
 
-def get_sqlite_connection(db_path: str | None = None) -> sqlite3.Connection:
+class ConnectionManager:
+    """
+    スレッドごとに名前付きの QSqlDatabase を払い出す。
+
+    QSqlDatabase は作成したスレッドでしか使えないため、QThreadPool のワーカーは
+    GUI スレッドの db ではなく connection() で自分用の接続を取る。
+    接続はスレッド終了（QThread.finished）のときにそのスレッド上で閉じて登録を外す。
+    他のスレッドからは閉じられない（Qt 6 は別スレッドからの QSqlDatabase.database(name) を拒む）ので、
+    終了時はプールを止めて（QThreadPool.waitForDone でワーカースレッドが終わる）から close_all() を呼ぶ。
+    """
+    def __init__(self, db_path: str, profile: ConnectionProfile = DEFAULT_PROFILE, prefix: str = "ffm"):
+        self.db_path = db_path
+        self.profile = profile
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._names: set[str] = set()
+
+    def connection(self) -> QSqlDatabase:
+        """呼び出し元スレッド専用の接続を返す（無ければ開く）"""
+        name = f"{self.prefix}-{threading.get_ident()}"
+        if QSqlDatabase.contains(name):
+            db = QSqlDatabase.database(name, False)
+            if db.isOpen():
+                return db
+            db = None
+            QSqlDatabase.removeDatabase(name)
+
+        db = QSqlDatabase.addDatabase("QSQLITE", name)
+        db.setDatabaseName(self.db_path)
+        db.setConnectOptions(f"QSQLITE_BUSY_TIMEOUT={int(self.profile.busy_timeout_ms)}")
+        if not db.open():
+            err = db.lastError().text()
+            db = None
+            QSqlDatabase.removeDatabase(name)
+            raise RuntimeError(f"データベースを開けませんでした。({err})")
+        apply_profile(db, self.profile)
+
+        with self._lock:
+            self._names.add(name)
+        # スレッド終了時にそのスレッド上で後始末する
+        thread = QThread.currentThread()
+        if thread is not None:
+            thread.finished.connect(lambda: self._release(name), Qt.DirectConnection)
+        return db
+
+    def close_all(self) -> None:
+        """
+        払い出した接続が残っていないことを確かめる（アプリ終了時に GUI スレッドから呼ぶ）
+
+        接続は各ワーカースレッドの終了時に閉じられるので、ここでは閉じない。
+        接続を使うプールをすべて waitForDone してから呼ぶこと。
+        """
+        with self._lock:
+            names = sorted(self._names)
+        assert not names, f"ワーカーの接続が閉じられていません（プールが止まっていない）: {names}"
+
+    def _release(self, name: str) -> None:
+        # 接続を開いたスレッド（の QThread.finished）から呼ばれる
+        with self._lock:
+            if name not in self._names:
+                return
+            self._names.discard(name)
+        if QSqlDatabase.contains(name):
+            db = QSqlDatabase.database(name, False)
+            db.close()
+            del db  # 参照が残っていると removeDatabase が警告する
+            QSqlDatabase.removeDatabase(name)
+
+
+def get_sqlite_connection(
+    db_path: str | None = None, profile: ConnectionProfile = DEFAULT_PROFILE
+) -> sqlite3.Connection:
     """
     SQLiteの接続を返す。存在しない場合は新規作成。
 
     Args:
         db_path (str | None): データベースファイルパス（Noneなら config.DB_PATH）
+        profile (ConnectionProfile): 接続直後に適用する PRAGMA 設定
 
     Returns:
         sqlite3.Connection
     """
     path = Path(db_path or DB_PATH)
-    conn = sqlite3.connect(path)
+    conn = sqlite3.connect(path, timeout=profile.busy_timeout_ms / 1000)
     conn.row_factory = sqlite3.Row  # カラム名でアクセス可能に
-    return conn
\ No newline at end of file
+    apply_profile(conn, profile)
+    return conn
@@ -73,6 +73,34 @@ def ensure_schema_and_migrate(db, table: str):
             )""")
             _set_schema_version(db, 5); cur = 5
 
+        # v6: 日次ロールアップ用のカバリングインデックス
+        if cur < 6:
+            q.exec("""
+            CREATE INDEX IF NOT EXISTS idx_fhl_rollup
+                ON fact_hourly_long(date, item_id, metric, hour, value)""")
+            _set_schema_version(db, 6); cur = 6
+
+        # v7: OCR 結果のキャッシュ（画像の中身＋設定のハッシュがキー）
+        #     旧版の ocr_cache（image_path / result）は使われていなかったので作り直す
+        if cur < 7:
+            q.exec("PRAGMA table_info(ocr_cache)")
+            cols = set()
+            while q.next():
+                cols.add(str(q.value(1)))
+            if cols and "cache_key" not in cols:
+                q.exec("DROP TABLE ocr_cache")
+            q.exec("""
+            CREATE TABLE IF NOT EXISTS ocr_cache(
+                cache_key TEXT PRIMARY KEY,
+                params TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at INTEGER NOT NULL,
+                last_used INTEGER NOT NULL
+            )""")
+            q.exec("CREATE INDEX IF NOT EXISTS idx_ocr_cache_last_used ON ocr_cache(last_used)")
+            _set_schema_version(db, 7); cur = 7
+
         db.commit()
     except Exception as e:
         db.rollback()
@@ -14,6 +14,16 @@ class ItemsRepository:
             names.append(str(q.value(0)))
         return names
 
+    def list_items(self) -> list[tuple[int, str]]:
+        """(item_id, item_name) を item_name 順で返す"""
+        items = []
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        q.exec("SELECT item_id, item_name FROM items ORDER BY item_name")
+        while q.next():
+            items.append((int(q.value(0)), str(q.value(1))))
+        return items
+
     def get_item_id_by_name(self,name: str) -> int | None:
         q = QSqlQuery(self.db)
         q.prepare("SELECT item_id FROM items WHERE item_name=:n")
@@ -21,6 +31,23 @@ class ItemsRepository:
         q.exec()
         return int(q.value(0)) if q.next() else None
 
+    def get_item_ids_by_names(self, names) -> dict[str, int]:
+        """商品名 → item_id を1回の SELECT で引く（登録されていない名前は含まれない）"""
+        names = list(dict.fromkeys(str(n) for n in names))
+        if not names:
+            return {}
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        q.prepare(f"SELECT item_name, item_id FROM items WHERE item_name IN ({','.join('?' * len(names))})")
+        for n in names:
+            q.addBindValue(n)
+        if not q.exec():
+            raise RuntimeError(q.lastError().text())
+        out: dict[str, int] = {}
+        while q.next():
+            out[str(q.value(0))] = int(q.value(1))
+        return out
+
     def get_item_by_id(self, item_id: int) -> dict | None:
         q = QSqlQuery(self.db)
         q.prepare("""
@@ -1,12 +1,27 @@
 # src/ff_manager/db/repositories/metrics_repo.py
 from __future__ import annotations
-from typing import Dict
+from datetime import date
+from typing import Dict, Iterator
+import numpy as np
 from PySide6.QtSql import QSqlQuery
 
+from ff_manager.db.aggregate import DAILY_DIRTY
 from ff_manager.core.constants import (
     HOURS,ITEM_METRICS,ITEM_LABELS_JA,ITEM_ROW,SUMMARY_ROWS,SUMMARY_ROW,SUMMARY_LABELS_JA
     )
 
+# fact_daily の列名（metric -> column）。SQLに埋め込むのでここで固定する
+DAILY_COLUMNS = {
+    "prepared": "prepared",
+    "sold": "sold",
+    "discarded": "discarded",
+    "stock": "stock_end",
+}
+
+# metric -> 行番号 を SQL 側で計算する式（ITEM_ROW と同じ並び）
+_METRIC_ROW_SQL = "CASE metric " + " ".join(
+    f"WHEN '{m}' THEN {r}" for m, r in ITEM_ROW.items()) + " END"
+
 class MetricsRepository:
     def __init__(self, db):
         self.db = db
@@ -45,7 +60,7 @@ class MetricsRepository:
             out[m][h]=v
         return out
 
-    def upsert_item_metrics(self, date_iso: str, item_id: int, data: Dict[str, Dict[int, int]]) -> None:
+    def upsert_item_metrics(self, date_iso: str, item_id: int, data: Dict[str, Dict[int, int]]) -> int:
         """
         商品の時間ごとの値を INSERT/UPDATE (UPSERT) する
 
@@ -53,22 +68,78 @@ class MetricsRepository:
             date_iso (str): 'YYYY-MM-DD' 形式の日付
             item_id (int): 対象商品のID
             data (Dict[str, Dict[int, int]]):商品の時間別メトリクス
+
+        Returns:
+            int: 実際に書き込んだ行数（値が変わっていないセルは書かない）
+        """
+        return self.upsert_item_metrics_bulk(date_iso, {item_id: data})
+
+    def upsert_item_metrics_bulk(
+        self, date_iso: str, data_by_item: Dict[int, Dict[str, Dict[int, int]]]
+    ) -> int:
         """
+        複数商品の時間別メトリクスを execBatch でまとめて UPSERT する
+
+        既存値を1回のSELECTで読み、値が変わったセルだけを書き込む。
+        トランザクションは呼び出し側で張ること。
+
+        Args:
+            date_iso (str): 'YYYY-MM-DD' 形式の日付
+            data_by_item (Dict[int, Dict[str, Dict[int, int]]]): {item_id: {metric: {hour: value}}}
+
+        Returns:
+            int: 実際に書き込んだ行数
+        """
+        if not data_by_item:
+            return 0
+        current = self._fetch_hourly_values(date_iso, list(data_by_item))
+
+        hours, items, metrics, values = [], [], [], []
+        for item_id, data in data_by_item.items():
+            for m, by_hour in data.items():
+                if m not in ITEM_METRICS:
+                    raise ValueError(f"Unknown metric '{m}' for item {item_id}")
+                for h, v in by_hour.items():
+                    if current.get((item_id, m, h)) == v:
+                        continue
+                    hours.append(int(h)); items.append(int(item_id))
+                    metrics.append(m); values.append(int(v))
+        if not values:
+            return 0
+
         q = QSqlQuery(self.db)
         q.prepare("""
             INSERT INTO fact_hourly_long(date,hour,item_id,metric,value)
-            VALUES(:d,:h,:it,:m,:v)
+            VALUES(?,?,?,?,?)
             ON CONFLICT(date,hour,item_id,metric) DO UPDATE SET value=excluded.value
         """)
-        for m, by_hour in data.items():
-            for h, v in by_hour.items():
-                q.bindValue(":d", date_iso)
-                q.bindValue(":h", h)
-                q.bindValue(":it", item_id)
-                q.bindValue(":m", m)
-                q.bindValue(":v", v)
-                if not q.exec():
-                    raise RuntimeError(q.lastError().text())
+        q.addBindValue([date_iso] * len(values))
+        q.addBindValue(hours)
+        q.addBindValue(items)
+        q.addBindValue(metrics)
+        q.addBindValue(values)
+        if not q.execBatch():
+            raise RuntimeError(q.lastError().text())
+        DAILY_DIRTY.mark_items(date_iso, set(items))
+        return len(values)
+
+    def _fetch_hourly_values(self, date_iso: str, item_ids: list[int]) -> Dict[tuple[int, str, int], int]:
+        """指定日・商品群の既存値を {(item_id, metric, hour): value} で返す"""
+        ids = ",".join(str(int(i)) for i in item_ids)
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        q.prepare(f"""
+            SELECT item_id, metric, hour, value
+            FROM fact_hourly_long
+            WHERE date=:d AND item_id IN ({ids})
+        """)
+        q.bindValue(":d", date_iso)
+        if not q.exec():
+            raise RuntimeError(q.lastError().text())
+        out: Dict[tuple[int, str, int], int] = {}
+        while q.next():
+            out[(int(q.value(0)), str(q.value(1)), int(q.value(2)))] = int(q.value(3))
+        return out
 
     # ---------- 客数（時間別/日別） ----------
     def fetch_hourly_customers(self, date_iso: str) -> Dict[int, int]:
@@ -90,26 +161,35 @@ class MetricsRepository:
             out[int(q.value(0))] = int(q.value(1))
         return out
 
-    def upsert_hourly_customers(self, date_iso: str, by_hour: Dict[int, int]) -> None:
+    def upsert_hourly_customers(self, date_iso: str, by_hour: Dict[int, int]) -> int:
         """
         時間別の客数をINSERT/UPDATE (UPSERT)する
 
         Args:
             date_iso (str): 'YYYY-MM-DD' 形式の日付
             by_hour (Dict[int,int]):時間別客数データ 例{9: 12, 10: 5}
+
+        Returns:
+            int: 実際に書き込んだ行数（値が変わっていない時間帯は書かない）
         """
+        current = self.fetch_hourly_customers(date_iso)
+        changed = [(int(h), int(c)) for h, c in by_hour.items() if current.get(h) != c]
+        if not changed:
+            return 0
+
         q = QSqlQuery(self.db)
         q.prepare("""
             INSERT INTO fact_hourly_customer(date,hour,customer_count)
-            VALUES(:d,:h,:c)
+            VALUES(?,?,?)
             ON CONFLICT(date,hour) DO UPDATE SET customer_count=excluded.customer_count
         """)
-        for h, c in by_hour.items():
-            q.bindValue(":d", date_iso)
-            q.bindValue(":h", h)
-            q.bindValue(":c", c)
-            if not q.exec():
-                raise RuntimeError(q.lastError().text())
+        q.addBindValue([date_iso] * len(changed))
+        q.addBindValue([h for h, _ in changed])
+        q.addBindValue([c for _, c in changed])
+        if not q.execBatch():
+            raise RuntimeError(q.lastError().text())
+        DAILY_DIRTY.mark_customer(date_iso)
+        return len(changed)
 
     def upsert_daily_customer_from_hourly(self, date_iso: str) -> None:
         """
@@ -152,3 +232,190 @@ class MetricsRepository:
             m = str(q.value(0)); h = int(q.value(1)); v = int(q.value(2))
             out.setdefault(m, {})[h] = v
         return out
+
+    # ---------- 期間（複数日） ----------
+    def iter_hourly_range(
+        self, start_iso: str, end_iso: str, metric: str, item_id: int | None = None
+    ) -> Iterator[tuple[str, int, int]]:
+        """
+        期間内の時間別の値を 1 回の SQL で (date, hour, value) として順に返す
+
+        Args:
+            start_iso (str): 開始日 'YYYY-MM-DD'（含む）
+            end_iso (str): 終了日 'YYYY-MM-DD'（含む）
+            metric (str): ITEM_METRICS のいずれか、または "customer"
+            item_id (int | None): None なら全商品合計
+
+        Yields:
+            tuple[str, int, int]: (date, hour, value) を date, hour の昇順で
+        """
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        if metric == "customer":
+            q.prepare("""
+                SELECT date, hour, customer_count
+                FROM fact_hourly_customer
+                WHERE date BETWEEN :s AND :e
+                ORDER BY date, hour
+            """)
+        elif metric not in ITEM_METRICS:
+            raise ValueError(f"Unknown metric '{metric}'")
+        elif item_id is None:
+            q.prepare("""
+                SELECT date, hour, SUM(value)
+                FROM fact_hourly_long
+                WHERE date BETWEEN :s AND :e AND metric=:m
+                GROUP BY date, hour
+                ORDER BY date, hour
+            """)
+            q.bindValue(":m", metric)
+        else:
+            q.prepare("""
+                SELECT date, hour, value
+                FROM fact_hourly_long
+                WHERE item_id=:it AND date BETWEEN :s AND :e AND metric=:m
+                ORDER BY date, hour
+            """)
+            q.bindValue(":m", metric)
+            q.bindValue(":it", item_id)
+        q.bindValue(":s", start_iso)
+        q.bindValue(":e", end_iso)
+        if not q.exec():
+            raise RuntimeError(q.lastError().text())
+        while q.next():
+            yield str(q.value(0)), int(q.value(1)), int(q.value(2))
+
+    def iter_daily_range(
+        self, start_iso: str, end_iso: str, metric: str, item_id: int | None = None
+    ) -> Iterator[tuple[str, int]]:
+        """
+        期間内の日次サマリ（fact_daily / fact_daily_customer）を (date, value) として順に返す
+
+        stock は日末在庫（stock_end）を返す。
+
+        Args:
+            start_iso (str): 開始日 'YYYY-MM-DD'（含む）
+            end_iso (str): 終了日 'YYYY-MM-DD'（含む）
+            metric (str): ITEM_METRICS のいずれか、または "customer"
+            item_id (int | None): None なら全商品合計
+
+        Yields:
+            tuple[str, int]: (date, value) を date の昇順で
+        """
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        if metric == "customer":
+            q.prepare("""
+                SELECT date, customer_count
+                FROM fact_daily_customer
+                WHERE date BETWEEN :s AND :e
+                ORDER BY date
+            """)
+        elif metric not in DAILY_COLUMNS:
+            raise ValueError(f"Unknown metric '{metric}'")
+        elif item_id is None:
+            col = DAILY_COLUMNS[metric]
+            q.prepare(f"""
+                SELECT date, SUM({col})
+                FROM fact_daily
+                WHERE date BETWEEN :s AND :e
+                GROUP BY date
+                ORDER BY date
+            """)
+        else:
+            col = DAILY_COLUMNS[metric]
+            q.prepare(f"""
+                SELECT date, {col}
+                FROM fact_daily
+                WHERE item_id=:it AND date BETWEEN :s AND :e
+                ORDER BY date
+            """)
+            q.bindValue(":it", item_id)
+        q.bindValue(":s", start_iso)
+        q.bindValue(":e", end_iso)
+        if not q.exec():
+            raise RuntimeError(q.lastError().text())
+        while q.next():
+            yield str(q.value(0)), int(q.value(1))
+
+    # ---------- 配列（NumPy） ----------
+    def fetch_item_matrix(self, date_iso: str, item_id: int) -> np.ndarray:
+        """
+        商品の時間別メトリクスを (len(ITEM_METRICS), 24) の int64 配列で取得する
+
+        行は ITEM_ROW の順。値が無いセルは 0。
+        """
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        q.prepare(f"""
+            SELECT {_METRIC_ROW_SQL} * 24 + hour, value
+            FROM fact_hourly_long
+            WHERE date=:d AND item_id=:it
+        """)
+        q.bindValue(":d", date_iso)
+        q.bindValue(":it", item_id)
+        return self._scatter(q, (len(ITEM_METRICS), len(HOURS)))
+
+    def fetch_summary_matrix(self, date_iso: str) -> np.ndarray:
+        """
+        その日付の全商品合計を (len(ITEM_METRICS), 24) の int64 配列で取得する
+        """
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        q.prepare(f"""
+            SELECT {_METRIC_ROW_SQL} * 24 + hour, SUM(value)
+            FROM fact_hourly_long
+            WHERE date=:d
+            GROUP BY metric, hour
+        """)
+        q.bindValue(":d", date_iso)
+        return self._scatter(q, (len(ITEM_METRICS), len(HOURS)))
+
+    def fetch_customers_vector(self, date_iso: str) -> np.ndarray:
+        """時間別の客数を (24,) の int64 配列で取得する"""
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        q.prepare("SELECT hour, customer_count FROM fact_hourly_customer WHERE date=:d")
+        q.bindValue(":d", date_iso)
+        return self._scatter(q, (len(HOURS),))
+
+    def fetch_item_cube(self, start_iso: str, end_iso: str, item_id: int | None = None) -> np.ndarray:
+        """
+        期間内の時間別メトリクスを (日数, len(ITEM_METRICS), 24) の int64 配列で取得する
+
+        1日目が start_iso。データの無い日は 0 埋め。item_id が None なら全商品合計。
+        """
+        days = (date.fromisoformat(end_iso) - date.fromisoformat(start_iso)).days + 1
+        if days <= 0:
+            return np.zeros((0, len(ITEM_METRICS), len(HOURS)), dtype=np.int64)
+        cell = len(ITEM_METRICS) * len(HOURS)
+        item_cond = "" if item_id is None else "AND item_id=:it"
+        q = QSqlQuery(self.db)
+        q.setForwardOnly(True)
+        q.prepare(f"""
+            SELECT CAST(julianday(date) - julianday(:s) AS INTEGER) * {cell}
+                   + {_METRIC_ROW_SQL} * 24 + hour,
+                   SUM(value)
+            FROM fact_hourly_long
+            WHERE date BETWEEN :s AND :e {item_cond}
+            GROUP BY date, metric, hour
+        """)
+        q.bindValue(":s", start_iso)
+        q.bindValue(":e", end_iso)
+        if item_id is not None:
+            q.bindValue(":it", item_id)
+        return self._scatter(q, (days, len(ITEM_METRICS), len(HOURS)))
+
+    def _scatter(self, q: QSqlQuery, shape: tuple[int, ...]) -> np.ndarray:
+        """(平坦化したインデックス, 値) の2列を返すクエリを実行し、0 埋めの配列へまとめて書き込む"""
+        if not q.exec():
+            raise RuntimeError(q.lastError().text())
+        idx: list[int] = []
+        val: list[int] = []
+        while q.next():
+            idx.append(q.value(0))
+            val.append(q.value(1))
+        out = np.zeros(shape, dtype=np.int64)
+        if idx:
+            out.flat[np.asarray(idx, dtype=np.int64)] = np.asarray(val, dtype=np.int64)
+        return out
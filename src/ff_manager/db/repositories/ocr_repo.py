@@ -1,83 +1,91 @@
 # src/ff_manager/db/repositories/ocr_repo.py
-import hashlib,time,json
 from typing import Optional
 from PySide6.QtSql import QSqlQuery
 
-DDL = """
-CREATE TABLE IF NOT EXISTS ocr_cache (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    image_path TEXT UNIQUE,
-    result TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+from ffm_ocr.ocr_repo import (
+    DDL, INDEX_DDL, SELECT_SQL, TOUCH_SQL, UPSERT_SQL, EVICT_AGE_SQL, EVICT_SIZE_SQL, STATS_SQL,
+    build_key, legacy_table, now_ms, params_json,
 )
-"""
+from ffm_ocr.schemas import OcrImportPayload, dumps_payload, loads_payload
+
 
 class OCRCacheRepo:
+    """
+    OCR結果のキャッシュ（QSqlDatabase 版）
+
+    表と SQL は ffm_ocr.ocr_repo と共通。表は migrations（v7）で作られるが、
+    単体で使われたときのために _ensure_table でも作る。
+    ワーカースレッドからは ConnectionManager.connection() の接続を渡すこと。
+    """
     def __init__(self, db):
-        """OCRキャッシュ用のリポジトリ"""
         self.db = db
         self._ensure_table()
 
-    def _ensure_table(self):
-        """キャッシュ用テーブルがなければ作成"""
-        q = QSqlQuery(self.db)
-        if not q.exec(DDL):
-            print("Failed to create table:", q.lastError().text())
+    build_key = staticmethod(build_key)
 
-    def save_result(self, image_path: str, result: str) -> bool:
-        """
-        OCR結果をキャッシュに保存（既存なら更新）
-        """
+    def _exec(self, sql: str, **binds) -> QSqlQuery:
         q = QSqlQuery(self.db)
-        q.prepare("""
-            INSERT OR REPLACE INTO ocr_cache (image_path, result)
-            VALUES (:path, :res)
-        """)
-        q.bindValue(":path", image_path)
-        q.bindValue(":res", result)
-        ok = q.exec()
-        if not ok:
-            print("DB save error:", q.lastError().text())
-        return ok
+        q.prepare(sql)
+        for k, v in binds.items():
+            q.bindValue(f":{k}", v)
+        if not q.exec():
+            raise RuntimeError(f"ocr_cache: {q.lastError().text()}")
+        return q
 
-    def load_result(self, image_path: str) -> str | None:
-        """
-        キャッシュからOCR結果を取得
-        """
+    def _ensure_table(self):
+        """キャッシュ用テーブルがなければ作成（旧版の表は中身ごと作り直す）"""
         q = QSqlQuery(self.db)
-        q.prepare("SELECT result FROM ocr_cache WHERE image_path=:path")
-        q.bindValue(":path", image_path)
-        if not q.exec():
-            print("DB load error:", q.lastError().text())
+        q.exec("PRAGMA table_info(ocr_cache)")
+        cols = set()
+        while q.next():
+            cols.add(str(q.value(1)))
+        if legacy_table(cols):
+            self._exec("DROP TABLE ocr_cache")
+        self._exec(DDL)
+        self._exec(INDEX_DDL)
+
+    def get(self, key: str) -> Optional[str]:
+        """保存済みの result_json（無ければ None）。当たったら last_used を更新する"""
+        q = self._exec(SELECT_SQL, k=key)
+        if not q.next():
             return None
+        result = str(q.value(0))
+        q.finish()
+        self._exec(TOUCH_SQL, k=key, t=now_ms())
+        return result
 
-        if q.next():
-            return str(q.value(0))
-        return None
+    def put(self, key: str, params: dict, result_json: str) -> None:
+        t = now_ms()
+        self._exec(
+            UPSERT_SQL,
+            k=key, p=params_json(params), r=result_json,
+            s=len(result_json.encode("utf-8")), t=t, u=t,
+        )
 
-    @staticmethod
-    def build_key(image_bytes: bytes, params: dict) -> str:
-        h = hashlib.sha1()
-        h.update(image_bytes)
-        h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
-        return h.hexdigest()
+    def get_payload(self, key: str) -> Optional[OcrImportPayload]:
+        text = self.get(key)
+        return loads_payload(text) if text is not None else None
 
-    def get(self, key: str) -> Optional[str]:
-        q = QSqlQuery(self.db)
-        q.prepare("SELECT result_json FROM ocr_cache WHERE cache_key = :k")
-        q.bindValue(":k", key)
-        if q.exec() and q.next():
-            return str(q.value(0))
-        return None
-    
-    def put(self, key: str, params: dict, result_json: str) -> None:
-        q = QSqlQuery(self.db)
-        q.prepare("""
-            INSERT OR REPLACE INTO ocr_cache (cache_key, created_at, params, result_json)
-            VALUES (:k, :t, :p, :r)
-        """)
-        q.bindValue(":k", key)
-        q.bindValue(":t", int(time.time()))
-        q.bindValue(":p", json.dumps(params, ensure_ascii=False))
-        q.bindValue(":r", result_json)
-        q.exec()
+    def put_payload(self, key: str, params: dict, payload: OcrImportPayload) -> None:
+        self.put(key, params, dumps_payload(payload))
+
+    def evict(self, max_bytes: Optional[int] = None, max_age_s: Optional[float] = None) -> int:
+        """
+        古いエントリを消す（件数を返す）
+
+        Args:
+            max_bytes: result_json の合計の上限（超えた分を使われていない順に消す）
+            max_age_s: 最後に使ってからこの秒数を過ぎたものを消す
+        """
+        removed = 0
+        if max_age_s is not None:
+            removed += self._exec(EVICT_AGE_SQL, cutoff=now_ms() - int(max_age_s * 1000)).numRowsAffected()
+        if max_bytes is not None:
+            removed += self._exec(EVICT_SIZE_SQL, max_bytes=int(max_bytes)).numRowsAffected()
+        return removed
+
+    def stats(self) -> tuple[int, int]:
+        """(件数, result_json の合計バイト数)"""
+        q = self._exec(STATS_SQL)
+        q.next()
+        return int(q.value(0)), int(q.value(1))
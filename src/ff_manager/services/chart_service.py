@@ -1,59 +1,71 @@
 # services/chart_service.py
+from datetime import date
+
+from ff_manager.core.constants import ITEM_METRICS, ITEM_ROW, TOTAL_COL
+from ff_manager.db.aggregate import normalize_date
 from ff_manager.services.metrics_service import MetricsService
 
+# この日数を超える期間は fact_daily（日次）から取得する
+HOURLY_MAX_DAYS = 31
+
 class ChartService:
-    def __init__(self, db):
-        self.metrics_service = MetricsService(db)
+    def __init__(self, db, metrics_service: MetricsService | None = None):
+        # 編集画面と同じ MetricsService を渡すと、キャッシュも共有される
+        self.metrics_service = metrics_service or MetricsService(db)
 
     def get_metric_timeseries(
         self,
         date_range: tuple[str, str],
         metric: str,
-        item_id: int | None = None
+        item_id: int | None = None,
+        granularity: str = "auto",
     ) -> dict[str, dict[int, int]]:
         """
-
+        期間内の時系列を1回のSQLで取得する
 
         Args:
-            date_range: (start_date, end_date) "YYYY-MM-DD" 形式
+            date_range: (start_date, end_date) "YYYY-MM-DD" 形式（両端を含む）
             metric: "prepared", "sold", "discarded", "stock", "customer"
             item_id: Noneなら全商品合計
+            granularity: "hourly" / "daily" / "auto"
+                （auto は HOURLY_MAX_DAYS 日以下なら hourly、超えたら daily）
 
         Returns:
             {date: {hour: value}}
+            daily の場合は {date: {TOTAL_COL: value}}（stock は日末在庫）
         """
-        result = {}
+        start, end = sorted(normalize_date(d) for d in date_range)
+        if not start:
+            return {}
+        if granularity == "auto":
+            span = (date.fromisoformat(end) - date.fromisoformat(start)).days + 1
+            granularity = "hourly" if span <= HOURLY_MAX_DAYS else "daily"
 
-        # TODO: 実際は date_range 全体をループして取得
-        d = date_range[0]  # まず1日分だけ
-        if item_id:
-            metrics = self.metrics_service.load_item_metrics(d, item_id)
-            result[d] = metrics.get(metric, {})
+        result: dict[str, dict[int, int]] = {}
+        if granularity == "hourly":
+            for d, h, v in self.metrics_service.iter_hourly_range(start, end, metric, item_id):
+                result.setdefault(d, {})[h] = v
+        elif granularity == "daily":
+            for d, v in self.metrics_service.iter_daily_range(start, end, metric, item_id):
+                result[d] = {TOTAL_COL: v}
         else:
-            metrics = self.metrics_service.load_summary_metrics(d)
-            result[d] = metrics.get(metric, {})
-
+            raise ValueError(f"Unknown granularity '{granularity}'")
         return result
-    
+
     def get_item_vs_customer(self, date: str, item_id: int) -> dict:
         """
         商品ごとの販売数と客数を取得して返す
         Returns:
             {
-                "prepared": [...],
-                "sold": [...],
-                "discarded": [...],
-                "stock": [...],
-                "customer": [...]
+                "prepared": ndarray(24),
+                "sold": ndarray(24),
+                "discarded": ndarray(24),
+                "stock": ndarray(24),
+                "customer": ndarray(24)
             }
+            商品メトリクスは (len(ITEM_METRICS), 24) 配列の行ビュー
         """
-        item_data = self.metrics_service.load_item_metrics(date, item_id)
-        customer_data = self.metrics_service.load_hourly_customers(date)
-
-        return {
-            "prepared": [item_data["prepared"].get(h, 0) for h in range(24)],
-            "sold": [item_data["sold"].get(h, 0) for h in range(24)],
-            "discarded": [item_data["discarded"].get(h, 0) for h in range(24)],
-            "stock": [item_data["stock"].get(h, 0) for h in range(24)],
-            "customer": [customer_data.get(h, 0) for h in range(24)]
-        }
+        item = self.metrics_service.load_item_matrix(date, item_id)
+        out = {m: item[ITEM_ROW[m]] for m in ITEM_METRICS}
+        out["customer"] = self.metrics_service.load_customers_vector(date)
+        return out
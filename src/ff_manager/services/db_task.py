@@ -0,0 +1,46 @@
+# services/db_task.py
+from typing import Any, Callable
+from PySide6.QtCore import QObject, Signal, QRunnable, Slot, QThreadPool
+
+from ff_manager.db.connection import ConnectionManager
+
+
+class DbTask(QObject, QRunnable):
+    """
+    fn(db) をワーカースレッドで実行する使い捨てタスク。
+    db は ConnectionManager が払い出すそのスレッド専用の接続。
+    """
+    finished = Signal(object)   # fn の戻り値
+    failed = Signal(str)
+
+    def __init__(self, manager: ConnectionManager, fn: Callable[[Any], Any]):
+        QObject.__init__(self)
+        QRunnable.__init__(self)
+        self.manager = manager
+        self.fn = fn
+        self.setAutoDelete(True)
+
+    @Slot()
+    def run(self):
+        try:
+            db = self.manager.connection()
+            self.finished.emit(self.fn(db))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+def run_db_task(
+    manager: ConnectionManager,
+    fn: Callable[[Any], Any],
+    on_done: Callable[[Any], None] | None = None,
+    on_error: Callable[[str], None] | None = None,
+    pool: QThreadPool | None = None,
+) -> DbTask:
+    """DbTask を作ってスレッドプールに投入する"""
+    task = DbTask(manager, fn)
+    if on_done is not None:
+        task.finished.connect(on_done)
+    if on_error is not None:
+        task.failed.connect(on_error)
+    (pool or QThreadPool.globalInstance()).start(task)
+    return task
@@ -0,0 +1,180 @@
+# services/image_loader.py
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image, ImageOps
+from PySide6.QtCore import QObject, Signal, QRunnable, Slot, QThreadPool
+from PySide6.QtGui import QImage
+
+from ffm_ocr.images import read_image
+from ff_manager.config import IMAGE_PREVIEW_WIDTH, IMAGE_PREVIEW_CACHE
+from ff_manager.services.pool_task import TakeGuard
+from ff_manager.ui.utils.image import ndarray_to_qimage
+
+# EXIF の Orientation のうち、縦横が入れ替わるもの（90°/270° 回転を含む）
+_EXIF_ORIENTATION = 0x0112
+_TRANSPOSED = {5, 6, 7, 8}
+
+
+@dataclass(frozen=True)
+class LoadedImage:
+    """1枚分の読み込み結果"""
+    path: str
+    preview: QImage               # 表示用（幅 IMAGE_PREVIEW_WIDTH 以下、EXIF の向きを反映済み）
+    bgr: np.ndarray | None        # OCR 用のフル解像度（BGR）。プレビューだけの要求なら None
+    size: tuple[int, int]         # 向きを反映した元画像の (幅, 高さ)
+
+
+def decode_preview(path: str, max_width: int = IMAGE_PREVIEW_WIDTH) -> tuple[QImage, tuple[int, int]]:
+    """
+    表示用の縮小画像を作る
+
+    JPEG は draft() で 1/2・1/4・1/8 の解像度のまま復号するので、12MP の写真でも
+    フル解像度を展開しない。EXIF の向きは縮小前に反映する（縦撮りの写真が横にならない）。
+
+    Returns:
+        (縮小画像, 向きを反映した元画像の (幅, 高さ))
+    """
+    with Image.open(path) as im:
+        w, h = im.size
+        transposed = im.getexif().get(_EXIF_ORIENTATION, 1) in _TRANSPOSED
+        size = (h, w) if transposed else (w, h)
+        if im.format == "JPEG" and size[0] > max_width:
+            # draft の大きさは保存されている向きで指定する（表示の幅 = 回転後の幅）
+            s = max_width / size[0]
+            im.draft("RGB", (math.ceil(w * s), math.ceil(h * s)))
+        im = ImageOps.exif_transpose(im)
+        im = im.convert("RGB")
+        if im.width > max_width:
+            im = im.resize((max_width, max(1, round(im.height * max_width / im.width))), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        preview = ndarray_to_qimage(np.asarray(im), as_bgr=False)
+    return preview, size
+
+
+class ImageLoader(QObject):
+    """
+    取り込み画面の画像をワーカースレッドで読み込む
+
+    1回の load() で、先に縮小プレビュー（previewReady）、続けて OCR 用のフル解像度（loaded）を返す。
+    どちらの解像度も1回ずつしか復号せず、GUI スレッドでは復号しない。
+    プレビューは (パス, 更新日時, サイズ) で IMAGE_PREVIEW_CACHE 枚まで覚えておく。
+    MetricsLoader と同じく、新しい load() で古い要求は取り消し、古い結果は捨てる。
+    """
+    previewReady = Signal(str, QImage)   # (path, プレビュー)
+    loaded = Signal(object)              # LoadedImage（最新の要求の分だけ）
+    failed = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._seq = 0
+        self._pending: _ImageTask | None = None
+        self._previews: OrderedDict[tuple, tuple[QImage, tuple[int, int]]] = OrderedDict()
+
+    def load(self, path: str, full: bool = True) -> int:
+        """
+        path を読み込む（世代番号を返す）
+
+        Args:
+            full: OCR 用のフル解像度も読むか（False ならプレビューだけ）
+        """
+        self.cancel()
+        self._seq += 1
+        key = _preview_key(path)
+        cached = self._previews.get(key) if key is not None else None
+        if cached is not None:
+            self._previews.move_to_end(key)
+            self.previewReady.emit(path, cached[0])
+        task = _ImageTask(self._seq, path, key, cached, full)
+        task.previewReady.connect(self._on_preview)
+        task.finished.connect(self._on_done)
+        task.failed.connect(self._on_failed)
+        self._pending = task
+        self.pool.start(task)
+        return self._seq
+
+    def cancel(self) -> None:
+        task, self._pending = self._pending, None
+        if task is None:
+            return
+        task.cancel()
+        task.guard.take(self.pool, task)   # 走り終わって削除済みかもしれないので tryTake は直接呼ばない
+
+    @Slot(object)
+    def _on_preview(self, result):
+        seq, key, path, preview, size = result
+        if key is not None:
+            self._previews[key] = (preview, size)
+            self._previews.move_to_end(key)
+            while len(self._previews) > IMAGE_PREVIEW_CACHE:
+                self._previews.popitem(last=False)
+        if seq == self._seq:
+            self.previewReady.emit(path, preview)
+
+    @Slot(object)
+    def _on_done(self, result):
+        seq, img = result
+        if seq != self._seq:
+            return
+        self._pending = None
+        self.loaded.emit(img)
+
+    @Slot(object)
+    def _on_failed(self, result):
+        seq, msg = result
+        if seq != self._seq:
+            return
+        self._pending = None
+        self.failed.emit(msg)
+
+
+def _preview_key(path: str) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+class _ImageTask(QObject, QRunnable):
+    previewReady = Signal(object)   # (seq, key, path, QImage, size)
+    finished = Signal(object)       # (seq, LoadedImage)
+    failed = Signal(object)         # (seq, str)
+
+    def __init__(self, seq: int, path: str, key, cached, full: bool):
+        QObject.__init__(self)
+        QRunnable.__init__(self)
+        self.seq = seq
+        self.path = path
+        self.key = key
+        self.cached = cached
+        self.full = full
+        self._cancelled = threading.Event()
+        self.guard = TakeGuard()
+        self.setAutoDelete(True)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @Slot()
+    def run(self):
+        self.guard.start()
+        try:
+            if self.cached is not None:
+                preview, size = self.cached
+            else:
+                preview, size = decode_preview(self.path)
+                self.previewReady.emit((self.seq, self.key, self.path, preview, size))
+            if self._cancelled.is_set():
+                return
+            bgr = read_image(self.path) if self.full else None
+            if self._cancelled.is_set():
+                return
+            self.finished.emit((self.seq, LoadedImage(self.path, preview, bgr, size)))
+        except Exception as e:
+            self.failed.emit((self.seq, f"{os.path.basename(self.path)}: {e}"))
@@ -0,0 +1,105 @@
+# services/metrics_cache.py
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+import numpy as np
+
+# 1エントリあたりの管理コストの概算（キーのタプル・OrderedDict のノード・ndarray ヘッダ）
+_ENTRY_OVERHEAD = 256
+
+
+class MetricsCache:
+    """
+    読み込み結果（ndarray）の LRU キャッシュ。上限はバイト数で指定する。
+
+    キーは ("item", date, item_id) / ("summary", date) / ("customers", date)。
+    ワーカースレッドの読み込みとも共有するのでロックで保護する。
+    格納した配列は書き込み不可にしてから持つ（呼び出し側で書き換えないこと）。
+
+    読み込みと保存が別スレッドで重なると、保存前の値を無効化の後に put してしまう。
+    読み込み前に generation() を取っておき put(..., since=) に渡すと、
+    その間に無効化があった場合は格納しない。
+    """
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._data: OrderedDict[Hashable, tuple[np.ndarray, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._gen = 0   # invalidate / clear のたびに進める
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        # 統計・LRU の順序には影響させない（先読みの判定用）
+        with self._lock:
+            return key in self._data
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._gen
+
+    def put(self, key: Hashable, value: np.ndarray, since: int | None = None) -> np.ndarray:
+        """value を格納して（書き込み不可にした）value を返す"""
+        value.flags.writeable = False
+        size = value.nbytes + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            if since is not None and since != self._gen:
+                return value  # 読み込み中に無効化された（古い値かもしれない）
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, s) = self._data.popitem(last=False)
+                self._bytes -= s
+                self.evictions += 1
+        return value
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            self._gen += 1
+            for key in keys:
+                old = self._data.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[1]
+
+    def invalidate_date(self, date_iso: str) -> None:
+        """その日付のエントリ（全商品・サマリ・客数）をすべて外す"""
+        with self._lock:
+            self._gen += 1
+            for key in [k for k in self._data if k[1] == date_iso]:
+                self._bytes -= self._data.pop(key)[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._gen += 1
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
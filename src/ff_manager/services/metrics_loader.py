@@ -0,0 +1,130 @@
+# services/metrics_loader.py
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal, QRunnable, Slot, QThreadPool
+
+from ff_manager.core.constants import ITEM_METRICS, ITEM_ROW, SUMMARY_ROW
+from ff_manager.db.connection import ConnectionManager
+from ff_manager.services.metrics_service import MetricsService
+from ff_manager.services.metrics_cache import MetricsCache
+from ff_manager.services.pool_task import TakeGuard
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    """1画面分（日付×商品）の読み込み結果"""
+    date_iso: str
+    item_name: str
+    item_id: int | None     # 未登録の商品なら None（配列は空）
+    item: np.ndarray        # (len(ITEM_METRICS), 24)
+    summary: np.ndarray     # (len(SUMMARY_ROWS), 24)  0 行目が客数
+
+    def chart_data(self) -> dict:
+        """ChartArea.refresh に渡す形へ（コピーせず行ビューを返す）"""
+        out = {m: self.item[ITEM_ROW[m]] for m in ITEM_METRICS}
+        out["customer"] = self.summary[SUMMARY_ROW["customer"]]
+        return out
+
+
+class MetricsLoader(QObject):
+    """
+    編集画面のデータ読み込みをワーカースレッドで実行する。
+
+    request() のたびに世代番号を進め、まだ始まっていない古い要求はキューから外す。
+    実行中の要求は途中で打ち切り、結果が届いても最新の世代でなければ捨てる。
+    """
+    loaded = Signal(object)   # MetricsSnapshot（最新の要求の分だけ）
+    failed = Signal(str)
+
+    def __init__(self, manager: ConnectionManager, cache: MetricsCache | None = None, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        # GUI 側の MetricsService と同じキャッシュを使う（保存時の無効化も共有される）
+        self.cache = cache
+        # 読み込みは1本ずつ（古い要求をキューから外せるように専用プール）
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._seq = 0
+        self._pending: _LoadTask | None = None
+
+    def request(self, date_iso: str, item_name: str) -> int:
+        """読み込みを要求し、その世代番号を返す"""
+        self.cancel()
+        self._seq += 1
+        task = _LoadTask(self.manager, self.cache, self._seq, date_iso, item_name)
+        task.finished.connect(self._on_task_done)
+        task.failed.connect(self._on_task_failed)
+        self._pending = task
+        self.pool.start(task)
+        return self._seq
+
+    def cancel(self) -> None:
+        """待機中・実行中の要求を取り消す"""
+        task, self._pending = self._pending, None
+        if task is None:
+            return
+        task.cancel()
+        task.guard.take(self.pool, task)  # まだ始まっていなければキューから外れる
+
+    @Slot(object)
+    def _on_task_done(self, result):
+        seq, snap = result
+        if seq != self._seq:
+            return  # 古い要求の結果
+        self._pending = None
+        self.loaded.emit(snap)
+
+    @Slot(object)
+    def _on_task_failed(self, result):
+        seq, msg = result
+        if seq != self._seq:
+            return
+        self._pending = None
+        self.failed.emit(msg)
+
+
+class _LoadTask(QObject, QRunnable):
+    finished = Signal(object)   # (seq, MetricsSnapshot)
+    failed = Signal(object)     # (seq, str)
+
+    def __init__(self, manager: ConnectionManager, cache: MetricsCache | None, seq: int, date_iso: str, item_name: str):
+        QObject.__init__(self)
+        QRunnable.__init__(self)
+        self.manager = manager
+        self.cache = cache
+        self.seq = seq
+        self.date_iso = date_iso
+        self.item_name = item_name
+        self._cancelled = threading.Event()
+        self.guard = TakeGuard()
+        self.setAutoDelete(True)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @Slot()
+    def run(self):
+        self.guard.start()
+        try:
+            if self._cancelled.is_set():
+                return
+            svc = MetricsService(self.manager.connection(), cache=self.cache)
+            item_id = svc.get_item_id_by_name(self.item_name)
+            if item_id is None:
+                empty = np.zeros((0, 0), dtype=np.int64)
+                self.finished.emit((self.seq, MetricsSnapshot(self.date_iso, self.item_name, None, empty, empty)))
+                return
+            # クエリの合間で取り消しを確認する
+            if self._cancelled.is_set():
+                return
+            item = svc.load_item_matrix(self.date_iso, item_id)
+            if self._cancelled.is_set():
+                return
+            summary = svc.load_summary_matrix(self.date_iso)
+            if self._cancelled.is_set():
+                return
+            self.finished.emit((self.seq, MetricsSnapshot(self.date_iso, self.item_name, item_id, item, summary)))
+        except Exception as e:
+            self.failed.emit((self.seq, str(e)))
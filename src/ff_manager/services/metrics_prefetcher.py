@@ -0,0 +1,71 @@
+# services/metrics_prefetcher.py
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, Slot, QThreadPool
+
+from ff_manager.db.connection import ConnectionManager
+from ff_manager.services.metrics_cache import MetricsCache
+from ff_manager.services.metrics_service import MetricsService
+from ff_manager.services.pool_task import TakeGuard
+
+
+class MetricsPrefetcher(QObject):
+    """
+    次に開かれそうな (日付, 商品) をワーカーで読み、共有キャッシュに載せておく。
+
+    schedule() は前回の先読みを取り消してから新しい候補を積む。
+    表示用の MetricsLoader とは別のプール（1本）で動くので、画面の読み込みを待たせない。
+    """
+    def __init__(self, manager: ConnectionManager, cache: MetricsCache, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.cache = cache
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._pending: _PrefetchTask | None = None
+        self.fetched = 0   # 実際に DB を読んだ候補の数
+
+    def schedule(self, targets: list[tuple[str, int]]) -> None:
+        """targets: 先読みする (date_iso, item_id)。先頭ほど優先"""
+        self.cancel()
+        if not targets:
+            return
+        task = _PrefetchTask(self, list(dict.fromkeys(targets)))
+        self._pending = task
+        self.pool.start(task)
+
+    def cancel(self) -> None:
+        task, self._pending = self._pending, None
+        if task is None:
+            return
+        task.cancel()
+        task.guard.take(self.pool, task)   # 走り終わって削除済みかもしれないので tryTake は直接呼ばない
+
+
+class _PrefetchTask(QRunnable):
+    def __init__(self, owner: MetricsPrefetcher, targets: list[tuple[str, int]]):
+        super().__init__()
+        self.manager = owner.manager
+        self.cache = owner.cache
+        self.owner = owner
+        self.targets = targets
+        self._cancelled = threading.Event()
+        self.guard = TakeGuard()
+        self.setAutoDelete(True)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @Slot()
+    def run(self):
+        self.guard.start()
+        try:
+            svc = MetricsService(self.manager.connection(), cache=self.cache)
+            for date_iso, item_id in self.targets:
+                if self._cancelled.is_set():
+                    return
+                if svc.prefetch(date_iso, item_id):
+                    self.owner.fetched += 1
+        except Exception:
+            # 先読みは失敗しても実害が無い（表示時に通常どおり読む）
+            pass
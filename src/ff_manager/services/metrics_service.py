@@ -1,19 +1,24 @@
 # services/metrics_service.py
-from typing import Dict
+from typing import Dict, Iterator
+import numpy as np
 from PySide6.QtWidgets import QTableWidget
 
+from ff_manager.config import METRICS_CACHE_MB
 from ff_manager.db.repositories.metrics_repo import MetricsRepository
 from ff_manager.db.repositories.items_repo import ItemsRepository
+from ff_manager.services.metrics_cache import MetricsCache
 
 from ff_manager.core.constants import (
     HOURS,ITEM_METRICS,ITEM_ROW,SUMMARY_ROWS,SUMMARY_ROW
     )
 
 class MetricsService:
-    def __init__(self, db):
+    def __init__(self, db, cache: MetricsCache | None = None):
         self.db = db
         self.repo_items=ItemsRepository(db)
         self.repo = MetricsRepository(db)
+        # 配列の読み込み結果を (date, item_id) / date 単位で保持（ワーカーと共有可）
+        self.cache = cache if cache is not None else MetricsCache(METRICS_CACHE_MB * 1024 * 1024)
 
     # ---------- 読み込み ----------
     def load(self, date_iso: str, item_id: int) -> Dict[str, Dict[str, Dict[int, int]]]:
@@ -67,33 +72,173 @@ class MetricsService:
         out = self.repo.fetch_summary_metrics(date_iso)
         return {m: out.get(m, {}) for m in SUMMARY_ROWS}
 
+    # ---------- 読み込み（配列） ----------
+    # 返す配列はキャッシュと共有（書き込み不可）。書き換えるときは copy() すること
+    def load_item_matrix(self, date_iso: str, item_id: int) -> np.ndarray:
+        """商品の時間別メトリクス (len(ITEM_METRICS), 24)。行は ITEM_ROW の順"""
+        return self._cached(("item", date_iso, item_id), self.repo.fetch_item_matrix, date_iso, item_id)
+
+    def load_customers_vector(self, date_iso: str) -> np.ndarray:
+        """時間別の客数 (24,)"""
+        return self._cached(("customers", date_iso), self.repo.fetch_customers_vector, date_iso)
+
+    def _load_item_totals(self, date_iso: str) -> np.ndarray:
+        """全商品合計 (len(ITEM_METRICS), 24)"""
+        return self._cached(("summary", date_iso), self.repo.fetch_summary_matrix, date_iso)
+
+    def _cached(self, key, fetch, *args) -> np.ndarray:
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+        gen = self.cache.generation()
+        return self.cache.put(key, fetch(*args), since=gen)
+
+    def peek_matrices(self, date_iso: str, item_id: int) -> Dict[str, np.ndarray] | None:
+        """
+        キャッシュだけで load_matrices と同じ形を返す（DB には触らない）
+
+        Returns:
+            全部そろっていれば {"item", "summary"}、1つでも欠けていれば None
+        """
+        keys = [("item", date_iso, item_id), ("customers", date_iso), ("summary", date_iso)]
+        if not all(k in self.cache for k in keys):
+            return None
+        item, customers, totals = (self.cache.get(k) for k in keys)
+        if item is None or customers is None or totals is None:
+            return None  # 判定の直後に追い出された
+        summary = np.empty((len(SUMMARY_ROWS), len(HOURS)), dtype=np.int64)
+        summary[SUMMARY_ROW["customer"]] = customers
+        summary[[SUMMARY_ROW[m] for m in ITEM_METRICS]] = totals
+        return {"item": item, "summary": summary}
+
+    def prefetch(self, date_iso: str, item_id: int) -> bool:
+        """
+        (date, item_id) の表示に要る配列をキャッシュに載せる
+
+        Returns:
+            DB を読んだなら True（すでに全部載っていれば False）
+        """
+        keys = [("item", date_iso, item_id), ("customers", date_iso), ("summary", date_iso)]
+        if all(k in self.cache for k in keys):
+            return False
+        self.load_item_matrix(date_iso, item_id)
+        self.load_customers_vector(date_iso)
+        self._load_item_totals(date_iso)
+        return True
+
+    def load_summary_matrix(self, date_iso: str) -> np.ndarray:
+        """
+        サマリ表と同じ並びの (len(SUMMARY_ROWS), 24)。
+        行は SUMMARY_ROW の順（0 行目が客数、以降が全商品合計）
+        """
+        out = np.empty((len(SUMMARY_ROWS), len(HOURS)), dtype=np.int64)
+        out[SUMMARY_ROW["customer"]] = self.load_customers_vector(date_iso)
+        out[[SUMMARY_ROW[m] for m in ITEM_METRICS]] = self._load_item_totals(date_iso)
+        return out
+
+    def load_matrices(self, date_iso: str, item_id: int) -> Dict[str, np.ndarray]:
+        """
+        load() の配列版
+
+        Returns:
+            {
+                "item": (len(ITEM_METRICS), 24),
+                "summary": (len(SUMMARY_ROWS), 24)  # 0 行目が客数
+            }
+        """
+        return {
+            "item": self.load_item_matrix(date_iso, item_id),
+            "summary": self.load_summary_matrix(date_iso),
+        }
+
+    def load_item_cube(self, start_iso: str, end_iso: str, item_id: int | None = None) -> np.ndarray:
+        """期間の時間別メトリクス (日数, len(ITEM_METRICS), 24)。item_id が None なら全商品合計"""
+        return self.repo.fetch_item_cube(start_iso, end_iso, item_id)
+
+    def iter_hourly_range(
+        self, start_iso: str, end_iso: str, metric: str, item_id: int | None = None
+    ) -> Iterator[tuple[str, int, int]]:
+        """期間内の時間別の値を (date, hour, value) で順に返す"""
+        return self.repo.iter_hourly_range(start_iso, end_iso, metric, item_id)
+
+    def iter_daily_range(
+        self, start_iso: str, end_iso: str, metric: str, item_id: int | None = None
+    ) -> Iterator[tuple[str, int]]:
+        """期間内の日次サマリを (date, value) で順に返す"""
+        return self.repo.iter_daily_range(start_iso, end_iso, metric, item_id)
+
     # ---------- 保存 ----------
-    def save(self, date_iso: str, item_id: int, item_table: QTableWidget, summary_table: QTableWidget):
-        """トランザクション内で商品・客数・日次サマリを保存"""
+    def save(self, date_iso: str, item_id: int, item_table: QTableWidget, summary_table: QTableWidget) -> int:
+        """
+        QTableWidget の内容を save_matrices で保存する
+
+        Returns:
+            int: 書き込んだ時間別の行数（商品＋客数）
+        """
+        item_data = self._extract_table_data(item_table, ITEM_ROW)
+        item = np.array([[item_data[m][h] for h in HOURS] for m in ITEM_METRICS], dtype=np.int64)
+        cust_row = SUMMARY_ROW["customer"]
+        customers = np.array([int(summary_table.item(cust_row, h).text() or 0) for h in HOURS], dtype=np.int64)
+        return self.save_matrices(date_iso, item_id, item, customers)
+
+    def save_matrices(self, date_iso: str, item_id: int, item: np.ndarray, customers: np.ndarray) -> int:
+        """
+        トランザクション内で商品・客数を保存
+
+        Args:
+            date_iso (str): 'YYYY-MM-DD'
+            item_id (int): 対象商品
+            item (np.ndarray): (len(ITEM_METRICS), 24)。行は ITEM_ROW の順
+            customers (np.ndarray): (24,) 時間別の客数
+        Returns:
+            int: 書き込んだ時間別の行数（商品＋客数）
+        """
+        item_rows = item.tolist()
+        item_data = {m: dict(zip(HOURS, item_rows[ITEM_ROW[m]])) for m in ITEM_METRICS}
+        cust_by_hour = dict(zip(HOURS, customers.tolist()))
+
         self.db.transaction()
         try:
-            # 商品メトリクス
-            item_data = self._extract_table_data(item_table, ITEM_ROW)
-            self.repo.upsert_item_metrics(date_iso, item_id, item_data)
-
-            # 客数
-            cust_row = SUMMARY_ROW["customer"]
-            cust_by_hour = {
-                h: int(summary_table.item(cust_row, h).text() or 0)
-                for h in range(len(HOURS))
-            }
-            self.repo.upsert_hourly_customers(date_iso, cust_by_hour)
+            written = self.repo.upsert_item_metrics(date_iso, item_id, item_data)
+            written += self.repo.upsert_hourly_customers(date_iso, cust_by_hour)
 
-            # 日次サマリ
-            self.repo.upsert_daily_customer_from_hourly(date_iso)
+            # 日次サマリは書き込んだ分が DAILY_DIRTY に積まれ、rebuild_daily_dirty で反映される
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.invalidate(date_iso, [item_id], customers=True)
+        return written
 
+    def save_item_metrics(self, date_iso: str, item_id: int, data: Dict[str, Dict[int, int]]) -> int:
+        """商品メトリクスを1トランザクションで保存し、書き込んだ行数を返す"""
+        self.db.transaction()
+        try:
+            written = self.repo.upsert_item_metrics(date_iso, item_id, data)
             self.db.commit()
         except Exception:
             self.db.rollback()
             raise
+        finally:
+            self.invalidate(date_iso, [item_id])
+        return written
+
+    def invalidate(self, date_iso: str, item_ids=(), customers: bool = False) -> None:
+        """
+        書き込んだ範囲のキャッシュだけを外す
 
-    def save_item_metrics(self, date_iso: str, item_id: int, data: Dict[str, Dict[int, int]]) -> None:
-        self.repo.upsert_item_metrics(date_iso,item_id,data)
+        Args:
+            date_iso (str): 書き込んだ日付
+            item_ids: 書き込んだ商品ID（空でなければ、その日の全商品合計も外す）
+            customers (bool): 客数を書き込んだか
+        """
+        keys = [("item", date_iso, i) for i in item_ids]
+        if keys:
+            keys.append(("summary", date_iso))
+        if customers:
+            keys.append(("customers", date_iso))
+        self.cache.invalidate(*keys)
 
 
     def _extract_table_data(self, table, row_map: dict) -> dict:
@@ -124,4 +269,8 @@ class MetricsService:
     def fetch_item_names(self) -> list[str]:
         """商品名一覧を取得"""
         return self.repo_items.list_item_names()
+
+    def fetch_items(self) -> list[tuple[int, str]]:
+        """(item_id, 商品名) の一覧を商品名順で取得"""
+        return self.repo_items.list_items()
     
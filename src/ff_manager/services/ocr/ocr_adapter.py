@@ -1,11 +1,23 @@
-from PySide6.QtCore import QObject, Signal, QRunnable, Slot, QThreadPool,QDate
+import dataclasses
+import logging
+import time
+from functools import partial
+from pathlib import Path
+from PySide6.QtCore import QObject, Signal, QRunnable, Slot, QThreadPool
 import numpy as np
-from typing import Optional
+from typing import Callable, Optional
+from ffm_ocr.images import guess_date, read_image
 from ffm_ocr.pipeline import OcrPipeline
 from ffm_ocr.schemas import OcrImportPayload, ProductSeries
 # QImage→ndarray
-from ff_manager.ui.utils.image import qimage_to_ndarray  
+from ff_manager.ui.utils.image import qimage_to_gray, qimage_to_ndarray
 from ff_manager.core.constants import ITEM_LABELS_JA
+from ff_manager.config import OCR_CACHE_MB, OCR_CACHE_DAYS, OCR_BATCH_WORKERS
+from ff_manager.db.connection import ConnectionManager
+from ff_manager.db.repositories.ocr_repo import OCRCacheRepo
+from ff_manager.services.pool_task import TakeGuard
+
+log = logging.getLogger(__name__)
 
 class OcrAdapter(QObject):
     finished = Signal(object)          # payload を返す
@@ -13,20 +25,31 @@ class OcrAdapter(QObject):
     progress = Signal(int)             # 任意: 0-100
 
     # def __init__(self, lang="japan", use_gpu=False, model_name="RT-DETR-L_wired_table_cell_det", parent=None):
-    def __init__(self,pipeline:Optional[OcrPipeline]=None, parent=None):
+    def __init__(self,pipeline:Optional[OcrPipeline]=None, parent=None, db_manager: ConnectionManager | None = None):
+        """
+        Args:
+            pipeline: OCR パイプライン（既定は OcrPipeline()）
+            db_manager: 渡すと ocr_cache 表で結果を使い回す（同じ写真の再取り込みはパイプラインを回さない）
+        """
         super().__init__(parent)
         self.pipe = pipeline or OcrPipeline()
+        self.db_manager = db_manager
         self.pool = QThreadPool.globalInstance()
 
-    def run_on_qimage(self, qimage, target_date, meta: Optional[dict]=None):
-        img = qimage_to_ndarray(qimage)     # BGR/RGB注意（ヘルパ内で吸収）
+    def run_on_qimage(self, qimage, target_date, meta: Optional[dict]=None, gray: bool = False):
+        """
+        QImage をコピーせずにパイプラインへ渡す（QImage を指すビューのまま。必要なときだけ形式を変換）
+
+        gray=True なら Qt で一度にグレースケールへ変換して渡す（前処理の最初の変換が不要になる）。
+        """
+        img = qimage_to_gray(qimage) if gray else qimage_to_ndarray(qimage, copy=False)
         self._submit(img, target_date, meta or {})
 
     def run_on_ndarray(self, img_nd: np.ndarray, target_date, meta: Optional[dict]=None):
         self._submit(img_nd, target_date, meta or {})
 
     def _submit(self, img_nd, target_date, meta):
-        worker = _OcrWorker(self.pipe, img_nd, target_date, meta)
+        worker = _OcrWorker(self.pipe, img_nd, target_date, meta, self.db_manager)
         worker.finished.connect(self.finished)
         worker.failed.connect(self.failed)
         worker.progress.connect(self.progress)
@@ -45,9 +68,9 @@ class OcrAdapter(QObject):
             ret.append(item)
         return ret
 
-    def get_date(self, payload: OcrImportPayload)->QDate:
-        d=payload.date
-        return QDate(d.year,d.month,d.day)
+    def get_date(self, payload: OcrImportPayload) -> str:
+        """対象日を DB と同じ 'YYYY-MM-DD' で返す"""
+        return payload.date.isoformat()
     
 
 
@@ -56,21 +79,226 @@ class _OcrWorker(QObject, QRunnable):
     failed = Signal(str)
     progress = Signal(int)
 
-    def __init__(self, pipe: OcrPipeline, img_nd, target_date, meta):
+    def __init__(self, pipe: OcrPipeline, img_nd, target_date, meta, db_manager: ConnectionManager | None = None):
+        """img_nd は ndarray か画像ファイルのパス（パスならワーカー内で読み込む）"""
         QObject.__init__(self)
         QRunnable.__init__(self)
         self.pipe = pipe
         self.img_nd = img_nd
         self.target_date = target_date
         self.meta = meta
+        self.db_manager = db_manager
+        self.guard = TakeGuard()  # 取り消しは guard.take で（走り終われば削除される）
         self.setAutoDelete(True)  # 使い捨て（デフォルトTrue）
 
     @Slot()
     def run(self):
+        self.guard.start()
         try:
-            # （必要ならここで self.progress.emit(…）を入れる）
+            self.progress.emit(0)
+            if not isinstance(self.img_nd, np.ndarray):
+                self.img_nd = read_image(self.img_nd)
+            self.progress.emit(10)
+            repo, key = self._cache_lookup_key()
+            if repo is not None:
+                cached = self._cache_get(repo, key[0])
+                if cached is not None:
+                    # 対象日と呼び出し側の meta は今回のものにする
+                    self.progress.emit(100)
+                    self.finished.emit(dataclasses.replace(
+                        cached, date=self.target_date,
+                        meta={**cached.meta, **self.meta, "cache_hit": True},
+                    ))
+                    return
+
             cells = self.pipe.run(self.img_nd)
-            payload = self.pipe.to_payload(cells, self.target_date, meta=self.meta)
-            self.finished.emit(payload)
+            self.progress.emit(90)
+            # キャッシュには呼び出し側の meta を混ぜない形で残す
+            payload = self.pipe.to_payload(cells, self.target_date)
+            if repo is not None:
+                self._cache_put(repo, key, payload)
+            self.progress.emit(100)
+            self.finished.emit(dataclasses.replace(payload, meta={**payload.meta, **self.meta}))
         except Exception as e:
             self.failed.emit(str(e))
+
+    # ---------------- cache ----------------
+    # キャッシュの失敗で OCR 自体は止めない（ログだけ残してパイプラインを回す）
+    def _cache_lookup_key(self):
+        cache_key = getattr(self.pipe, "cache_key", None)   # FakePipeline などは持たない
+        if self.db_manager is None or cache_key is None:
+            return None, None
+        try:
+            key = cache_key(self.img_nd)
+            if key is None:
+                return None, None
+            return OCRCacheRepo(self.db_manager.connection()), key
+        except Exception:
+            log.warning("ocr cache unavailable", exc_info=True)
+            return None, None
+
+    def _cache_get(self, repo: OCRCacheRepo, key: str) -> OcrImportPayload | None:
+        try:
+            return repo.get_payload(key)
+        except Exception:
+            log.warning("ocr cache read failed", exc_info=True)
+            return None
+
+    def _cache_put(self, repo: OCRCacheRepo, key: tuple[str, dict], payload: OcrImportPayload) -> None:
+        try:
+            repo.put_payload(key[0], key[1], payload)
+            repo.evict(max_bytes=OCR_CACHE_MB * 1024 * 1024, max_age_s=OCR_CACHE_DAYS * 86400)
+        except Exception:
+            log.warning("ocr cache write failed", exc_info=True)
+
+
+
+@dataclasses.dataclass
+class OcrBatchSummary:
+    """一括取り込みの結果"""
+    total: int
+    succeeded: list[tuple[Path, OcrImportPayload]] = dataclasses.field(default_factory=list)
+    failed: list[tuple[Path, str]] = dataclasses.field(default_factory=list)
+    cancelled: int = 0
+    cache_hits: int = 0
+    elapsed_s: float = 0.0
+
+    def text(self) -> str:
+        """ダイアログ向けの要約"""
+        lines = [
+            f"{self.total} 枚中 成功 {len(self.succeeded)} / 失敗 {len(self.failed)}"
+            + (f" / 中止 {self.cancelled}" if self.cancelled else ""),
+            f"キャッシュ利用 {self.cache_hits} 枚・{self.elapsed_s:.1f} 秒",
+        ]
+        lines += [f"  × {p.name}: {msg}" for p, msg in self.failed]
+        return "\n".join(lines)
+
+
+class OcrBatchRunner(QObject):
+    """
+    画像をまとめて OCR する（1枚につき _OcrWorker を1つ）
+
+    専用のプールで同時に max_workers 枚まで処理する。画像の読み込みもワーカー側で行うので、
+    フォルダ1週間分を積んでも GUI スレッドは止まらない。
+    対象日は date_for(path)（既定はファイル名の日付か更新日）で決める。
+    """
+    itemProgress = Signal(int, int)            # (画像の番号, 0-100)
+    progress = Signal(int)                     # 全体 0-100
+    itemFinished = Signal(int, object)         # (画像の番号, OcrImportPayload)
+    itemFailed = Signal(int, str)              # (画像の番号, エラー)
+    finished = Signal(object)                  # OcrBatchSummary
+
+    def __init__(
+        self,
+        pipeline: OcrPipeline,
+        db_manager: ConnectionManager | None = None,
+        max_workers: int = OCR_BATCH_WORKERS,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.pipe = pipeline
+        self.db_manager = db_manager
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, max_workers))
+        self._paths: list[Path] = []
+        self._workers: dict[int, _OcrWorker] = {}
+        self._pct: dict[int, int] = {}
+        self._summary: OcrBatchSummary | None = None
+        self._t0 = 0.0
+
+    def is_running(self) -> bool:
+        return self._summary is not None
+
+    def start(
+        self,
+        paths: list[str | Path],
+        date_for: Callable[[Path], object] = guess_date,
+        meta: Optional[dict] = None,
+    ) -> int:
+        """
+        paths を積む（処理中なら何もしない）
+
+        Returns:
+            int: 積んだ枚数
+        """
+        if self.is_running():
+            return 0
+        self._paths = [Path(p) for p in paths]
+        self._summary = OcrBatchSummary(total=len(self._paths))
+        self._pct = {i: 0 for i in range(len(self._paths))}
+        self._t0 = time.perf_counter()
+        if not self._paths:
+            self._finish()
+            return 0
+
+        for i, path in enumerate(self._paths):
+            try:
+                target_date = date_for(path)
+            except Exception as e:
+                self._pct[i] = 100
+                self._summary.failed.append((path, f"対象日を決められません: {e}"))
+                self.itemFailed.emit(i, str(e))
+                continue
+            w = _OcrWorker(
+                self.pipe, path, target_date,
+                {**(meta or {}), "source": str(path)}, self.db_manager,
+            )
+            w.progress.connect(partial(self._on_progress, i))
+            w.finished.connect(partial(self._on_finished, i))
+            w.failed.connect(partial(self._on_failed, i))
+            self._workers[i] = w
+            self.pool.start(w)
+
+        queued = len(self._workers)
+        self._emit_progress()
+        self._maybe_finish()
+        return queued
+
+    def cancel(self) -> None:
+        """まだ始まっていない画像をプールから外す（処理中・結果待ちの画像は最後まで待つ）"""
+        if not self.is_running():
+            return
+        for i, w in list(self._workers.items()):
+            if w.guard.take(self.pool, w):
+                self._workers.pop(i)
+                self._summary.cancelled += 1
+                self._pct[i] = 100
+        self._emit_progress()
+        self._maybe_finish()
+
+    # ---------------- worker callbacks（GUI スレッド） ----------------
+    def _on_progress(self, i: int, pct: int):
+        self._pct[i] = pct
+        self.itemProgress.emit(i, pct)
+        self._emit_progress()
+
+    def _on_finished(self, i: int, payload: OcrImportPayload):
+        self._workers.pop(i, None)
+        self._pct[i] = 100
+        self._summary.succeeded.append((self._paths[i], payload))
+        if payload.meta.get("cache_hit"):
+            self._summary.cache_hits += 1
+        self.itemFinished.emit(i, payload)
+        self._emit_progress()
+        self._maybe_finish()
+
+    def _on_failed(self, i: int, msg: str):
+        self._workers.pop(i, None)
+        self._pct[i] = 100
+        self._summary.failed.append((self._paths[i], msg))
+        self.itemFailed.emit(i, msg)
+        self._emit_progress()
+        self._maybe_finish()
+
+    def _emit_progress(self):
+        if self._pct:
+            self.progress.emit(sum(self._pct.values()) // len(self._pct))
+
+    def _maybe_finish(self):
+        if self._summary is not None and not self._workers:
+            self._finish()
+
+    def _finish(self):
+        summary, self._summary = self._summary, None
+        summary.elapsed_s = time.perf_counter() - self._t0
+        self.finished.emit(summary)
@@ -0,0 +1,66 @@
+# services/ocr/payload_importer.py
+from dataclasses import dataclass, field
+
+from ffm_ocr.schemas import OcrImportPayload
+
+from ff_manager.core.constants import ITEM_METRICS
+from ff_manager.services.metrics_service import MetricsService
+
+
+@dataclass
+class ImportResult:
+    date: str                                                   # 'YYYY-MM-DD'
+    item_ids: list[int] = field(default_factory=list)           # 書き込み対象になった商品
+    rows: int = 0                                               # 実際に書き込んだ時間別の行数（商品＋客数）
+    unknown_products: list[str] = field(default_factory=list)   # items に無くて取り込めなかった商品名
+
+
+class PayloadImporter:
+    """
+    OcrImportPayload を fact_* 表へ取り込む
+
+    - 商品名は1回の SELECT でまとめて item_id に解決する
+    - 全商品の時間別メトリクスと客数を1トランザクションで execBatch する
+    - 値が変わったセルだけを書く（MetricsRepository の UPSERT）ので、同じ payload を
+      2回取り込んでも2回目は何も書かない
+    - コミット後に書き込んだ範囲の読み込みキャッシュを外す
+    - 日次サマリは書き込んだ分が DAILY_DIRTY に積まれるだけ。保存と同じく呼び出し側が
+      run_db_task で rebuild_daily_dirty を流す（一括取り込みでは最後に1回）
+    """
+    def __init__(self, metrics_service: MetricsService):
+        self.metrics_service = metrics_service
+        self.db = metrics_service.db
+
+    def import_payload(self, payload: OcrImportPayload) -> ImportResult:
+        d = payload.date.isoformat()
+        svc = self.metrics_service
+        ids = svc.repo_items.get_item_ids_by_names(p.name for p in payload.products)
+
+        data_by_item: dict[int, dict[str, dict[int, int]]] = {}
+        for p in payload.products:
+            item_id = ids.get(p.name)
+            if item_id is None:
+                continue
+            data = data_by_item.setdefault(item_id, {})
+            for m, by_hour in p.by_metric.items():
+                if m in ITEM_METRICS:
+                    data.setdefault(m, {}).update({int(h): int(v) for h, v in by_hour.items()})
+        result = ImportResult(
+            date=d,
+            item_ids=sorted(data_by_item),
+            unknown_products=[p.name for p in payload.products if p.name not in ids],
+        )
+        customers = {int(h): int(c) for h, c in payload.customers_by_hour.items()}
+
+        self.db.transaction()
+        try:
+            result.rows = svc.repo.upsert_item_metrics_bulk(d, data_by_item)
+            if customers:
+                result.rows += svc.repo.upsert_hourly_customers(d, customers)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            svc.invalidate(d, result.item_ids, customers=bool(customers))
+        return result
@@ -0,0 +1,38 @@
+# services/pool_task.py
+import threading
+
+from PySide6.QtCore import QRunnable, QThreadPool
+
+
+class TakeGuard:
+    """
+    setAutoDelete(True) のタスクを、まだ始まっていないときだけ QThreadPool から外す
+
+    自動削除のタスクは走り終わるとプールに削除されるが、結果のシグナル（キュー接続）が
+    GUI スレッドに届くまでは呼び出し側が参照を持ったままになる。その間に tryTake すると
+    削除済みの C++ オブジェクトに触って RuntimeError になるので、始まったタスクには触らない。
+
+    タスクは __init__ で guard を持ち、run() の最初で start() を呼ぶ。
+    取り消す側は pool.tryTake(task) の代わりに task.guard.take(pool, task) を呼ぶ。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> None:
+        """ワーカースレッドから run() の最初に呼ぶ"""
+        with self._lock:
+            self._started = True
+
+    def take(self, pool: QThreadPool, task: QRunnable) -> bool:
+        """
+        まだ始まっていなければプールのキューから外す（GUI スレッドから呼ぶ）
+
+        Returns:
+            外せたなら True（走らないまま Python 側の所有に戻る）
+        """
+        with self._lock:
+            # start() と同じロックの中で判定するので、判定の後に走り出して削除されることはない
+            if self._started:
+                return False
+            return pool.tryTake(task)
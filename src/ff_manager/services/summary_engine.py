@@ -0,0 +1,91 @@
+# services/summary_engine.py
+import numpy as np
+
+from ff_manager.core.constants import HOURS, ITEM_METRICS
+
+
+class SummaryEngine:
+    """
+    1日分の全商品合計 (len(ITEM_METRICS), 24) をメモリ上で持ち、商品の編集を差分で反映する。
+
+    合計 = DB の合計 + Σ(編集中の行列 - DB に保存済みの行列)。
+    サマリ行を更新するたびに GROUP BY を流し直す代わりに、この差分だけを足し引きする。
+    保存後は reconcile() で DB の合計に合わせ直す。
+    """
+    def __init__(self):
+        self.date_iso: str | None = None
+        self._totals = np.zeros((len(ITEM_METRICS), len(HOURS)), dtype=np.int64)
+        self._stored: dict[int, np.ndarray] = {}   # item_id -> DB にある行列
+        self._edited: dict[int, np.ndarray] = {}   # item_id -> 未保存の編集後の行列
+
+    def has(self, date_iso: str) -> bool:
+        return self.date_iso == date_iso
+
+    def reset(self, date_iso: str, item_totals: np.ndarray) -> None:
+        """日付を切り替え、DB から読んだ全商品合計を起点にする"""
+        self.date_iso = date_iso
+        self._totals = np.array(item_totals, dtype=np.int64)
+        self._stored.clear()
+        self._edited.clear()
+
+    def clear(self) -> None:
+        self.date_iso = None
+        self._totals.fill(0)
+        self._stored.clear()
+        self._edited.clear()
+
+    def track(self, item_id: int, stored: np.ndarray) -> None:
+        """item_id の DB 上の行列を登録する（未保存の編集があれば捨てる）"""
+        self.revert(item_id)
+        self._stored[item_id] = np.array(stored, dtype=np.int64)
+
+    def apply_cell(self, item_id: int, row: int, hour: int, delta: int) -> None:
+        """商品 item_id の (row, hour) が delta だけ変わった"""
+        edited = self._edited.get(item_id)
+        if edited is None:
+            edited = self._edited[item_id] = self._stored[item_id].copy()
+        edited[row, hour] += delta
+        self._totals[row, hour] += delta
+
+    def update_item(self, item_id: int, matrix: np.ndarray) -> None:
+        """商品 item_id の行列をまとめて差し替える（古い行列を引いて新しい行列を足す）"""
+        old = self._edited.get(item_id, self._stored[item_id])
+        new = np.array(matrix, dtype=np.int64)
+        self._totals += new - old
+        self._edited[item_id] = new
+
+    def revert(self, item_id: int) -> None:
+        """未保存の編集を合計から外す"""
+        edited = self._edited.pop(item_id, None)
+        if edited is not None:
+            self._totals -= edited - self._stored[item_id]
+
+    def commit(self, item_id: int) -> None:
+        """保存が済んだので、編集後の行列を DB 上の行列として扱う（合計は変わらない）"""
+        edited = self._edited.pop(item_id, None)
+        if edited is not None:
+            self._stored[item_id] = edited
+
+    def pending(self) -> set[int]:
+        """未保存の編集がある item_id"""
+        return set(self._edited)
+
+    def item_totals(self) -> np.ndarray:
+        """全商品合計 (len(ITEM_METRICS), 24) の読み取り専用ビュー"""
+        view = self._totals.view()
+        view.flags.writeable = False
+        return view
+
+    def reconcile(self, db_totals: np.ndarray) -> bool:
+        """
+        保存後に DB の合計と突き合わせ、DB 側に合わせ直す
+
+        Returns:
+            メモリ上の合計が DB と一致していたら True（他の画面・OCR の書き込みがあると False）
+        """
+        expected = np.array(db_totals, dtype=np.int64)
+        for item_id, edited in self._edited.items():
+            expected += edited - self._stored[item_id]
+        matched = bool(np.array_equal(self._totals, expected))
+        self._totals = expected
+        return matched
@@ -0,0 +1,79 @@
+# tests_scripts/bench/chart_redraw.py
+"""
+編集画面のグラフ（ChartArea）の1回あたりの描き直し時間を計測する。
+
+- full : 変更前と同じく毎回 ax.clear() して線・凡例を作り直し canvas.draw()
+- blit : ChartArea.refresh（y 軸の範囲が同じなら set_ydata + blit）
+
+画面は出さない（offscreen）。
+
+    python -m ff_manager.tests_scripts.bench.chart_redraw --repeat 100
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+from ff_manager.core.constants import HOURS, ITEM_LABELS_JA, ITEM_METRICS
+from ff_manager.ui.edit_grid.chart_area import ChartArea
+
+
+def _full_redraw(area: ChartArea, data: dict):
+    # 変更前の ChartArea.refresh と同じ描き方
+    area.ax.clear()
+    area.ax2.clear()
+    area.ax.set_xticks(HOURS)
+    for m, la in ITEM_LABELS_JA.items():
+        area.ax.plot(HOURS, data[m], label=la)
+    area.ax.set_ylim(0, 20)
+    area.ax2.plot(HOURS, data["customer"], color="black", linestyle="--", label="客数")
+    area.ax2.set_ylim(0, 200)
+    area.ax.set_xlabel("Hour")
+    area.ax.set_ylabel("Count")
+    area.ax.legend(loc="upper left")
+    area.ax2.legend(loc="upper right")
+    area.canvas.draw()
+
+
+def _timed(fn, datasets) -> float:
+    t0 = time.perf_counter()
+    for d in datasets:
+        fn(d)
+        QApplication.processEvents()   # draw_idle・再描画もここで消化させる
+    return (time.perf_counter() - t0) / len(datasets)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=100)
+    args = ap.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    rng = np.random.default_rng(0)
+    datasets = []
+    for _ in range(args.repeat):
+        d = {m: rng.integers(0, 15, len(HOURS)) for m in ITEM_METRICS}
+        d["customer"] = rng.integers(0, 90, len(HOURS))
+        datasets.append(d)
+
+    area = ChartArea(None)
+    area.canvas.resize(800, 300)
+    area.canvas.setVisible(True)
+    area.refresh(datasets[0])
+    QApplication.processEvents()
+
+    t_blit = _timed(area.refresh, datasets)
+    t_full = _timed(lambda d: _full_redraw(area, d), datasets)
+
+    print(f"{args.repeat} redraws")
+    print(f"  full redraw      : {t_full * 1e3:8.2f} ms/redraw")
+    print(f"  ChartArea.refresh: {t_blit * 1e3:8.2f} ms/redraw  x{t_full / t_blit:.1f}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# tests_scripts/bench/daily_rollup.py
+"""
+日次ロールアップ（fact_hourly_long → fact_daily）の全期間作り直しを計測する。
+
+rebuild_daily_all（stock_end を相関サブクエリで取得）と、採用しなかった1パス版
+（(hour << 32) | value の MAX で stock_end を取る）を同じ合成データで比較し、
+カバリングインデックス idx_fhl_rollup の有無でも測る。
+
+    python -m ff_manager.tests_scripts.bench.daily_rollup --years 3 --items 80
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtSql import QSqlQuery
+
+from ff_manager.config import TABLE
+from ff_manager.core.constants import ITEM_METRICS
+from ff_manager.db.connection import get_db
+from ff_manager.db.migrations import ensure_schema_and_migrate
+from ff_manager.db.aggregate import rebuild_daily_all
+
+# 1パス版（比較用。idx_fhl_rollup があると相関サブクエリより遅いので採用していない）
+ONE_PASS_SQL = """
+    INSERT INTO fact_daily(date,item_id,prepared,sold,discarded,stock_end)
+    SELECT
+      h.date, h.item_id,
+      SUM(CASE WHEN h.metric='prepared'  THEN h.value ELSE 0 END),
+      SUM(CASE WHEN h.metric='sold'      THEN h.value ELSE 0 END),
+      SUM(CASE WHEN h.metric='discarded' THEN h.value ELSE 0 END),
+      COALESCE(MAX(CASE WHEN h.metric='stock' THEN (h.hour << 32) | h.value END) & 4294967295, 0)
+    FROM fact_hourly_long h
+    GROUP BY h.date, h.item_id
+"""
+
+ROLLUP_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_fhl_rollup
+        ON fact_hourly_long(date, item_id, metric, hour, value)
+"""
+
+CHECKSUM_SQL = """
+    SELECT COUNT(*), SUM(prepared), SUM(sold), SUM(discarded), SUM(stock_end)
+    FROM fact_daily
+"""
+
+
+def generate(path: Path, years: int, items: int, seed: int = 0) -> int:
+    """営業時間(6〜22時)の合成データを sqlite3 の executemany で投入し、行数を返す"""
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT OR IGNORE INTO items(item_id,item_name,price) VALUES(?,?,?)",
+        [(i, f"bench-{i}", 100) for i in range(1, items + 1)],
+    )
+    start = datetime.date(2020, 1, 1)
+    total = 0
+    for day in range(365 * years):
+        d = (start + datetime.timedelta(days=day)).isoformat()
+        rows = [
+            (d, h, it, m, rnd.randint(0, 30))
+            for it in range(1, items + 1)
+            for h in range(6, 23)
+            for m in ITEM_METRICS
+        ]
+        conn.executemany(
+            "INSERT INTO fact_hourly_long(date,hour,item_id,metric,value) VALUES(?,?,?,?,?)",
+            rows,
+        )
+        total += len(rows)
+    conn.commit()
+    conn.close()
+    return total
+
+
+def _timed(db, fn) -> tuple[float, tuple]:
+    db.transaction()
+    t0 = time.perf_counter()
+    ok = fn()
+    elapsed = time.perf_counter() - t0
+    if not ok:
+        db.rollback()
+        raise RuntimeError("rollup failed")
+    q = QSqlQuery(db)
+    q.exec(CHECKSUM_SQL)
+    q.next()
+    checksum = tuple(int(q.value(i) or 0) for i in range(5))
+    db.commit()
+    return elapsed, checksum
+
+
+def _one_pass(db) -> bool:
+    q = QSqlQuery(db)
+    return q.exec("DELETE FROM fact_daily") and q.exec(ONE_PASS_SQL)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--items", type=int, default=80)
+    ap.add_argument("--db", help="使い回すDBファイル（省略時は一時ファイル）")
+    args = ap.parse_args()
+
+    app = QCoreApplication(sys.argv)  # QSQLITE ドライバの読み込みに必要
+
+    tmp = None
+    if args.db:
+        path = Path(args.db)
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        path = Path(tmp.name) / "bench.db"
+
+    db = get_db(str(path))
+    ensure_schema_and_migrate(db, TABLE)
+    q = QSqlQuery(db)
+    q.exec("SELECT COUNT(*) FROM fact_hourly_long")
+    rows = int(q.value(0)) if q.next() else 0
+    if rows == 0:
+        db.close()
+        t0 = time.perf_counter()
+        rows = generate(path, args.years, args.items)
+        print(f"generated {rows:,} rows in {time.perf_counter() - t0:.1f}s")
+        db.open()
+
+    print(f"fact_hourly_long: {rows:,} rows")
+    for with_index in (False, True):
+        QSqlQuery(db).exec(ROLLUP_INDEX_SQL if with_index else "DROP INDEX IF EXISTS idx_fhl_rollup")
+        QSqlQuery(db).exec("ANALYZE")
+        t_cur, sum_cur = _timed(db, lambda: rebuild_daily_all(db))
+        t_alt, sum_alt = _timed(db, lambda: _one_pass(db))
+        label = "with idx_fhl_rollup" if with_index else "without idx_fhl_rollup"
+        print(f"[{label}]")
+        print(f"  rebuild_daily_all (correlated subquery): {t_cur * 1000:9.1f} ms")
+        print(f"  1 pass (MAX((hour << 32) | value))      : {t_alt * 1000:9.1f} ms  x{t_cur / t_alt:.2f}")
+        if sum_cur != sum_alt:
+            print(f"  [WARN] checksum mismatch: {sum_cur} != {sum_alt}")
+
+    db.close()
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# tests_scripts/bench/image_preview.py
+"""
+取り込み画面で写真を開いたときの、プレビューを出すまでの時間と確保メモリを比べる。
+
+- legacy : 変更前の _open（PIL でフル解像度を RGB に展開 + QPixmap(path).scaledToWidth(600)。
+           同じファイルを2回、どちらもフル解像度で復号）
+- preview: decode_preview（JPEG は draft で縮小したまま復号、EXIF の向きを反映）
+
+縦撮り（EXIF Orientation=6）の 12MP JPEG を一時ファイルに作って使う。画面は出さない（offscreen）。
+
+    python -m ff_manager.tests_scripts.bench.image_preview --repeat 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PIL import Image
+from PySide6.QtGui import QPixmap
+from PySide6.QtWidgets import QApplication
+
+from ff_manager.services.image_loader import decode_preview
+
+W, H = 4000, 3000
+
+
+def legacy_open(path: str):
+    img = Image.open(path).convert("RGB")
+    pix = QPixmap(path).scaledToWidth(600)
+    return img, pix
+
+
+def make_jpeg(path: str) -> None:
+    rng = np.random.default_rng(0)
+    # 乱数だけだと JPEG の復号が不自然に重くなるので、なめらかな模様に少しノイズを足す
+    y, x = np.mgrid[0:H, 0:W]
+    base = ((x // 8 + y // 8) % 256).astype(np.uint8)
+    rgb = np.stack([base, base[::-1], base[:, ::-1]], axis=2)
+    rgb = np.clip(rgb + rng.integers(0, 16, size=rgb.shape), 0, 255).astype(np.uint8)
+    exif = Image.Exif()
+    exif[0x0112] = 6   # 右に 90° 回転して表示する（縦撮り）
+    Image.fromarray(rgb).save(path, quality=90, exif=exif)
+
+
+def measure(fn, path: str, repeat: int) -> tuple[float, int]:
+    """(中央値 ms, numpy/PIL 側の確保バイト数のピーク)"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(path)
+        times.append((time.perf_counter() - t0) * 1e3)
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "photo.jpg")
+        make_jpeg(path)
+        preview, size = decode_preview(path)
+        print(f"{W}x{H} JPEG (Orientation=6), median of {args.repeat}")
+        print(f"  preview: {preview.width()}x{preview.height()} (元画像 {size[0]}x{size[1]})")
+        base = None
+        for name, fn in [("legacy", legacy_open), ("preview", decode_preview)]:
+            ms, peak = measure(fn, path, args.repeat)
+            base = base or ms
+            print(f"  {name:7s}: {ms:8.2f} ms  alloc {peak / (1024 * 1024):7.1f} MB  x{base / ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
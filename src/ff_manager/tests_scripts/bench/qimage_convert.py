@@ -0,0 +1,146 @@
+# tests_scripts/bench/qimage_convert.py
+"""
+12MP（4000x3000）の写真で QImage ⇔ ndarray の変換の時間と確保メモリを比べる。
+
+- legacy : 変更前の書き方（RGB→BGR の ::-1 + copy / [2,1,0,3] のファンシーインデックス /
+           グレースケールの np.repeat / ndarray→QImage の並べ替えコピー + qimg.copy()）
+- view   : qimage_to_ndarray(copy=False)。形式が合えば QImage のメモリをそのまま指す
+- gray   : qimage_to_gray。Qt で一度に Grayscale8 へ変換（OCR の前処理向け）
+
+メモリは numpy 側の確保（tracemalloc のピーク）と、convertToFormat で Qt 側に作られた画像の大きさの合計。
+
+    python -m ff_manager.tests_scripts.bench.qimage_convert --repeat 10
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PySide6.QtGui import QImage
+
+from ff_manager.ui.utils.image import ndarray_to_qimage, qimage_to_gray, qimage_to_ndarray
+
+W, H = 4000, 3000
+
+
+# ---------------- 変更前の実装（比較用） ----------------
+def _legacy_view(qimg: QImage, c: int) -> np.ndarray:
+    bpl = qimg.bytesPerLine()
+    arr = np.frombuffer(qimg.constBits(), dtype=np.uint8, count=qimg.height() * bpl)
+    return arr.reshape((qimg.height(), bpl))[:, : qimg.width() * c].reshape((qimg.height(), qimg.width(), c))
+
+
+def legacy_rgb888(qimg):
+    return _legacy_view(qimg, 3)[:, :, ::-1].copy()
+
+
+def legacy_argb32(qimg):
+    return _legacy_view(qimg, 4)[:, :, [2, 1, 0, 3]].copy()
+
+
+def legacy_gray8(qimg):
+    return np.repeat(_legacy_view(qimg, 1), 3, axis=2).copy()
+
+
+def legacy_to_gray(qimg):
+    # 変更前: BGR にしてから cvtColor
+    return cv2.cvtColor(legacy_rgb888(qimg), cv2.COLOR_BGR2GRAY)
+
+
+def legacy_to_qimage(img):
+    rgb = img[:, :, ::-1].copy()
+    return QImage(rgb.data, img.shape[1], img.shape[0], img.shape[1] * 3, QImage.Format.Format_RGB888).copy()
+
+
+# ---------------- 計測 ----------------
+def _qt_bytes(src: QImage, out) -> int:
+    # convertToFormat で Qt 側に新しい画像ができた分
+    q = getattr(out, "qimage", None)
+    if q is None or q.cacheKey() == src.cacheKey():
+        return 0
+    return q.sizeInBytes()
+
+
+def measure(fn, src, repeat: int):
+    """(中央値 ms, numpy 側の確保バイト数, 最後の結果)"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(src)
+        times.append((time.perf_counter() - t0) * 1e3)
+        del out
+    tracemalloc.start()
+    out = fn(src)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak, out
+
+
+def _nocopy_to_qimage(img):
+    return ndarray_to_qimage(img, copy=False)
+
+
+def _report(name: str, ms: float, nbytes: int, base: float) -> None:
+    print(f"  {name:7s}: {ms:8.2f} ms  alloc {nbytes / (1024 * 1024):7.1f} MB  x{base / ms:.1f}")
+
+
+def make_images(rng) -> dict[str, QImage]:
+    bgr = rng.integers(0, 256, size=(H, W, 3), dtype=np.uint8)
+    rgb888 = ndarray_to_qimage(bgr, as_bgr=False)
+    return {
+        "RGB888": rgb888,
+        "ARGB32": rgb888.convertToFormat(QImage.Format.Format_ARGB32),
+        "Grayscale8": rgb888.convertToFormat(QImage.Format.Format_Grayscale8),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    imgs = make_images(rng)
+
+    cases = [
+        ("RGB888 -> BGR", imgs["RGB888"], [
+            ("legacy", legacy_rgb888),
+            ("view", lambda q: qimage_to_ndarray(q, copy=False)),
+            ("copy", lambda q: qimage_to_ndarray(q)),
+        ]),
+        ("ARGB32 -> BGRA", imgs["ARGB32"], [
+            ("legacy", legacy_argb32),
+            ("view", lambda q: qimage_to_ndarray(q, copy=False)),
+        ]),
+        ("Grayscale8", imgs["Grayscale8"], [
+            ("legacy", legacy_gray8),
+            ("view", lambda q: qimage_to_ndarray(q, copy=False)),
+        ]),
+        ("RGB888 -> gray(OCR)", imgs["RGB888"], [
+            ("legacy", legacy_to_gray),
+            ("gray", qimage_to_gray),
+        ]),
+    ]
+    print(f"{W}x{H} ({W * H / 1e6:.0f} MP), median of {args.repeat}")
+    for title, src, fns in cases:
+        print(f"[{title}]")
+        base = None
+        for name, fn in fns:
+            ms, peak, out = measure(fn, src, args.repeat)
+            base = base or ms
+            _report(name, ms, peak + _qt_bytes(src, out), base)
+
+    bgr = qimage_to_ndarray(imgs["RGB888"])
+    print("[BGR ndarray -> QImage]")
+    base = None
+    for name, fn in [("legacy", legacy_to_qimage), ("copy", ndarray_to_qimage), ("nocopy", _nocopy_to_qimage)]:
+        ms, peak, out = measure(fn, bgr, args.repeat)
+        base = base or ms
+        # nocopy は配列のメモリを指すだけ
+        _report(name, ms, peak + (0 if fn is _nocopy_to_qimage else out.sizeInBytes()), base)
+
+
+if __name__ == "__main__":
+    main()
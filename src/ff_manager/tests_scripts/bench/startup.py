@@ -0,0 +1,126 @@
+# tests_scripts/bench/startup.py
+"""
+起動からメニュー画面の最初の描画までの時間と、その時点で読み込まれたモジュールを計測する。
+
+子プロセスを `python -X importtime` で起動し、main.py と同じ手順で MainWindow を表示して
+メニューの最初の paint までを測る。import の内訳（cumulative の上位）も出す。
+
+重いモジュール（matplotlib / numpy / PIL / ffm_ocr など）が起動時に読み込まれていたり、
+--budget-ms を超えたりしたら終了コード 1（退行の検出用）。
+
+    python -m ff_manager.tests_scripts.bench.startup --runs 5 --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# メニュー表示までに読み込まれてはいけないモジュール（各ページを開くときに読み込む）
+HEAVY_MODULES = ("matplotlib", "numpy", "PIL", "ffm_ocr", "cv2", "paddleocr")
+
+
+def _child(db_path: str) -> None:
+    t0 = time.perf_counter()
+    from PySide6.QtCore import QObject, QEvent
+    from PySide6.QtWidgets import QApplication
+
+    from ff_manager.db.connection import get_db
+    from ff_manager.ui.main_window import MainWindow
+    from ff_manager.ui.styles.theme import load_qss
+    t_import = time.perf_counter()
+
+    app = QApplication(sys.argv[:1])
+    app.setStyleSheet(load_qss())
+    db = get_db(db_path)
+    w = MainWindow(db)
+    t_window = time.perf_counter()
+
+    painted = {}
+
+    class _PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and "t" not in painted:
+                painted["t"] = time.perf_counter()
+            return False
+
+    watcher = _PaintWatcher()
+    menu = w.stack.widget(0)
+    menu.installEventFilter(watcher)
+    w.show()
+    deadline = time.perf_counter() + 10
+    while "t" not in painted and time.perf_counter() < deadline:
+        app.processEvents()
+
+    heavy = sorted(m for m in HEAVY_MODULES if m in sys.modules)
+    print(json.dumps({
+        "import_ms": (t_import - t0) * 1e3,
+        "window_ms": (t_window - t0) * 1e3,
+        "first_paint_ms": (painted.get("t", float("nan")) - t0) * 1e3,
+        "heavy_modules": heavy,
+    }))
+    db.close()
+
+
+def _parse_importtime(stderr: str, top: int) -> list[tuple[int, str]]:
+    """-X importtime の出力から (cumulative μs, モジュール名) を大きい順に返す"""
+    rows = []
+    for line in stderr.splitlines():
+        # 書式: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cum_us), name.strip()))
+    rows.sort(key=lambda r: -r[0])
+    return rows[:top]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5, help="計測回数（中央値を使う）")
+    ap.add_argument("--top", type=int, default=15, help="import 時間の上位何件を出すか")
+    ap.add_argument("--budget-ms", type=float, default=1500.0, help="最初の描画までの上限")
+    ap.add_argument("--child", metavar="DB", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child)
+        return
+
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    results, importtime = [], ""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "startup.db")
+        for i in range(args.runs + 1):   # 1回目はスキーマ作成と .pyc 生成を含むので捨てる
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-m", __spec__.name, "--child", db_path],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            if i == 0:
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            importtime = proc.stderr
+
+    def median(key):
+        vals = sorted(r[key] for r in results)
+        return vals[len(vals) // 2]
+
+    heavy = results[-1]["heavy_modules"]
+    print(f"{args.runs} runs (median)")
+    print(f"  imports          : {median('import_ms'):8.1f} ms")
+    print(f"  MainWindow built : {median('window_ms'):8.1f} ms")
+    print(f"  menu first paint : {median('first_paint_ms'):8.1f} ms  (budget {args.budget_ms:.0f} ms)")
+    print(f"  heavy modules    : {', '.join(heavy) or '-'}")
+    print(f"top {args.top} imports by cumulative time (-X importtime):")
+    for cum_us, name in _parse_importtime(importtime, args.top):
+        print(f"  {cum_us / 1000:8.1f} ms  {name}")
+
+    if heavy or median("first_paint_ms") > args.budget_ms:
+        print("[FAIL] startup regressed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
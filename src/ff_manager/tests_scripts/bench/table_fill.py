@@ -0,0 +1,111 @@
+# tests_scripts/bench/table_fill.py
+"""
+編集画面のグリッドへ1日分を流し込む時間をテーブル1枚あたりで計測する。
+
+- naive      : シグナルを止めずにセルごと setText（itemChanged → 検証が毎回走る）
+- bulk_update: fill_table_matrix（シグナル・再描画を止めてまとめて書く）
+- model      : MatrixTableModel.set_matrix（配列を入れて dataChanged 1回）
+
+検証器の呼び出し回数も数える。画面は出さない（offscreen）。
+
+    python -m ff_manager.tests_scripts.bench.table_fill --repeat 200
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+from ff_manager.core.constants import (
+    HOURS, ITEM_METRICS, ITEM_LABELS_JA, SUMMARY_ROWS, SUMMARY_LABELS_JA
+)
+from ff_manager.ui.edit_grid import tables
+from ff_manager.ui.edit_grid.tables import (
+    init_item_table, init_summary_table, init_matrix_view, fill_table_matrix
+)
+from ff_manager.ui.edit_grid.matrix_model import MatrixTableModel
+
+
+def _naive_fill(table, matrix):
+    # 変更前の fill_table_matrix と同じ書き方
+    totals = matrix.sum(axis=1)
+    for r, row in enumerate(matrix.tolist()):
+        for h, v in enumerate(row):
+            table.item(r, h).setText(str(v))
+        table.item(r, len(row)).setText(str(int(totals[r])))
+
+
+def _timed(fn, matrices) -> float:
+    t0 = time.perf_counter()
+    for m in matrices:
+        fn(m)
+    QApplication.processEvents()   # 積まれた再描画もまとめて計上
+    return (time.perf_counter() - t0) / len(matrices)
+
+
+def _count_sanitize():
+    # tables.sanitize_int_item の呼び出し回数を数える（itemChanged の接続先もこれを呼ぶ）
+    orig = tables.sanitize_int_item
+    counter = {"n": 0}
+
+    def counting(item, validator):
+        counter["n"] += 1
+        return orig(item, validator)
+
+    tables.sanitize_int_item = counting
+    return counter, lambda: setattr(tables, "sanitize_int_item", orig)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=200, help="1テーブルあたりの流し込み回数")
+    args = ap.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    rng = np.random.default_rng(0)
+
+    cases = [
+        ("item", lambda: init_item_table(ITEM_METRICS, ITEM_LABELS_JA),
+         [ITEM_LABELS_JA[m] for m in ITEM_METRICS], None),
+        ("summary", lambda: init_summary_table(SUMMARY_ROWS, SUMMARY_LABELS_JA),
+         [SUMMARY_LABELS_JA[m] for m in SUMMARY_ROWS], {0}),
+    ]
+    for name, make_table, labels, editable in cases:
+        matrices = [rng.integers(0, 200, size=(len(labels), len(HOURS))) for _ in range(args.repeat)]
+
+        counter, restore = _count_sanitize()
+        try:
+            table = make_table()
+            table.show()
+            counter["n"] = 0
+            t_naive = _timed(lambda m: _naive_fill(table, m), matrices)
+            n_naive = counter["n"]
+
+            counter["n"] = 0
+            t_bulk = _timed(lambda m: fill_table_matrix(table, m), matrices)
+            n_bulk = counter["n"]
+            table.close()
+        finally:
+            restore()
+
+        model = MatrixTableModel(labels, editable_rows=editable)
+        view = init_matrix_view(model)
+        view.show()
+        t_model = _timed(model.set_matrix, matrices)
+        view.close()
+
+        cells = len(labels) * (len(HOURS) + 1)
+        print(f"[{name}] {cells} cells x {args.repeat} fills")
+        print(f"  naive setText   : {t_naive * 1e3:8.3f} ms/fill  validator calls/fill={n_naive / args.repeat:.0f}")
+        print(f"  bulk_update     : {t_bulk * 1e3:8.3f} ms/fill  validator calls/fill={n_bulk / args.repeat:.0f}"
+              f"  x{t_naive / t_bulk:.1f}")
+        print(f"  MatrixTableModel: {t_model * 1e3:8.3f} ms/fill  x{t_naive / t_model:.1f}")
+
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,8 @@ import cv2
 from pathlib import Path
 import numpy as np
 from PIL import Image
-from ff_manager.services.ocr.paddle_engine_table import PaddleTableEngine
-from ff_manager.services.ocr.preprocess import preprocess_for_ocr,_deskew
+# 前処理（傾き補正・タブレット切り出し）は ffm_ocr.preprocess に移した
+from ffm_ocr.preprocess import deskew
 
 
 def main():
@@ -26,37 +26,6 @@ def main():
 
 
 
-def crop_tablet_screen(img):
-
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = cv2.Canny(gray, 50, 150)
-
-    # 輪郭を抽出
-    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    contours = sorted(contours, key=cv2.contourArea, reverse=True)
-
-    for c in contours:
-        peri = cv2.arcLength(c, True)
-        approx = cv2.approxPolyDP(c, 0.02 * peri, True)
-        if len(approx) == 4:  # 4点ならタブレットの枠とみなす
-            pts = np.array([p[0] for p in approx], dtype="float32")
-            break
-    else:
-        print("[WARN] 四角形が検出できませんでした")
-        return img
-
-    # 台形補正（透視変換）
-    (tl, tr, br, bl) = pts
-    width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
-    height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
-    dst = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype="float32")
-    M = cv2.getPerspectiveTransform(pts, dst)
-    warped = cv2.warpPerspective(img, M, (int(width), int(height)))
-
-    print("[INFO] タブレット画面を抽出しました")
-    return warped
-
 def preproc(pil_img,out_img_path):
     img = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
     
@@ -67,7 +36,8 @@ def preproc(pil_img,out_img_path):
     # img = cv2.fastNlMeansDenoising(img, None, h=15)
 
     # 傾き補正
-    img = _deskew(img)
+    img, angle = deskew(img)
+    print(f"[INFO] 傾き補正: {angle:.2f}°")
 
     
     # out = Path(out_img_path)
@@ -0,0 +1,84 @@
+# tests_scripts/ocr/pipeline_stub.py
+"""
+OcrPipeline をモデル無し（StubRecognizer）で通す確認用スクリプト。
+
+罫線の表を描いた合成画像を少し傾け、切り出し以外のステージ
+（傾き補正 → セル検出 → 認識 → 組み立て）を通して payload を表示する。
+続けて同じ表を広い余白の真ん中に置いた画像（大きな四角形が無い）を crop=True で通し、
+切り出さずに元の画像のまま最後まで進むことを確かめる。
+--workers を付けると認識ステージをプロセスプールで回す。
+
+    python -m ff_manager.tests_scripts.ocr.pipeline_stub --workers 2
+"""
+import argparse
+from datetime import date
+
+import cv2
+import numpy as np
+
+from ffm_ocr.pipeline import OcrPipeline, make_process_pool
+from ffm_ocr.recognize import StubRecognizer
+
+ROWS = [
+    ["", "9", "10", "11", "12"],
+    ["客数", "18", "22", "35", "40"],
+    ["商品A", "", "", "", ""],
+    ["仕込数", "12", "10", "8", "6"],
+    ["販売数", "11", "9", "9", "5"],
+    ["廃棄数", "", "1", "", ""],
+]
+
+
+def make_table_image(n_rows: int, n_cols: int, cell=(120, 48), skew_deg: float = 2.0) -> np.ndarray:
+    """罫線だけの表（白地に黒線）を描いて skew_deg だけ回す"""
+    w, h = cell[0] * n_cols + 40, cell[1] * n_rows + 40
+    img = np.full((h, w, 3), 255, np.uint8)
+    for r in range(n_rows + 1):
+        y = 20 + r * cell[1]
+        cv2.line(img, (20, y), (20 + cell[0] * n_cols, y), (0, 0, 0), 2)
+    for c in range(n_cols + 1):
+        x = 20 + c * cell[0]
+        cv2.line(img, (x, 20), (x, 20 + cell[1] * n_rows), (0, 0, 0), 2)
+    m = cv2.getRotationMatrix2D((w / 2, h / 2), skew_deg, 1.0)
+    return cv2.warpAffine(img, m, (w, h), borderValue=(255, 255, 255))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, default=0, help="認識ステージのプロセス数（0 なら直列）")
+    args = ap.parse_args()
+
+    img = make_table_image(len(ROWS), len(ROWS[0]))
+    pool = make_process_pool(args.workers) if args.workers else None
+    try:
+        pipe = OcrPipeline(StubRecognizer.from_rows(ROWS), crop=False, executor=pool, chunk_size=8)
+        result = pipe.run(img)
+        payload = pipe.to_payload(result, date(2025, 1, 1), meta={"source": "stub"})
+
+        # いちばん大きい輪郭（表の外枠）でも画像の 20% 未満 → 四角形なしで切り出さずに進む
+        h, w = img.shape[:2]
+        no_quad = np.full((h * 3, w * 3, 3), 255, np.uint8)
+        no_quad[h:2 * h, w:2 * w] = img
+        cropping = OcrPipeline(StubRecognizer.from_rows(ROWS), crop=True, executor=pool, chunk_size=8)
+        crop_result = cropping.run(no_quad)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print("grid:", result.grid.shape, " deskew:", f"{result.meta['deskew_deg']:.2f}°")
+    print("timings(ms):", {k: round(v, 1) for k, v in result.meta["timings_ms"].items()})
+    print("customers:", payload.customers_by_hour)
+    for p in payload.products:
+        print(f"  {p.name}: {p.by_metric}")
+    if result.grid.shape != (len(ROWS), len(ROWS[0])):
+        print("[WARN] 検出した格子の大きさが表と違います")
+
+    print("crop=True (no quad):", "cropped:", crop_result.meta["cropped"], " grid:", crop_result.grid.shape)
+    if crop_result.meta["cropped"]:
+        print("[WARN] 四角形の無い画像を切り出しました")
+    if crop_result.grid.shape != (len(ROWS), len(ROWS[0])):
+        print("[WARN] crop=True で検出した格子の大きさが表と違います")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,10 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 
+from ff_manager.ui.utils.fonts import apply_cjk_font
+
+apply_cjk_font()
+
 
 class ChartsWidget(QWidget):
     def __init__(self, chart_service,stacked_widget, parent=None):
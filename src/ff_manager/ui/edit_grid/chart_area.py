@@ -1,12 +1,39 @@
 # ui/chart_area.py
+import math
+
+import numpy as np
 from PySide6.QtWidgets import QPushButton
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from ff_manager.core.constants import HOURS, ITEM_LABELS_JA
+from ff_manager.ui.utils.fonts import apply_cjk_font
+
+apply_cjk_font()
+
+# y 軸の下限幅（データが全部 0 でも軸が潰れないように）
+MIN_YLIM_ITEM = 5
+MIN_YLIM_CUSTOMER = 10
+
+
+def nice_ylim(values, minimum: int) -> int:
+    """最大値に 1 割の余白を足し、1/2/5×10^n の切りのいい値に切り上げる"""
+    top = max(float(np.max(values)) if np.size(values) else 0.0, 0.0) * 1.1
+    top = max(top, minimum)
+    base = 10 ** math.floor(math.log10(top))
+    for step in (1, 2, 5, 10):
+        if top <= step * base:
+            return int(step * base)
+    return int(10 * base)
+
 
 class ChartArea:
     def __init__(self, parent_widget):
-        """簡易グラフ描画エリア"""
+        """
+        簡易グラフ描画エリア
+
+        線（Line2D）・凡例・ラベルは最初に1回だけ作り、refresh では y データだけ差し替える。
+        y 軸の範囲が変わらなければ背景を再利用して線だけ描き直す（blit）。
+        """
         self.parent = parent_widget
 
         # Figure/Canvas
@@ -17,6 +44,27 @@ class ChartArea:
         self.ax = self.figure.subplots()
         self.ax2 = self.ax.twinx()  # 右軸を保持
 
+        # 線・凡例・ラベル（以後は作り直さない）
+        zeros = np.zeros(len(HOURS))
+        self.lines = {}
+        for m, la in ITEM_LABELS_JA.items():
+            (self.lines[m],) = self.ax.plot(HOURS, zeros, label=la, animated=True)
+        (self.lines["customer"],) = self.ax2.plot(
+            HOURS, zeros, color="black", linestyle="--", label="客数", animated=True
+        )
+        self.ax.set_xticks(HOURS)
+        self.ax.set_xlabel("Hour")
+        self.ax.set_ylabel("Count")
+        self.ax.legend(loc="upper left")
+        self.ax2.legend(loc="upper right")
+        self._ylim = (MIN_YLIM_ITEM, MIN_YLIM_CUSTOMER)
+        self.ax.set_ylim(0, self._ylim[0])
+        self.ax2.set_ylim(0, self._ylim[1])
+
+        # 線を除いた背景（全体を描いた直後に取り直す）
+        self._background = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
         # 初期状態は非表示
         self.canvas.setVisible(False)
 
@@ -32,23 +80,33 @@ class ChartArea:
 
     def refresh(self, data: dict):
         """データを使ってチャートを更新"""
-        self.ax.clear()
-        self.ax2.clear()
-        self.ax.set_xticks(HOURS)
+        for key, line in self.lines.items():
+            line.set_ydata(data[key])
 
-        # 左軸: 商品メトリクス
-        for m, la in ITEM_LABELS_JA.items():
-            self.ax.plot(HOURS, data[m], label=la)
-        self.ax.set_ylim(0, 20)
+        item_values = [data[m] for m in ITEM_LABELS_JA]
+        ylim = (
+            nice_ylim(item_values, MIN_YLIM_ITEM),
+            nice_ylim(data["customer"], MIN_YLIM_CUSTOMER),
+        )
+        if ylim != self._ylim or self._background is None:
+            # 目盛りが変わる（または背景がまだ無い）ので全体を描き直す。線は _on_draw で載せる
+            self._ylim = ylim
+            self.ax.set_ylim(0, ylim[0])
+            self.ax2.set_ylim(0, ylim[1])
+            self.canvas.draw_idle()
+            return
+        self._blit()
 
-        # 右軸: 客数
-        self.ax2.plot(HOURS, data["customer"], color="black", linestyle="--", label="客数")
-        self.ax2.set_ylim(0, 200)
+    # ---------------- internal ----------------
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()
 
-        # 軸ラベルなど
-        self.ax.set_xlabel("Hour")
-        self.ax.set_ylabel("Count")
-        self.ax.legend(loc="upper left")
-        self.ax2.legend(loc="upper right")
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        self._draw_lines()
+        self.canvas.blit(self.figure.bbox)
 
-        self.canvas.draw()
+    def _draw_lines(self):
+        for line in self.lines.values():
+            line.axes.draw_artist(line)
@@ -17,21 +17,19 @@ from ff_manager.db.repositories.items_repo import ItemsRepository
 
 from ff_manager.services.metrics_service import MetricsService
 from ff_manager.services.chart_service import ChartService
+from ff_manager.services.metrics_loader import MetricsLoader, MetricsSnapshot
+from ff_manager.services.metrics_prefetcher import MetricsPrefetcher
+from ff_manager.services.summary_engine import SummaryEngine
+from ff_manager.db.connection import ConnectionManager
 
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 from ff_manager.config import TEST_MODE
 
-from ff_manager.ui.edit_grid.tables import (
-    init_summary_table,
-    init_item_table,
-    clear_table,
-    fill_table,
-)
+from ff_manager.ui.edit_grid.tables import init_matrix_view
+from ff_manager.ui.edit_grid.matrix_model import MatrixTableModel
 
 from ff_manager.ui.edit_grid.chart_area import ChartArea
+from ff_manager.ui.edit_grid.reload_scheduler import ReloadScheduler
 from ff_manager.ui.effects.gradient_bg import GradientBackground
-from ff_manager.ui.ocr_import import ocr_import_widget
 
 DEFAULT_DATE=(2025,1,1)
 
@@ -45,6 +43,7 @@ class EditGridWidget(QWidget):
             chart_service:ChartService,
             items_repo:ItemsRepository,
             stacked_widget:QStackedWidget,
+            db_manager:ConnectionManager | None = None,
             parent=None
             ):
         super().__init__(parent)
@@ -54,9 +53,36 @@ class EditGridWidget(QWidget):
         self.metrics_service = metrics_service
         self.chart_service=chart_service
 
+        # シグナルが連続しても読み込みはイベントループ1周に1回
+        self.reload_scheduler = ReloadScheduler(self.reload_all, self)
+
+        # 日付・商品の切り替え時の読み込みはワーカーで（db_manager が無ければ同期）
+        self.loader = None
+        self.prefetcher = None
+        if db_manager is not None:
+            self.loader = MetricsLoader(db_manager, metrics_service.cache, self)
+            self.loader.loaded.connect(self._apply_snapshot)
+            self.loader.failed.connect(self._on_load_failed)
+            # 前後の日付・商品をキャッシュに先読みしておく（< > ボタン用）
+            self.prefetcher = MetricsPrefetcher(db_manager, metrics_service.cache, self)
+
+        # 商品名 -> item_id（コンボの中身と一緒に更新）
+        self._item_ids: dict[str, int] = {}
+
+        # 表示中の日付の全商品合計（商品の編集を差分で反映し、保存時に DB と突き合わせる）
+        self.summary_engine = SummaryEngine()
+        self._shown_item_id: int | None = None
+
         # ==== table ====
-        self.summary_table = init_summary_table(SUMMARY_ROWS, SUMMARY_LABELS_JA)
-        self.item_table = init_item_table(ITEM_METRICS, ITEM_LABELS_JA)
+        # 値は配列で持つモデル側に置き、表示は QTableView（客数の行だけ手入力）
+        self.summary_model = MatrixTableModel(
+            [SUMMARY_LABELS_JA[m] for m in SUMMARY_ROWS], editable_rows={SUMMARY_ROW["customer"]}, parent=self
+        )
+        self.item_model = MatrixTableModel([ITEM_LABELS_JA[m] for m in ITEM_METRICS], parent=self)
+        self.summary_table = init_matrix_view(self.summary_model)
+        self.item_table = init_matrix_view(self.item_model)
+        # 商品セルの編集はサマリの同じメトリクス行・時間へ差分で足す（保存前から合計が追従する）
+        self.item_model.cellEdited.connect(self._on_item_cell_edited)
 
         # ==== ui ====
         self.chart_area = ChartArea(self)
@@ -66,6 +92,7 @@ class EditGridWidget(QWidget):
 
         
         self.load_item_and_summary()
+        self.reload_scheduler.cancel()  # 初期化中に積まれた要求は今の読み込みで済んでいる
 
         # signal
         self._connect_signals(stacked_widget)
@@ -82,6 +109,12 @@ class EditGridWidget(QWidget):
         self.item_combo.setCurrentText(name)
     def reloadItems(self):
         self._reload_items()
+    def shutdown(self):
+        """読み込み・先読みのワーカーを止めて終わるまで待つ（終了時）"""
+        for worker in (self.loader, self.prefetcher):
+            if worker is not None:
+                worker.cancel()
+                worker.pool.waitForDone()
 
     # ========== internal ==========
 
@@ -102,13 +135,21 @@ class EditGridWidget(QWidget):
 
     def _reload_items(self):
         cur = self._item_name()
-        self.item_combo.clear()
-        for nm in self.metrics_service.fetch_item_names():
-            self.item_combo.addItem(nm)
-        if cur:
-            i = self.item_combo.findText(cur)
-            if i >= 0:
-                self.item_combo.setCurrentIndex(i)
+        # clear/addItem ごとに currentTextChanged が飛ばないよう止めてまとめて入れる
+        self.item_combo.blockSignals(True)
+        try:
+            items = self.metrics_service.fetch_items()
+            self._item_ids = {name: item_id for item_id, name in items}
+            self.item_combo.clear()
+            self.item_combo.addItems([name for _, name in items])
+            if cur:
+                i = self.item_combo.findText(cur)
+                if i >= 0:
+                    self.item_combo.setCurrentIndex(i)
+        finally:
+            self.item_combo.blockSignals(False)
+        if self._item_name() != cur:
+            self.reload_scheduler.request()
 
     def _sanitize_int_item(self, item: QTableWidgetItem, validator: QIntValidator):
             text = (item.text() or "").strip()
@@ -257,8 +298,8 @@ class EditGridWidget(QWidget):
         self.btn_next_month.clicked.connect(lambda: self._shift_date(months=1))
 
         # 日付や商品が変わったら自動読み込み
-        self.date_edit.dateChanged.connect(self.reload_all)
-        self.item_combo.currentTextChanged.connect(self.reload_all)
+        self.date_edit.dateChanged.connect(self.reload_scheduler.request)
+        self.item_combo.currentTextChanged.connect(self.reload_scheduler.request)
 
         # 商品移動
         self.btn_prev_item.clicked.connect(lambda: self._shift_item(idx=-1))
@@ -276,8 +317,7 @@ class EditGridWidget(QWidget):
         d = self._date_iso()
         name = self._item_name()
         if not d or not name:
-            clear_table(self.item_table)
-            clear_table(self.summary_table)
+            self._clear_grids()
             return
 
         item_id = self.metrics_service.get_item_id_by_name(name)
@@ -285,21 +325,9 @@ class EditGridWidget(QWidget):
             QMessageBox.information(self, "未登録", "商品を追加してください。")
             return
 
-        # --- Serviceからまとめて取得 ---
-        data = self.metrics_service.load(d, item_id)
-
-        # --- 商品テーブル ---
-        clear_table(self.item_table)
-        fill_table(self.item_table, data["item"], ITEM_ROW)
-
-        # --- サマリテーブル ---
-        clear_table(self.summary_table)
-        customer_data = {"customer": data["customers"]}
-        fill_table(self.summary_table, customer_data, SUMMARY_ROW)
-        fill_table(self.summary_table, data["summary"], SUMMARY_ROW)
-
-        # 合計値更新
-        self.update_summary_table(d)
+        # --- Serviceからまとめて取得（配列） ---
+        data = self.metrics_service.load_matrices(d, item_id)
+        self._show_matrices(d, item_id, data["item"], data["summary"])
 
     def save_item_and_summary(self):
         d = self._date_iso()
@@ -310,40 +338,136 @@ class EditGridWidget(QWidget):
             return
 
         try:
-            self.metrics_service.save(d, item_id, self.item_table, self.summary_table)
+            self.metrics_service.save_matrices(
+                d, item_id, self.item_model.matrix(), self.summary_model.matrix()[SUMMARY_ROW["customer"]]
+            )
+            self._reconcile_summary(d, item_id)
             self.saved.emit(d)
+            self.reload_scheduler.request()
             QMessageBox.information(self, "保存完了", f"{d} のデータを保存しました。")
-            self.load_item_and_summary()
         except Exception as e:
             QMessageBox.warning(self, "保存失敗", str(e))
 
     def update_summary_table(self, date_str: str):
-        data = self.metrics_service.fetch_summary(date_str)
-        fill_table(self.summary_table, data["summary"], SUMMARY_ROW)
+        # 客数行はそのまま、全商品合計の行だけ更新（表示中の日付ならメモリ上の合計で済ませる）
+        if self.summary_engine.has(date_str):
+            self.summary_model.set_matrix(self.summary_engine.item_totals(), row_offset=1)
+            return
+        summary = self.metrics_service.load_summary_matrix(date_str)
+        self.summary_model.set_matrix(summary[1:], row_offset=1)
+
+    def _show_matrices(self, d: str, item_id: int, item, summary):
+        """読み込んだ配列をグリッドへ。全商品合計は SummaryEngine を通す"""
+        engine = self.summary_engine
+        # 画面から消える未保存の編集は合計からも外す
+        if self._shown_item_id is not None:
+            engine.revert(self._shown_item_id)
+        if not engine.has(d):
+            engine.reset(d, summary[1:])
+        engine.track(item_id, item)
+        self._shown_item_id = item_id
+
+        self.item_model.set_matrix(item)
+        self.summary_model.set_matrix(summary[:1])   # 客数
+        self.summary_model.set_matrix(engine.item_totals(), row_offset=1)
+
+    def _clear_grids(self):
+        self.summary_engine.clear()
+        self._shown_item_id = None
+        self.item_model.clear()
+        self.summary_model.clear()
+
+    def _reconcile_summary(self, d: str, item_id: int):
+        """保存後：編集を確定させ、全商品合計を DB の値に合わせ直す"""
+        engine = self.summary_engine
+        if not engine.has(d):
+            return
+        engine.commit(item_id)
+        db_totals = self.metrics_service.load_summary_matrix(d)[1:]
+        if not engine.reconcile(db_totals):
+            # 他の書き込み（OCR 取り込みなど）があった
+            self.summary_model.set_matrix(engine.item_totals(), row_offset=1)
+
+    def notify_external_write(self, date_iso: str):
+        """他の画面（OCR 取り込みなど）が date_iso のデータを書き換えたとき"""
+        if date_iso != self._date_iso():
+            return
+        if self.summary_engine.pending():
+            return   # 未保存の編集は上書きしない（保存時の _reconcile_summary で合計を合わせる）
+        self.summary_engine.clear()
+        self._shown_item_id = None
+        self.reload_all()
 
     def reload_all(self):
         d = self._date_iso()
         name = self._item_name()
         if not d or not name:
-            clear_table(self.item_table)
-            clear_table(self.summary_table)
+            if self.loader is not None:
+                self.loader.cancel()
+            self._clear_grids()
             self._refresh_chart()            
             return
 
+        # 非同期：最新の (日付, 商品) の結果だけが _apply_snapshot に届く
+        if self.loader is not None:
+            # 先読み済みならワーカーを待たずにその場で表示する
+            item_id = self._item_ids.get(name)
+            cached = self.metrics_service.peek_matrices(d, item_id) if item_id is not None else None
+            if cached is None:
+                self.loader.request(d, name)
+            else:
+                self.loader.cancel()
+                self._apply_snapshot(MetricsSnapshot(d, name, item_id, cached["item"], cached["summary"]))
+            return
+
         item_id = self.metrics_service.get_item_id_by_name(name)
         if item_id is None:
             QMessageBox.information(self, "未登録", "商品を追加してください。")
             return
 
         # --- テーブル更新 ---
-        data = self.metrics_service.load(d, item_id)
-        clear_table(self.item_table)
-        fill_table(self.item_table, data["item"], ITEM_ROW)
-
-        clear_table(self.summary_table)
-        customer_data = {"customer": data["customers"]}
-        fill_table(self.summary_table, customer_data, SUMMARY_ROW)
-        fill_table(self.summary_table, data["summary"], SUMMARY_ROW)
+        data = self.metrics_service.load_matrices(d, item_id)
+        self._show_matrices(d, item_id, data["item"], data["summary"])
 
         # --- グラフ更新 ---
         self._refresh_chart()
+
+    def _apply_snapshot(self, snap: MetricsSnapshot):
+        # 届くまでの間に画面側が変わっていたら捨てる（次の要求の結果を待つ）
+        if (snap.date_iso, snap.item_name) != (self._date_iso(), self._item_name()):
+            return
+        if snap.item_id is None:
+            QMessageBox.information(self, "未登録", "商品を追加してください。")
+            return
+
+        self._show_matrices(snap.date_iso, snap.item_id, snap.item, snap.summary)
+
+        if self.btn_chart.isChecked():
+            self.chart_area.refresh(snap.chart_data())
+
+        self._prefetch_neighbours(snap.item_id)
+
+    def _prefetch_neighbours(self, item_id: int):
+        """表示中の前後（日付 ±1、商品 ±1）を先読みに出す"""
+        if self.prefetcher is None:
+            return
+        date = self.date_edit.date()
+        targets = [
+            (date.addDays(1).toString("yyyy-MM-dd"), item_id),
+            (date.addDays(-1).toString("yyyy-MM-dd"), item_id),
+        ]
+        i = self.item_combo.currentIndex()
+        for j in (i + 1, i - 1):
+            if 0 <= j < self.item_combo.count():
+                neighbour = self._item_ids.get(self.item_combo.itemText(j))
+                if neighbour is not None:
+                    targets.append((self._date_iso(), neighbour))
+        self.prefetcher.schedule(targets)
+
+    def _on_item_cell_edited(self, row: int, hour: int, delta: int):
+        if self._shown_item_id is not None:
+            self.summary_engine.apply_cell(self._shown_item_id, row, hour, delta)
+        self.summary_model.add_delta(SUMMARY_ROW[ITEM_METRICS[row]], hour, delta)
+
+    def _on_load_failed(self, msg: str):
+        QMessageBox.warning(self, "読み込み失敗", msg)
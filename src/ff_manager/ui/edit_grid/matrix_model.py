@@ -0,0 +1,130 @@
+# ui/edit_grid/matrix_model.py
+import numpy as np
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+
+from ff_manager.core.constants import HOURS, TOTAL_COL
+
+
+class MatrixTableModel(QAbstractTableModel):
+    """
+    (行数, 24) の int 配列を持つ表モデル。列 24 は合計（配列から計算して表示だけ）
+
+    QTableWidget のようにセルごとの QTableWidgetItem を持たないので、
+    読み込み・クリア・合計は配列演算1回で済み、dataChanged もまとめて1回だけ出す。
+    1セルの編集では合計を差分で更新し（行の再集計はしない）、cellEdited で差分を知らせる。
+    """
+    cellEdited = Signal(int, int, int)   # (row, hour, delta) 手入力で値が変わったとき
+
+    def __init__(self, row_labels: list[str], editable_rows=None, parent=None):
+        """
+        Args:
+            row_labels (list[str]): 縦ヘッダー（行数もこれで決まる）
+            editable_rows: 編集できる行（None なら全行）
+        """
+        super().__init__(parent)
+        self._labels = list(row_labels)
+        n = len(self._labels)
+        self._editable = set(range(n) if editable_rows is None else editable_rows)
+        self._data = np.zeros((n, len(HOURS)), dtype=np.int64)
+        self._totals = np.zeros(n, dtype=np.int64)
+
+    # ---------- Qt ----------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._data.shape[0]
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HOURS) + 1
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r, c = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            v = self._totals[r] if c == TOTAL_COL else self._data[r, c]
+            return str(int(v)) if role == Qt.DisplayRole else int(v)
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return "合計" if section == TOTAL_COL else str(HOURS[section])
+        return self._labels[section]
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        f = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        if index.row() in self._editable and index.column() != TOTAL_COL:
+            f |= Qt.ItemIsEditable
+        return f
+
+    def setData(self, index: QModelIndex, value, role=Qt.EditRole) -> bool:
+        if role != Qt.EditRole or not (self.flags(index) & Qt.ItemIsEditable):
+            return False
+        # 空文字や数値でない入力は 0 に補正（sanitize_int_item と同じ扱い）
+        try:
+            v = int(str(value).strip() or 0)
+        except ValueError:
+            v = 0
+        r, c = index.row(), index.column()
+        delta = v - int(self._data[r, c])
+        if delta == 0:
+            return False
+        self._apply_delta(r, c, delta)
+        self.cellEdited.emit(r, c, delta)
+        return True
+
+    def add_delta(self, row: int, hour: int, delta: int) -> None:
+        """1セルに delta を足す（他のグリッドの編集を合計行へ反映するとき用）"""
+        if delta:
+            self._apply_delta(row, hour, delta)
+
+    def _apply_delta(self, r: int, c: int, delta: int) -> None:
+        self._data[r, c] += delta
+        self._totals[r] += delta
+        # 変わったセルと合計列だけを通知
+        self.dataChanged.emit(self.index(r, c), self.index(r, c), [Qt.DisplayRole, Qt.EditRole])
+        self.dataChanged.emit(self.index(r, TOTAL_COL), self.index(r, TOTAL_COL), [Qt.DisplayRole, Qt.EditRole])
+
+    # ---------- 配列の出し入れ ----------
+    def set_matrix(self, matrix, row_offset: int = 0) -> None:
+        """
+        matrix (k, 24) を row_offset 行目から k 行分まとめて入れる
+
+        Args:
+            matrix (np.ndarray): 行はこのモデルの行と同じ並び
+            row_offset (int): matrix の 0 行目を書き込む行
+        """
+        matrix = np.asarray(matrix)
+        if matrix.size == 0:
+            return
+        rows = slice(row_offset, row_offset + matrix.shape[0])
+        self._data[rows] = matrix
+        self._totals[rows] = self._data[rows].sum(axis=1)
+        self._emit_rows(rows.start, rows.stop - 1)
+
+    def clear(self) -> None:
+        """全セルを 0 にする"""
+        self._data.fill(0)
+        self._totals.fill(0)
+        self._emit_rows(0, self._data.shape[0] - 1)
+
+    def matrix(self) -> np.ndarray:
+        """今の値 (行数, 24) の読み取り専用ビュー（合計列は含まない）"""
+        view = self._data.view()
+        view.flags.writeable = False
+        return view
+
+    def totals(self) -> np.ndarray:
+        """各行の合計 (行数,) の読み取り専用ビュー"""
+        view = self._totals.view()
+        view.flags.writeable = False
+        return view
+
+    def _emit_rows(self, first: int, last: int) -> None:
+        self.dataChanged.emit(
+            self.index(first, 0), self.index(last, TOTAL_COL), [Qt.DisplayRole, Qt.EditRole]
+        )
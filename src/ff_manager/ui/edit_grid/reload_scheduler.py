@@ -0,0 +1,50 @@
+# ui/edit_grid/reload_scheduler.py
+from typing import Callable
+from PySide6.QtCore import QObject, QTimer
+
+
+class ReloadScheduler(QObject):
+    """
+    連続して届くリロード要求（dateChanged / currentTextChanged / 保存後など）を
+    イベントループ1周につき1回の実行にまとめる。
+
+    requested / executed で「要求された回数」と「実際に読み込んだ回数」を数える。
+    """
+    def __init__(self, callback: Callable[[], None], parent=None):
+        super().__init__(parent)
+        self._callback = callback
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)   # 今たまっているイベントを処理し終えてから実行
+        self._timer.timeout.connect(self._fire)
+        self.requested = 0
+        self.executed = 0
+
+    def request(self, *_):
+        """リロードを予約する（シグナルの引数は無視）"""
+        self.requested += 1
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """予約があれば今すぐ実行する"""
+        if self._timer.isActive():
+            self._timer.stop()
+            self._fire()
+
+    def cancel(self):
+        self._timer.stop()
+
+    def is_pending(self) -> bool:
+        return self._timer.isActive()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "requested": self.requested,
+            "executed": self.executed,
+            "coalesced": self.requested - self.executed,
+        }
+
+    def _fire(self):
+        self.executed += 1
+        self._callback()
@@ -1,9 +1,37 @@
 # tables.py
-from PySide6.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView,QTableView
+from contextlib import contextmanager
+
+from PySide6.QtWidgets import (
+    QTableWidget, QTableWidgetItem, QHeaderView, QTableView, QStyledItemDelegate, QLineEdit
+)
 from PySide6.QtGui import QIntValidator
 from PySide6.QtCore import Qt
 
 from ff_manager.core.constants import HOURS
+from ff_manager.ui.edit_grid.matrix_model import MatrixTableModel
+
+
+class IntItemDelegate(QStyledItemDelegate):
+    """セル編集を 0〜1,000,000 の整数入力に制限する"""
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        editor.setValidator(QIntValidator(0, 1_000_000, editor))
+        return editor
+
+
+def init_matrix_view(model: MatrixTableModel) -> QTableView:
+    """
+    MatrixTableModel を表示するテーブルを初期化して返す（init_item_table などのモデル版）
+    """
+    view = QTableView()
+    view.setObjectName("dataTable")
+    view.setModel(model)
+    view.setItemDelegate(IntItemDelegate(view))
+
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    return view
 
 
 def init_summary_table(summary_rows, summary_labels) -> QTableWidget:
@@ -29,6 +57,7 @@ def init_summary_table(summary_rows, summary_labels) -> QTableWidget:
             else:
                 it.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
             table.setItem(r, c, it)
+    table.setProperty("intValidator", validator)   # bulk_update の最後の検証で使う
     table.itemChanged.connect(lambda item: sanitize_int_item(item, validator))
 
     table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -52,6 +81,7 @@ def init_item_table(item_metrics, item_labels) -> QTableWidget:
             it.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
             it.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEditable | Qt.ItemIsEnabled)
             table.setItem(r, c, it)
+    table.setProperty("intValidator", validator)   # bulk_update の最後の検証で使う
     table.itemChanged.connect(lambda item: sanitize_int_item(item, validator))
 
     table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
@@ -75,11 +105,50 @@ def sanitize_int_item(item: QTableWidgetItem, validator: QIntValidator):
             item.setText("0")
 
 
-def clear_table(table: QTableWidget):
-    """全セルを 0 でクリア"""
+@contextmanager
+def bulk_update(table: QTableWidget, validate: bool = True):
+    """
+    まとめてセルを書き換える間、シグナルと再描画を止める
+
+    setText のたびに itemChanged → sanitize_int_item が走り、再描画も積まれるのを防ぐ。
+    抜けるときに（validate=True なら）全セルを1回だけ検証し、1回だけ再描画する。
+
+        with bulk_update(table):
+            for ...: table.item(r, c).setText(...)
+    """
+    was_blocked = table.blockSignals(True)
+    was_enabled = table.updatesEnabled()
+    table.setUpdatesEnabled(False)
+    try:
+        yield table
+    finally:
+        try:
+            if validate:
+                sanitize_table(table)
+        finally:
+            table.blockSignals(was_blocked)
+            table.setUpdatesEnabled(was_enabled)
+            table.viewport().update()
+
+
+def sanitize_table(table: QTableWidget):
+    """全セルに sanitize_int_item を1回ずつかける（検証器は init_* で付けたもの）"""
+    validator = table.property("intValidator")
+    if validator is None:
+        return
     for r in range(table.rowCount()):
         for c in range(table.columnCount()):
-            table.item(r, c).setText("0")
+            it = table.item(r, c)
+            if it is not None:
+                sanitize_int_item(it, validator)
+
+
+def clear_table(table: QTableWidget):
+    """全セルを 0 でクリア"""
+    with bulk_update(table, validate=False):
+        for r in range(table.rowCount()):
+            for c in range(table.columnCount()):
+                table.item(r, c).setText("0")
 
 
 def fill_table(table: QTableWidget, data: dict, row_map: dict):
@@ -91,16 +160,39 @@ def fill_table(table: QTableWidget, data: dict, row_map: dict):
         data (dict): {metric: {hour: value}}
         row_map (dict): metric -> row index の対応
     """
-    for m, by_hour in data.items():
-        if m not in row_map:
-            continue
-        r = row_map[m]
-        for h, v in by_hour.items():
-            if 0 <= h <= 23:
-                table.item(r, h).setText(str(v))
+    with bulk_update(table, validate=False):
+        for m, by_hour in data.items():
+            if m not in row_map:
+                continue
+            r = row_map[m]
+            for h, v in by_hour.items():
+                if 0 <= h <= 23:
+                    table.item(r, h).setText(str(v))
+
+        # 合計を数える前に検証する（不正な値は 0 に。1つずつ setText していた頃と同じ結果）
+        sanitize_table(table)
+
+        # 合計列（書き込んだ行だけ）
+        for r in {row_map[m] for m in data if m in row_map}:
+            total = sum(int(table.item(r, c).text() or 0) for c in range(24))
+            table.item(r, 24).setText(str(total))
 
-    # 合計列
-    for r in range(table.rowCount()):
-        total = sum(int(table.item(r, c).text()) for c in range(24))
-        table.item(r, 24).setText(str(total))
 
+
+def fill_table_matrix(table: QTableWidget, matrix, row_offset: int = 0):
+    """
+    (行数, 24) の配列を QTableWidget に流し込む（合計列は配列の行和で埋める）
+
+    Args:
+        table (QTableWidget): 対象テーブル
+        matrix (np.ndarray): 行は table の行と同じ並び
+        row_offset (int): matrix の 0 行目を書き込む table の行
+    """
+    totals = matrix.sum(axis=1).tolist()
+    # 配列由来の値は整数なので検証は不要
+    with bulk_update(table, validate=False):
+        for i, row in enumerate(matrix.tolist()):
+            r = row_offset + i
+            for h, v in enumerate(row):
+                table.item(r, h).setText(str(v))
+            table.item(r, len(row)).setText(str(totals[i]))
@@ -0,0 +1,52 @@
+# ui/lazy_stack.py
+from typing import Callable
+
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QStackedWidget, QWidget
+
+
+class LazyStackedWidget(QStackedWidget):
+    """
+    ページを最初に表示するときに作る QStackedWidget。
+
+    add_lazy_page() の時点では空の仮ページを置いておき、setCurrentIndex() で
+    そのページへ切り替える直前に factory() を呼んで差し替える。
+    ページ側の重い import（matplotlib / PIL / ffm_ocr など）は factory の中で行う。
+    インデックスは TAB_INDEX と同じ並びで固定（差し替えても変わらない）。
+    """
+    pageCreated = Signal(int, QWidget)   # (index, 作ったページ)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._factories: dict[int, Callable[[], QWidget]] = {}
+
+    def add_lazy_page(self, factory: Callable[[], QWidget]) -> int:
+        """仮ページを追加し、そのインデックスを返す"""
+        index = self.addWidget(QWidget())
+        self._factories[index] = factory
+        return index
+
+    def is_created(self, index: int) -> bool:
+        return index not in self._factories
+
+    def page(self, index: int) -> QWidget:
+        """index のページを返す（まだなら作る）"""
+        factory = self._factories.pop(index, None)
+        if factory is None:
+            return self.widget(index)
+        placeholder = self.widget(index)
+        try:
+            page = factory()
+        except Exception:
+            self._factories[index] = factory   # 次に開くときにもう一度試す
+            raise
+        # 仮ページを外す前に差し込む（表示中のページとインデックスがずれないように）
+        self.insertWidget(index, page)
+        self.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.pageCreated.emit(index, page)
+        return page
+
+    def setCurrentIndex(self, index: int):
+        self.page(index)
+        super().setCurrentIndex(index)
@@ -1,22 +1,25 @@
 # ui/main_window.py
 import sys
+from functools import cached_property
+
+from PySide6.QtCore import QThreadPool
 from PySide6.QtWidgets import (
     QMainWindow, QStackedWidget, QMessageBox
 )
 from ff_manager.config import (WINDOW_TITLE,WINDOW_SIZE,TABLE)
 
 from ff_manager.db.migrations import ensure_schema_and_migrate
-from ff_manager.db.aggregate import rebuild_daily_for_date
+from ff_manager.db.aggregate import rebuild_daily_dirty
+from ff_manager.db.connection import ConnectionManager
 from ff_manager.db.repositories.items_repo import ItemsRepository
+from ff_manager.core.constants import TAB_INDEX
 
-from ff_manager.services.chart_service import ChartService
-from ff_manager.services.metrics_service import MetricsService
+from ff_manager.services.db_task import run_db_task
 
-from ff_manager.ui.edit_grid.edit_grid_widget import EditGridWidget
-from ff_manager.ui.items.items_widget import ItemsWidget
+from ff_manager.ui.lazy_stack import LazyStackedWidget
 from ff_manager.ui.menu.menu_widget import MenuWidget
-from ff_manager.ui.chart_widget.charts_widget import ChartsWidget
-from ff_manager.ui.ocr_import.ocr_import_widget import OCRImportWidget
+
+# メニュー以外のページ（と numpy / matplotlib / PIL / ffm_ocr）は初めて開くときに import する
 
 class MainWindow(QMainWindow):
     def __init__(self, db):
@@ -34,38 +37,100 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Migration Error", str(e))
             sys.exit(1)
 
-        self.items_repo=ItemsRepository(db)
+        # ワーカースレッド用の接続（スレッドごとに別の QSqlDatabase）
+        self.db_manager = ConnectionManager(db.databaseName())
 
-        # --- service ---
-        self.metrics_service=MetricsService(db)
-        self.chart_service = ChartService(db)
+        self.items_repo=ItemsRepository(db)
 
-        self.stack = QStackedWidget()
+        # --- pages（TAB_INDEX の順。メニュー以外は表示するときに作る） ---
+        self.edit_grid = None
+        self.ocr_page = None
+        self.stack = LazyStackedWidget()
 
         self.stack.addWidget(MenuWidget(self.stack))    # menu
+        self.stack.add_lazy_page(self._create_items_page)   # items
+        self.stack.add_lazy_page(self._create_edit_page)    # edit
+        self.stack.add_lazy_page(self._create_charts_page)  # chart
+        self.stack.add_lazy_page(self._create_ocr_page)     # ocr
+        assert self.stack.count() == len(TAB_INDEX)
+
+        self.setCentralWidget(self.stack)
 
-        self.stack.addWidget(ItemsWidget(self.db,self.stack))   # items
-        
-        self.stack.addWidget(EditGridWidget(
+    # --- service（最初に使うページが作られるときに用意する） ---
+    @cached_property
+    def metrics_service(self):
+        from ff_manager.services.metrics_service import MetricsService
+        return MetricsService(self.db)
+
+    @cached_property
+    def chart_service(self):
+        from ff_manager.services.chart_service import ChartService
+        return ChartService(self.db, self.metrics_service)
+
+    # --- page factories ---
+    def _create_items_page(self):
+        from ff_manager.ui.items.items_widget import ItemsWidget
+        return ItemsWidget(self.db, self.stack)
+
+    def _create_edit_page(self):
+        from ff_manager.ui.edit_grid.edit_grid_widget import EditGridWidget
+        self.edit_grid = EditGridWidget(
              self.metrics_service,
              self.chart_service,
              self.items_repo,
-             self.stack))    # edit
-        
-        self.stack.addWidget(ChartsWidget(self.chart_service,self.stack))   # chart
-        
-        self.stack.addWidget(OCRImportWidget(self.metrics_service,self.stack))   # ocr
+             self.stack,
+             db_manager=self.db_manager)
+        self.edit_grid.saved.connect(self._on_saved)
+        return self.edit_grid
 
+    def _create_charts_page(self):
+        from ff_manager.ui.chart_widget.charts_widget import ChartsWidget
+        return ChartsWidget(self.chart_service, self.stack)
 
-        self.setCentralWidget(self.stack)
+    def _create_ocr_page(self):
+        from ff_manager.ui.ocr_import.ocr_import_widget import OCRImportWidget
+        self.ocr_page = OCRImportWidget(self.metrics_service, self.stack, db_manager=self.db_manager)
+        self.ocr_page.imported.connect(self._on_ocr_imported)
+        return self.ocr_page
 
 
-   
-    def _on_saved(self, date_iso: str):
-        
-            if not rebuild_daily_for_date(self.db, date_iso):
-                # 失敗しても編集結果は保存済み。通知のみ。
-                from PySide6.QtWidgets import QMessageBox
-                QMessageBox.warning(self, "サマリ更新", f"{date_iso} の日次サマリ更新に失敗しました。")
-
 
+    def _on_saved(self, date_iso: str):
+        self._rebuild_daily(date_iso)
+
+    def _on_ocr_imported(self, dates: list[str]):
+        # 取り込んだ分も DAILY_DIRTY に積まれている。保存と同じくワーカーで日次サマリを更新する
+        self._rebuild_daily("、".join(dates))
+        # 編集画面が同じ日を開いていれば読み直す（時間別の表はコミット済み）
+        if self.edit_grid is not None:
+            for d in dates:
+                self.edit_grid.notify_external_write(d)
+
+    def _rebuild_daily(self, label: str):
+        # 書き換わった (date, item_id) だけ日次サマリを更新する（GUI スレッドは止めない）
+        run_db_task(
+            self.db_manager,
+            lambda db: (label, rebuild_daily_dirty(db)),
+            on_done=self._on_daily_rebuilt,
+            on_error=self._on_daily_rebuild_failed,
+        )
+
+    def _on_daily_rebuilt(self, result: tuple[str, bool]):
+        date_iso, ok = result
+        if not ok:
+            # 失敗しても編集結果は保存済み。通知のみ（dirty は残るので次回の保存で再試行）。
+            QMessageBox.warning(self, "サマリ更新", f"{date_iso} の日次サマリ更新に失敗しました。")
+
+    def _on_daily_rebuild_failed(self, msg: str):
+        QMessageBox.warning(self, "サマリ更新", f"日次サマリ更新に失敗しました。\n{msg}")
+
+    def closeEvent(self, e):
+        # 接続を使うプールをすべて止める。ワーカースレッドが終わるときに
+        # そのスレッド上で接続が閉じられるので、最後に何も残っていないことだけ確かめる
+        if self.edit_grid is not None:
+            self.edit_grid.shutdown()
+        if self.ocr_page is not None:
+            self.ocr_page.shutdown()
+        QThreadPool.globalInstance().waitForDone()
+        self.db_manager.close_all()
+        super().closeEvent(e)
@@ -6,8 +6,6 @@ from PySide6.QtWidgets import (
 from PySide6.QtSql import QSqlTableModel
 from PySide6.QtCore import Qt
 
-from ff_manager.ui.items.items_widget import ItemsWidget
-from ff_manager.ui.edit_grid.edit_grid_widget import EditGridWidget
 from ff_manager.ui.effects.gradient_bg import GradientBackground
 
 class MenuWidget(QWidget):
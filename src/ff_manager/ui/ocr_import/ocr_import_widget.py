@@ -1,14 +1,12 @@
 # ui/ocr_import_widget.py
 from PySide6.QtCore import Signal,Qt
-from PySide6.QtGui import QIntValidator,QPixmap
+from PySide6.QtGui import QIntValidator,QPixmap,QImage
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QTextEdit, QFileDialog,QTableWidget,QTableWidget, 
     QTableWidgetItem, QHeaderView,QTabWidget,QMessageBox,
-    QScrollArea,
+    QScrollArea, QProgressBar,
 )
-from PIL import Image
-
 import numpy as np
 from datetime import date
 
@@ -22,33 +20,56 @@ from ff_manager.ui.edit_grid.tables import (
     init_item_table,
     clear_table,
     fill_table,
+    bulk_update,
 )
 from ff_manager.ui.edit_grid.tables import sanitize_int_item
 from ffm_ocr.schemas import OcrImportPayload
 
 from ff_manager.services.metrics_service import MetricsService
 from ff_manager.services.ocr.fakes import FakePipeline
-from ff_manager.services.ocr.ocr_adapter import OcrAdapter
+from ff_manager.services.ocr.ocr_adapter import OcrAdapter, OcrBatchRunner, OcrBatchSummary
+from ff_manager.services.ocr.payload_importer import PayloadImporter
+from ff_manager.services.image_loader import ImageLoader, LoadedImage
+from ffm_ocr.images import IMAGE_EXTS, guess_date, list_images
 
 from ff_manager.config import OCR_TEST
 
 class OCRImportWidget(QWidget):
 
     imported_item = Signal(dict)   # payloadは {metric: {hour: value}}
+    imported = Signal(list)        # 取り込んだ日付 'YYYY-MM-DD' のリスト（一括取り込みは終わったときに1回）
 
     def __init__(
             self,
             metrics_service:MetricsService,
-            stack,parent=None
+            stack,parent=None,
+            db_manager=None,
             ):
         super().__init__(parent)
         
         # self.svc = OCRService(db)
         self.metrics_service=metrics_service
+        self.importer = PayloadImporter(metrics_service)
+        self.table_list: list[QTableWidget] = []
+        self._batch_unknown: set[str] = set()
+        self._batch_dates: set[str] = set()
+        self._batch_errors: list[str] = []
 
-        self.ocr = OcrAdapter(pipeline=FakePipeline() if OCR_TEST else None)
+        self.ocr = OcrAdapter(pipeline=FakePipeline() if OCR_TEST else None, db_manager=db_manager)
         self.ocr.finished.connect(self._on_ocr_done)
         self.ocr.failed.connect(self._on_ocr_failed)
+
+        # フォルダ・複数ファイルの一括取り込み（1枚ずつ _on_ocr_done に流す）
+        self.batch = OcrBatchRunner(self.ocr.pipe, db_manager=db_manager, parent=self)
+        self.batch.progress.connect(self._on_batch_progress)
+        self.batch.itemFinished.connect(lambda i, payload: self._on_ocr_done(payload, notify=False))
+        self.batch.finished.connect(self._on_batch_done)
+
+        # 画像の読み込み（プレビューと OCR 用のフル解像度をワーカーで1回ずつ復号）
+        self.image_loader = ImageLoader(self)
+        self.image_loader.previewReady.connect(self._on_preview)
+        self.image_loader.loaded.connect(self._on_image_loaded)
+        self.image_loader.failed.connect(self._on_image_failed)
         
         #--- テーブル ---
 
@@ -75,6 +96,12 @@ class OCRImportWidget(QWidget):
         #--- button ---
         self.btn_open = QPushButton("画像を開く")
         self.btn_ocr  = QPushButton("OCR実行")
+        self.btn_batch = QPushButton("一括取り込み")
+        self.btn_batch_cancel = QPushButton("中止")
+        self.btn_batch_cancel.setVisible(False)
+        self.batch_bar = QProgressBar()
+        self.batch_bar.setRange(0, 100)
+        self.batch_bar.setVisible(False)
         self.btn_save = QPushButton("保存")
         self.preview  = QLabel()
         self.preview.setMinimumSize(480, 240)
@@ -90,6 +117,9 @@ class OCRImportWidget(QWidget):
         top = QHBoxLayout()
         top.addWidget(self.btn_open)
         top.addWidget(self.btn_ocr)
+        top.addWidget(self.btn_batch)
+        top.addWidget(self.batch_bar)
+        top.addWidget(self.btn_batch_cancel)
         top.addStretch()
         top.addWidget(self.btn_save)
 
@@ -112,10 +142,14 @@ class OCRImportWidget(QWidget):
 
         panel.addLayout(foot)
 
-        self.current_image: Image.Image | None = None
+        self.current_bgr: np.ndarray | None = None   # OCR 用のフル解像度（BGR）
+        self.current_path: str | None = None
+        self.btn_ocr.setEnabled(False)
 
         self.btn_open.clicked.connect(self._open)
         self.btn_ocr.clicked.connect(self._run_ocr)
+        self.btn_batch.clicked.connect(self._run_batch)
+        self.btn_batch_cancel.clicked.connect(self.batch.cancel)
         self.btn_save.clicked.connect(self._save)
         self.btn_back.clicked.connect(lambda: stack.setCurrentIndex(TAB_INDEX["EDIT"]))
 
@@ -144,30 +178,48 @@ class OCRImportWidget(QWidget):
     #     target_date = self.datePicker.date().toPython()         # QDateEdit等から
     #     self.ocr.run_on_qimage(qimg, target_date=target_date)   # 非同期開始
 
-    def _on_ocr_done(self, payload:OcrImportPayload):
-        self.table_list=[QTableWidget]
-        date=self.ocr.get_date(payload)
-
+    def _on_ocr_done(self, payload:OcrImportPayload, notify: bool = True):
+        """
+        OCR 結果を DB に取り込み（1トランザクション）、商品ごとのタブに表示する
 
-        item_info=self.ocr.get_item_info(payload)
-        for prod in item_info:
+        notify=False（一括取り込みの途中）ならダイアログは出さず、日付・エラー・未登録の商品を
+        溜めておいて _on_batch_done でまとめて知らせる
+        """
+        try:
+            result = self.importer.import_payload(payload)
+        except Exception as e:
+            msg = f"{payload.date.isoformat()}: {e}"
+            if notify:
+                QMessageBox.warning(self, "取り込み失敗", msg)
+            else:
+                self._batch_errors.append(msg)
+            return
+        if notify:
+            self.imported.emit([result.date])
+        else:
+            self._batch_dates.add(result.date)
+
+        for prod, (name, info) in zip(payload.products, self.ocr.get_item_info(payload)):
+            if name in result.unknown_products:
+                continue
             table=init_item_table(ITEM_METRICS,ITEM_LABELS_JA)
-            name:str=prod[0]
-            info:dict=prod[1]
-            id=self.metrics_service.get_item_id_by_name(name)
-            tab_label = self._make_tab_label(name)
-
-            self.metrics_service.save_item_metrics(date,id,info)
-            for culmns,data_list in info.items():
-                for data in data_list.items():
-                    c=ITEM_ROW[culmns]
-                    h,v=data[0],data[1]
-                    table.item(c,h).setText(str(v))
-
-            self.item_tabs.addTab(table, tab_label)
+            with bulk_update(table):
+                for metric, by_hour in info.items():
+                    r = ITEM_ROW.get(metric)
+                    if r is None:
+                        continue
+                    for h, v in by_hour.items():
+                        table.item(r, h).setText(str(v))
+
+            self.item_tabs.addTab(table, f"{self._make_tab_label(prod)} {payload.date:%m/%d}")
             self.table_list.append(table)
 
-        
+        if notify and result.unknown_products:
+            QMessageBox.warning(
+                self, "未登録の商品",
+                "次の商品は登録されていないため取り込みませんでした。\n" + "\n".join(result.unknown_products))
+        if not notify:
+            self._batch_unknown.update(result.unknown_products)
 
     def _on_ocr_failed(self, msg: str):
         QMessageBox.warning(self, "OCR失敗", msg)
@@ -176,10 +228,24 @@ class OCRImportWidget(QWidget):
     def _open(self):
         path, _ = QFileDialog.getOpenFileName(self, "画像を選択", "", "Images (*.png *.jpg *.jpeg *.tif)")
         if not path: return
-        self.current_image = Image.open(path).convert("RGB")
-        pix = QPixmap(path).scaledToWidth(600)
-        self.preview.setPixmap(pix)
+        self.current_path = path
+        self.current_bgr = None
+        self.btn_ocr.setEnabled(False)
         self.text.clear()
+        self.image_loader.load(path)
+
+    def _on_preview(self, path: str, preview: QImage):
+        if path == self.current_path:
+            self.preview.setPixmap(QPixmap.fromImage(preview))
+
+    def _on_image_loaded(self, img: LoadedImage):
+        if img.path != self.current_path:
+            return
+        self.current_bgr = img.bgr
+        self.btn_ocr.setEnabled(not self.batch.is_running())
+
+    def _on_image_failed(self, msg: str):
+        QMessageBox.warning(self, "画像の読み込み失敗", msg)
 
     def _run_ocr(self):
         # if not self.current_image: return
@@ -187,15 +253,63 @@ class OCRImportWidget(QWidget):
         # self.text.setPlainText(res.full_text)
         
         
-        # if self.current_image is None:
-        #     return
-        # rgb = np.array(self.current_image, copy=True)   # (H,W,3) RGB
-        # bgr = rgb[:, :, ::-1]                          # OpenCV/PaddleはBGR想定
-        
-        bgr = np.zeros((800, 600, 3), dtype=np.uint8)
-
-
-        self.ocr.run_on_ndarray(bgr, target_date=date(2025,1,1),meta={"source":"dummy"})
+        if self.current_bgr is None:
+            return
+        self.ocr.run_on_ndarray(
+            self.current_bgr,
+            target_date=guess_date(self.current_path),
+            meta={"source": self.current_path},
+        )
+
+    def _run_batch(self):
+        """フォルダの写真をまとめて OCR する（対象日はファイル名の日付か更新日）"""
+        if self.batch.is_running():
+            return
+        folder = QFileDialog.getExistingDirectory(self, "写真のフォルダを選択")
+        if not folder:
+            return
+        paths = list_images([folder])
+        if not paths:
+            exts = " ".join(IMAGE_EXTS)
+            QMessageBox.information(self, "一括取り込み", f"画像が見つかりませんでした（{exts}）")
+            return
+        self.batch_bar.setValue(0)
+        self._batch_unknown.clear()
+        self._batch_dates.clear()
+        self._batch_errors.clear()
+        self._set_batch_running(True)
+        self.batch.start(paths)
+
+    def _on_batch_progress(self, pct: int):
+        self.batch_bar.setValue(pct)
+
+    def _on_batch_done(self, summary: OcrBatchSummary):
+        self._set_batch_running(False)
+        if self._batch_dates:
+            self.imported.emit(sorted(self._batch_dates))
+        box = QMessageBox.warning if summary.failed or self._batch_errors else QMessageBox.information
+        text = summary.text()
+        if self._batch_errors:
+            text += "\n取り込み失敗:\n" + "\n".join(f"  × {msg}" for msg in self._batch_errors)
+        if self._batch_unknown:
+            text += "\n未登録のため取り込まなかった商品: " + "、".join(sorted(self._batch_unknown))
+        box(self, "一括取り込み", text)
+
+    def _set_batch_running(self, running: bool):
+        self.batch_bar.setVisible(running)
+        self.btn_batch_cancel.setVisible(running)
+        for b in (self.btn_open, self.btn_batch):
+            b.setEnabled(not running)
+        self.btn_ocr.setEnabled(not running and self.current_bgr is not None)
+
+    def shutdown(self):
+        """終了時: 一括取り込みの残りと画像の読み込みを取り消し、処理中の画像を待つ（結果のダイアログは出さない）"""
+        self.batch.blockSignals(True)
+        self.batch.cancel()
+        self.image_loader.blockSignals(True)
+        self.image_loader.cancel()
+        self.batch.pool.waitForDone()
+        self.image_loader.pool.waitForDone()
 
     def _save(self):
         """
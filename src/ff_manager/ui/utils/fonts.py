@@ -0,0 +1,175 @@
+# ui/utils/fonts.py
+"""
+matplotlib 用の日本語（CJK）フォントを1回だけ探し、結果をディスクにキャッシュする。
+
+探す順番:
+  1. config.FONT_PATH（環境変数 FFM_FONT_PATH）
+  2. キャッシュ（前回見つけたファイル。更新日時・サイズが同じなら採用）
+  3. OS ごとの既知のパス（Windows / macOS / Linux）
+  4. fontconfig（fc-list :lang=ja。Linux でパスが既知のものと違うとき）
+  5. matplotlib が読み込み済みのフォント一覧から既知のファミリー名
+
+見つけたフォントは fontManager.addfont で登録し、rcParams["font.family"] に名前で設定する。
+以後の描画では findfont がファイルを探し回らない。
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from ff_manager.config import CACHE_DIR, FONT_PATH
+
+CACHE_FILE = CACHE_DIR / "font_cache.json"
+
+# OS ごとの既知のパス（先頭ほど優先）
+if sys.platform == "win32":
+    CANDIDATE_PATHS = [
+        "C:/Windows/Fonts/meiryo.ttc",
+        "C:/Windows/Fonts/YuGothM.ttc",
+        "C:/Windows/Fonts/msgothic.ttc",
+    ]
+elif sys.platform == "darwin":
+    CANDIDATE_PATHS = [
+        "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
+        "/System/Library/Fonts/Hiragino Sans GB.ttc",
+        "/Library/Fonts/Arial Unicode.ttf",
+    ]
+else:
+    CANDIDATE_PATHS = [
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/opentype/ipaexfont-gothic/ipaexg.ttf",
+        "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
+        "/usr/share/fonts/truetype/takao-gothic/TakaoPGothic.ttf",
+        "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
+    ]
+
+# 既知のパスに無いときに、読み込み済みの一覧から探すファミリー名
+CANDIDATE_FAMILIES = [
+    "Noto Sans CJK JP", "Noto Sans JP", "IPAexGothic", "IPAGothic", "Hiragino Sans",
+    "Hiragino Kaku Gothic ProN", "Meiryo", "Yu Gothic", "MS Gothic", "TakaoPGothic", "VL Gothic",
+]
+
+_resolved: tuple[str, str] | None = None
+_applied = False
+
+
+def resolve_cjk_font() -> tuple[str, str] | None:
+    """(ファミリー名, ファイルパス) を返す。見つからなければ None"""
+    global _resolved
+    if _resolved is not None:
+        return _resolved
+
+    if FONT_PATH and os.path.exists(FONT_PATH):
+        _resolved = (_family_name(FONT_PATH), FONT_PATH)
+        return _resolved
+
+    cached = _load_cache()
+    if cached is not None:
+        _resolved = cached
+        return _resolved
+
+    found = _probe_paths() or _probe_fontconfig() or _probe_font_manager()
+    if found is not None:
+        _save_cache(*found)
+    _resolved = found
+    return _resolved
+
+
+def apply_cjk_font() -> str | None:
+    """
+    見つけた CJK フォントを matplotlib の既定にする（何度呼んでもよい）
+
+    Returns:
+        設定したファミリー名（見つからなければ None）
+    """
+    global _applied
+    found = resolve_cjk_font()
+    if _applied or found is None:
+        return found[0] if found else None
+    _applied = True
+
+    from matplotlib import rcParams, font_manager
+    name, path = found
+    # 名前から引けるように登録（システムの一覧に無いファイルでも使える）
+    font_manager.fontManager.addfont(path)
+    rcParams["font.family"] = [name, "sans-serif"]
+    rcParams["axes.unicode_minus"] = False   # 日本語フォントには U+2212 が無いことが多い
+    return name
+
+
+# ---------------- internal ----------------
+def _family_name(path: str) -> str:
+    from matplotlib import ft2font
+    return ft2font.FT2Font(path).family_name
+
+
+def _probe_paths() -> tuple[str, str] | None:
+    for path in CANDIDATE_PATHS:
+        if os.path.exists(path):
+            try:
+                return _family_name(path), path
+            except Exception:
+                continue
+    return None
+
+
+def _probe_fontconfig() -> tuple[str, str] | None:
+    exe = shutil.which("fc-list")
+    if exe is None:
+        return None
+    try:
+        out = subprocess.run(
+            [exe, "-f", "%{file}\n", ":lang=ja"], capture_output=True, text=True, timeout=5
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    files = sorted({f for f in out.splitlines() if f and os.path.exists(f)})
+    # ゴシック体（サンセリフ）を優先
+    files.sort(key=lambda f: not any(k in f.lower() for k in ("gothic", "sans", "ipaexg")))
+    for path in files:
+        try:
+            return _family_name(path), path
+        except Exception:
+            continue
+    return None
+
+
+def _probe_font_manager() -> tuple[str, str] | None:
+    from matplotlib import font_manager
+    by_name = {f.name: f.fname for f in font_manager.fontManager.ttflist}
+    for name in CANDIDATE_FAMILIES:
+        if name in by_name:
+            return name, by_name[name]
+    return None
+
+
+def _stamp(path: str) -> list[int]:
+    st = os.stat(path)
+    return [int(st.st_mtime), st.st_size]
+
+
+def _load_cache() -> tuple[str, str] | None:
+    try:
+        data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+        path = data["path"]
+        if os.path.exists(path) and data["stamp"] == _stamp(path):
+            return data["name"], path
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _save_cache(name: str, path: str) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_FILE.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"name": name, "path": path, "stamp": _stamp(path)}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, CACHE_FILE)
+    except OSError:
+        pass   # キャッシュに書けなくても次回また探すだけ
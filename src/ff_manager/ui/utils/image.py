@@ -1,127 +1,161 @@
 # -*- coding: utf-8 -*-
+"""
+QImage ⇔ numpy.ndarray の変換
+
+- 画素の並びは OpenCV/Paddle に合わせる: 3ch は BGR、4ch は BGRA、グレースケールは (H, W)。
+- 形式が合わないときだけ QImage.convertToFormat で変換する（Qt 側で1パス）。
+  numpy のファンシーインデックスや np.repeat でチャンネルを並べ替えることはしない。
+- copy=False なら QImage のメモリをそのまま指すビュー（QImageArray）を返す。
+  ビューは QImage への参照を持つので、配列が生きている間に画素が解放されることはない。
+"""
 from __future__ import annotations
+import sys
 from typing import Optional
 import numpy as np
+from PySide6.QtGui import QImage
 
-try:
-    from PySide6.QtGui import QImage
-except Exception as e:
-    QImage = None  # 型ヒント用のフォールバック
-from PySide6 import QtGui
+# リトルエンディアンでは ARGB32 のメモリ上の並びが B,G,R,A になる
+_BGRA_FORMAT: Optional[QImage.Format] = QImage.Format.Format_ARGB32 if sys.byteorder == "little" else None
+
+_GRAY_FORMATS = {QImage.Format.Format_Grayscale8, QImage.Format.Format_Grayscale16, QImage.Format.Format_Alpha8}
+
+
+class QImageArray(np.ndarray):
+    """
+    QImage のメモリを指すビュー（元の QImage を指すときは読み取り専用）
+
+    qimage 属性で元の QImage（浅いコピー）を保持する。スライスなどの派生ビューにも引き継がれる。
+    """
+    qimage: Optional[QImage]
+
+    def __array_finalize__(self, obj):
+        self.qimage = getattr(obj, "qimage", None)
+
+
+def _channels_for(qimg: QImage, channels: Optional[int]) -> int:
+    if channels is not None:
+        if channels not in (1, 3, 4):
+            raise ValueError("channels must be 1, 3 or 4")
+        return channels
+    if qimg.format() in _GRAY_FORMATS:
+        return 1
+    return 4 if qimg.hasAlphaChannel() else 3
+
+
+def _format_for(channels: int, as_bgr: bool) -> QImage.Format:
+    """そのままメモリを読めば目的の並びになる QImage の形式"""
+    if channels == 1:
+        return QImage.Format.Format_Grayscale8
+    if channels == 3:
+        return QImage.Format.Format_BGR888 if as_bgr else QImage.Format.Format_RGB888
+    if as_bgr and _BGRA_FORMAT is not None:
+        return _BGRA_FORMAT
+    return QImage.Format.Format_RGBA8888
 
 
 def qimage_to_ndarray(
-    qimg: QtGui.QImage,
+    qimg: QImage,
     *,
     as_bgr: bool = True,
     copy: bool = True,
+    channels: Optional[int] = None,
 ) -> np.ndarray:
     """
-    QImage -> numpy.ndarray (H, W, C), dtype=uint8
-    - デフォルトで OpenCV/Paddle 想定の BGR チャンネル順にします (as_bgr=True)。
-    - α付き(QImage.Format_ARGB32 など)は 4ch のまま返します（C=4）。
-      ※ as_bgr=True の場合は BGRA 順になります。
-    - copy=False にすると QImage の裏メモリを参照するビューを返す（寿命に注意）。
+    QImage -> numpy.ndarray, dtype=uint8
 
     Parameters
     ----------
     qimg : QImage
     as_bgr : bool
-        True なら RGB→BGR / RGBA→BGRA の順に並べ替えます。
+        True なら BGR / BGRA の順、False なら RGB / RGBA の順で返す。
     copy : bool
-        True なら安全のため numpy 側に完全コピー（QImage解放の影響を受けない）。
+        True なら元の QImage と独立した書き込み可能な配列を返す
+        （形式の変換が要ったときは変換結果をそのまま使い、さらにコピーはしない）。
+        False なら QImage のメモリを指す読み取り専用ビュー（QImageArray）を返す。
+        行末のパディングはストライドで飛ばすだけなので、C 連続とは限らない。
+    channels : int | None
+        1（グレースケール）/ 3 / 4。None なら QImage から決める
+        （グレースケールは 1、αありは 4、それ以外は 3）。
 
     Returns
     -------
     np.ndarray
-        shape=(H, W, C), dtype=uint8
+        shape=(H, W) / (H, W, 3) / (H, W, 4), dtype=uint8
     """
     if qimg is None:
         raise ValueError("qimage_to_ndarray: qimg is None")
     if qimg.isNull():
         raise ValueError("qimage_to_ndarray: qimg isNull()")
 
-    fmt = qimg.format()
-    w = qimg.width()
-    h = qimg.height()
-    bpl = qimg.bytesPerLine()  # バイト/行（行パディングを含む）
-
-    # QImage.bits() は sip.voidptr を返す→Python側でバッファとして扱う
-    ptr = qimg.bits()
-    ptr.setsize(h * bpl)
-    arr = np.frombuffer(ptr, dtype=np.uint8)
-
-    # 主要フォーマットを分岐
-    # 参考: https://doc.qt.io/qtforpython-6/PySide6/QtGui/QImage.html#PySide6.QtGui.PySide6.QtGui.QImage.Format
-    if fmt in (QImage.Format.Format_RGB888,):
-        # 1行が bpl バイト、実データは 3ch
-        arr = arr.reshape((h, bpl))[:, : w * 3]          # 行パディングを除去
-        arr = arr.reshape((h, w, 3))                     # HWC
-        if as_bgr:
-            arr = arr[:, :, ::-1]                        # RGB -> BGR
-
-    elif fmt in (
-        QImage.Format.Format_ARGB32,
-        QImage.Format.Format_ARGB32_Premultiplied,
-        QImage.Format.Format_RGBA8888,
-        QImage.Format.Format_RGBA8888_Premultiplied,
-    ):
-        # 4ch: ARGB32/RGBA8888 系はメモリ上の並びが実装依存で紛らわしいが、
-        # Qt6 は RGBA として解釈できる配置になることが多い。
-        # → まず4chとして整形し、必要なら RGBA->BGRA に並べ替え。
-        arr = arr.reshape((h, bpl))[:, : w * 4]
-        arr = arr.reshape((h, w, 4))
-        if as_bgr:
-            # RGBA -> BGRA（RとBを入れ替えるだけ、Aはそのまま末尾）
-            arr = arr[:, :, [2, 1, 0, 3]]
-
-    elif fmt in (QImage.Format.Format_Grayscale8,):
-        # 1ch（グレースケール）。呼び出し側が3chを想定することが多いので、3chに展開する。
-        arr = arr.reshape((h, bpl))[:, : w]              # 1ch * W
-        arr = arr.reshape((h, w, 1))
-        arr = np.repeat(arr, 3, axis=2)                  # → (H, W, 3)
-        # as_bgr の概念は 3chと同じ（同一値なので並べ替えの必要なし）
-
+    c = _channels_for(qimg, channels)
+    fmt = _format_for(c, as_bgr)
+    converted = qimg.format() != fmt
+    # 浅いコピー: 呼び出し側が元の QImage に描き込んでも、そちらが複製されるだけでビューは変わらない
+    img = qimg.convertToFormat(fmt) if converted else QImage(qimg)
+    # 変換した画像は誰とも共有していないので、copy=True でもそのまま書き込み可能なビューとして渡せる
+    owned = converted and copy
+
+    h, w, bpl = img.height(), img.width(), img.bytesPerLine()
+    # constBits() は detach（複製）を起こさない
+    bits = img.bits() if owned else img.constBits()
+    buf = np.frombuffer(bits, dtype=np.uint8, count=h * bpl)
+    if c == 1:
+        arr = np.ndarray((h, w), np.uint8, buffer=buf, strides=(bpl, 1))
     else:
-        # あまり使われない/未対応のフォーマットは、とりあえず 32bit として読む
-        # → RGBA と見なして 4chにし、必要なら BGRA へ並べ替え。
-        arr = arr.reshape((h, bpl))[:, : w * 4]
-        arr = arr.reshape((h, w, 4))
-        if as_bgr:
-            arr = arr[:, :, [2, 1, 0, 3]]
-
-    # copy=True なら独立コピーにして QImage 解放の影響を避ける
-    if copy:
-        arr = arr.copy()
+        arr = np.ndarray((h, w, c), np.uint8, buffer=buf, strides=(bpl, c, 1))
+
+    # ビッグエンディアンで BGRA が欲しいときだけ（ARGB32 がそのまま使えない）
+    if c == 4 and as_bgr and fmt != _BGRA_FORMAT:
+        return arr[:, :, [2, 1, 0, 3]]
 
-    return arr
+    if copy and not owned:
+        return arr.copy()
+    view = arr.view(QImageArray)
+    view.qimage = img
+    return view
 
 
-def ndarray_to_qimage(img: np.ndarray) -> QtGui.QImage:
+def qimage_to_gray(qimg: QImage, *, copy: bool = False) -> np.ndarray:
     """
-    numpy.ndarray (H, W, C) -> QImage
-    - C=3 は BGR または RGB を想定（自動推定できないので RGB が欲しい場合は呼び出し側で変換してから渡すのが安全）
-    - C=4 は BGRA または RGBA を想定
-    - dtype=uint8 のみ対応
+    QImage -> (H, W) のグレースケール
+
+    OCR の前処理は最初にグレースケールにするので、BGR に並べ替えてから
+    cvtColor するより、Qt に一度で Grayscale8 へ変換させたほうが速く、メモリも 1/3 で済む。
+    """
+    return qimage_to_ndarray(qimg, copy=copy, channels=1)
+
+
+def ndarray_to_qimage(img: np.ndarray, *, as_bgr: bool = True, copy: bool = True) -> QImage:
     """
-    from PySide6.QtGui import QImage
+    numpy.ndarray -> QImage
 
+    - (H, W) はグレースケール、(H, W, 3) は BGR、(H, W, 4) は BGRA として読む
+      （as_bgr=False なら RGB / RGBA）。チャンネルの並べ替えはせず、対応する形式の QImage にする。
+    - C 連続の配列はそのまま使う（切り出しなどで連続でないときだけ詰め直す）。
+    - copy=False なら ndarray のメモリを指す QImage を返す（QImage に配列への参照を持たせるが、
+      QImage を複製・変換した先には引き継がれないので、使い終わるまで配列を保持すること）。
+    - dtype=uint8 のみ対応
+    """
     if img.dtype != np.uint8:
         raise ValueError("ndarray_to_qimage: dtype must be uint8")
-    if img.ndim != 3 or img.shape[2] not in (3, 4):
-        raise ValueError("ndarray_to_qimage: shape must be (H, W, 3|4)")
+    if img.ndim == 2:
+        c = 1
+    elif img.ndim == 3 and img.shape[2] in (3, 4):
+        c = img.shape[2]
+    else:
+        raise ValueError("ndarray_to_qimage: shape must be (H, W) or (H, W, 3|4)")
 
-    h, w, c = img.shape
+    h, w = img.shape[:2]
+    # QImage には連続したバッファとして渡す（切り出し・負のストライドのものだけ詰め直す）
+    if not img.flags.c_contiguous:
+        img = np.ascontiguousarray(img)
 
-    if c == 3:
-        # ここでは RGB 前提の QImage を作る（BGR を渡す場合は事前に RGB へ変換しておく）
-        rgb = img[:, :, ::-1].copy()  # BGR->RGB 変換（必要なら）
-        qimg = QImage(rgb.data, w, h, w * 3, QImage.Format.Format_RGB888)
-        # QImage はデフォルトでは外部メモリ参照になるため、deep copy して独立させる
-        return qimg.copy()
+    fmt = _format_for(c, as_bgr)
+    if c == 4 and as_bgr and fmt != _BGRA_FORMAT:
+        img = np.ascontiguousarray(img[:, :, [2, 1, 0, 3]])
 
-    else:  # c == 4
-        # BGRA -> RGBA へ（必要なら）入れ替え
-        rgba = img[:, :, [2, 1, 0, 3]].copy()  # BGRA->RGBA
-        qimg = QImage(rgba.data, w, h, w * 4, QImage.Format.Format_RGBA8888)
+    qimg = QImage(img.data, w, h, img.strides[0], fmt)
+    if copy:
         return qimg.copy()
+    qimg._ndarray = img
+    return qimg